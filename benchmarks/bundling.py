@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+""" Operations per second with and without transaction bundling
+
+    Builds ``--count`` follow operations for ``--account`` and signs
+    them once with one transaction per operation (the path of the
+    individual ``piston follow`` calls) and once bundled into as few
+    transactions as possible. Nothing is broadcast (``nobroadcast``),
+    so the timings include the reference-block lookups and signatures
+    but not the broadcast round trips. The posting key of ``--account``
+    has to be in the wallet.
+
+    Usage::
+
+        python3 benchmarks/bundling.py --account <name> [--count 100] [--node wss://...]
+"""
+import argparse
+from piston.steem import Steem
+from pistoncli.bundle import Bundle, MAX_OPS
+
+
+def measure(steem, account, count, max_ops):
+    bundle = Bundle(steem, max_ops=max_ops)
+    with bundle.collect():
+        for i in range(count):
+            steem.follow("piston-bench-%d" % i, account=account)
+    results, stats = bundle.broadcast()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--account', type=str, required=True)
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--node', type=str, default=None)
+    args = parser.parse_args()
+
+    options = {"nobroadcast": True}
+    if args.node:
+        options["node"] = args.node
+    steem = Steem(**options)
+    steem.wallet.unlock()
+
+    single = measure(steem, args.account, args.count, 1)
+    bundled = measure(steem, args.account, args.count, MAX_OPS)
+    for name, stats in [("one per operation", single), ("bundled", bundled)]:
+        print("%-18s %5d operations  %4d transactions  %7.2f s  %8.1f ops/s" % (
+            name,
+            stats["operations"],
+            stats["transactions"],
+            stats["time"],
+            stats["ops_per_sec"]
+        ))
+    print("speedup: %.1fx" % (bundled["ops_per_sec"] / single["ops_per_sec"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+""" Configuration storage reads per ``piston`` invocation
+
+    Builds the argument parser (and, for ``config``, runs the command)
+    for a couple of typical invocations and counts the SQL queries
+    issued against piston's configuration storage. Nothing is written
+    and no node is contacted.
+
+    Usage::
+
+        python3 benchmarks/config_reads.py
+"""
+import io
+import sqlite3
+import contextlib
+from pistoncli import commands
+from pistoncli.__main__ import build_parser
+from pistoncli.storage import configStorage
+
+invocations = [
+    ["--help"],
+    ["config"],
+    ["set", "limit", "10"],
+    ["upvote", "@xeroc/piston"],
+    ["list", "--limit", "5"],
+    ["history", "xeroc"],
+]
+
+queries = 0
+_connect = sqlite3.connect
+
+
+def counting_connect(*args, **kwargs):
+    def trace(statement):
+        global queries
+        if statement.lstrip().upper().startswith("SELECT"):
+            queries += 1
+    connection = _connect(*args, **kwargs)
+    connection.set_trace_callback(trace)
+    return connection
+
+
+def count(argv):
+    global queries
+    queries = 0
+    configStorage._values = None
+    parser = build_parser(argv)
+    if argv[0] == "--help":
+        with contextlib.redirect_stdout(io.StringIO()):
+            parser.print_help()
+        return queries
+    args = parser.parse_args(argv)
+    if not commands.registry[args.command].rpc and args.command != "set":
+        with contextlib.redirect_stdout(io.StringIO()):
+            commands.run(args.command, None, args)
+    return queries
+
+
+def main():
+    sqlite3.connect = counting_connect
+    try:
+        for argv in invocations:
+            print("piston %-28s %2d storage read(s)" % (" ".join(argv), count(argv)))
+    finally:
+        sqlite3.connect = _connect
+
+
+if __name__ == '__main__':
+    main()
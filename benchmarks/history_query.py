@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+""" Filtered queries on a synced account history
+
+    Fills a temporary :class:`pistoncli.history.HistoryStore` with a
+    generated history of ``--operations`` operations and times typical
+    reports, answered from the indexes of the store, against filtering
+    every operation on the client (as ``piston history`` does for
+    histories fetched from the node).
+
+    Usage::
+
+        python3 benchmarks/history_query.py [--operations 1000000]
+"""
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import datetime
+from pistoncli import history
+
+TYPES = ["vote"] * 60 + ["curation_reward"] * 20 + ["transfer"] * 10 + \
+    ["comment"] * 8 + ["author_reward"] * 2
+
+
+def generate(operations, seed=0):
+    rnd = random.Random(seed)
+    start = datetime.datetime(2016, 6, 1)
+    for i in range(operations):
+        # About two years of operations
+        time_ = start + datetime.timedelta(seconds=i * 63072000 // operations)
+        op = rnd.choice(TYPES)
+        other = "user%d" % rnd.randrange(500)
+        data = {
+            "vote": {"voter": "bench", "author": other, "permlink": "p"},
+            "curation_reward": {"curator": "bench", "comment_author": other},
+            "transfer": {"from": "bench", "to": other, "amount": "1.000 SBD",
+                         "memo": ""},
+            "comment": {"author": "bench", "parent_author": other},
+            "author_reward": {"author": "bench"},
+        }[op]
+        yield [i, {"block": 2000000 + i * 3, "trx_id": "",
+                   "timestamp": time_.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "op": [op, data]}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--operations', type=int, default=1000000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        store = history.HistoryStore(os.path.join(directory, "history.sqlite"))
+        start = time.time()
+        page = []
+        for entry in generate(args.operations):
+            page.append(entry)
+            if len(page) == 10000:
+                store.store("bench", page)
+                page = []
+        store.store("bench", page)
+        print("stored %d operations in %.1f s" % (
+            args.operations, time.time() - start))
+
+        middle = 2000000 + args.operations * 3 // 2
+        queries = [
+            ("transfers to user42 in March 2018",
+             dict(only_ops=["transfer"], counterparty="user42",
+                  since=history.parse_bound("2018-03"),
+                  until=history.parse_bound("2018-04"))),
+            ("curation rewards since block %d" % middle,
+             dict(only_ops=["curation_reward"], since=middle)),
+            ("last 100 operations with user7",
+             dict(counterparty="user7", limit=100)),
+        ]
+        print("%-42s %8s %12s %12s" % ("query", "results", "indexed", "scan"))
+        for name, filters in queries:
+            start = time.time()
+            results = sum(len(p) for p in store.pages("bench", **filters))
+            indexed = time.time() - start
+
+            # Every operation read and filtered on the client
+            start = time.time()
+            limit = filters.get("limit")
+            scanned = 0
+            for p in store.pages("bench"):
+                for index, op in p:
+                    if ("only_ops" in filters and
+                            op["op"][0] not in filters["only_ops"]):
+                        continue
+                    if ("counterparty" in filters and
+                            history.counterparty_of("bench", op["op"]) != filters["counterparty"]):
+                        continue
+                    if "since" in filters and history._position(op, filters["since"]) < filters["since"]:
+                        continue
+                    if "until" in filters and history._position(op, filters["until"]) >= filters["until"]:
+                        continue
+                    scanned += 1
+                if limit and scanned >= limit:
+                    break
+            scan = time.time() - start
+            print("%-42s %8d %10.1fms %10.1fms" % (
+                name, results, indexed * 1e3, scan * 1e3))
+        store.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+""" Cost of ``piston history --summary`` per million operations
+
+    Aggregates a generated history (operation counts, transfers per
+    counterparty and rewards per day) with
+    :class:`pistoncli.summary.Summary` and, for comparison, with a loop
+    that keeps every operation and groups them at the end.
+
+    Usage::
+
+        python3 benchmarks/history_summary.py [--operations 1000000]
+"""
+import time
+import random
+import argparse
+import datetime
+from pistoncli.summary import Summary, REWARD_FIELDS
+
+TYPES = ["vote"] * 60 + ["curation_reward"] * 20 + ["transfer"] * 10 + \
+    ["comment"] * 8 + ["author_reward"] * 2
+
+
+def generate(operations, seed=0):
+    rnd = random.Random(seed)
+    start = datetime.datetime(2016, 6, 1)
+    for i in range(operations):
+        time_ = start + datetime.timedelta(seconds=i * 63072000 // operations)
+        op = rnd.choice(TYPES)
+        other = "user%d" % rnd.randrange(500)
+        amount = "%.3f %s" % (rnd.random() * 100, rnd.choice(["SBD", "STEEM"]))
+        data = {
+            "vote": {"voter": "bench", "author": other, "permlink": "p"},
+            "curation_reward": {"curator": "bench", "comment_author": other,
+                                "reward": "%.6f VESTS" % (rnd.random() * 1e4)},
+            "transfer": {"from": rnd.choice(["bench", other]),
+                         "to": other, "amount": amount, "memo": ""},
+            "comment": {"author": "bench", "parent_author": other},
+            "author_reward": {"author": "bench", "sbd_payout": amount,
+                              "steem_payout": "0.000 STEEM",
+                              "vesting_payout": "1.000000 VESTS"},
+        }[op]
+        yield [i, {"block": 2000000 + i, "trx_id": "",
+                   "timestamp": time_.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "op": [op, data]}]
+
+
+def pages(entries, size=1000):
+    page = []
+    for entry in entries:
+        page.append(entry)
+        if len(page) == size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def collected(history, account="bench"):
+    operations = [op for page in history for _, op in page]
+    counts, transfers, rewards = {}, {}, {}
+    for op in operations:
+        kind = op["op"][0]
+        counts.setdefault(kind, []).append(op)
+    for op in counts.get("transfer", []):
+        data = op["op"][1]
+        sent = data["from"] == account
+        value, asset = data["amount"].split(" ")
+        key = (data["to"] if sent else data["from"], asset)
+        transfers.setdefault(key, []).append((sent, float(value)))
+    for kind in REWARD_FIELDS:
+        for op in counts.get(kind, []):
+            for field in REWARD_FIELDS[kind]:
+                if field in op["op"][1]:
+                    value, asset = op["op"][1][field].split(" ")
+                    key = (op["timestamp"][:10], asset)
+                    rewards.setdefault(key, []).append(float(value))
+    return ({kind: len(ops) for kind, ops in counts.items()},
+            {key: (sum(v for s, v in values if s),
+                   sum(v for s, v in values if not s))
+             for key, values in transfers.items()},
+            {key: sum(values) for key, values in rewards.items()})
+
+
+def running(history, account="bench"):
+    summary = Summary(account)
+    for page in history:
+        summary.add(page)
+    return summary.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--operations', type=int, default=1000000)
+    args = parser.parse_args()
+
+    history = list(pages(generate(args.operations)))
+    millions = args.operations / 1e6
+    for name, function in [("collected", collected),
+                           ("Summary", running)]:
+        start = time.time()
+        function(history)
+        elapsed = time.time() - start
+        print("%-10s %8.2f s  %6.2f s per million operations" % (
+            name, elapsed, elapsed / millions))
+
+
+if __name__ == "__main__":
+    main()
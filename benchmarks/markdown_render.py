@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+""" Rendering markdown posts for the terminal
+
+    Renders a corpus of large posts with the previous ``markdownify``
+    (one regular expression pass over the whole body per markup
+    element) and with :mod:`pistoncli.markdown`, and reports the
+    throughput in MB/s.
+
+    The corpus is either a directory of markdown files, posts fetched
+    from a node with ``--record`` (and stored in that directory), or
+    generated posts.
+
+    Usage::
+
+        python3 benchmarks/markdown_render.py [--corpus posts/] [--posts 50] [--size 40] [--repeat 5]
+        python3 benchmarks/markdown_render.py --record posts/ @author/permlink [@author/permlink ...]
+"""
+import os
+import re
+import time
+import random
+import argparse
+from textwrap import TextWrapper
+from pistoncli.markdown import render
+
+
+def legacy_markdownify(t):
+    """ ``pistoncli.ui.markdownify`` before the single-pass renderer
+    """
+    width = 120
+
+    def mdCodeBlock(t):
+        return ("    " + Back.WHITE + Fore.BLUE + "   " + t.group(1) +
+                "   " + Fore.RESET + Back.RESET)
+
+    def mdCodeInline(t):
+        return (Back.WHITE + Fore.BLUE + " " + t.group(1) + " " +
+                Fore.RESET + Back.RESET)
+
+    def mdList(t):
+        return Fore.GREEN + " " + t.group(1) + " " + Fore.RESET + t.group(2)
+
+    def mdLink(t):
+        return (Fore.RED + "[%s]" % t.group(1) + Fore.GREEN +
+                "(%s)" % t.group(2) + Fore.RESET)
+
+    def mdHeadline(t):
+        colors = [Back.RED, Back.GREEN, Back.YELLOW,
+                  Back.BLUE, Back.MAGENTA, Back.CYAN]
+        color = colors[len(t.group(1)) % len(colors)]
+        headline = (color + '{:^{len}}'.format(t.group(2), len=width) +
+                    Back.RESET)
+        return Style.BRIGHT + headline + Style.NORMAL
+
+    def mdBold(t):
+        return Style.BRIGHT + t.group(1) + Style.NORMAL
+
+    def mdLight(t):
+        return Style.DIM + t.group(1) + Style.NORMAL
+
+    def wrapText(t):
+        postWrapper = TextWrapper()
+        postWrapper.width = width
+        return ("\n".join(postWrapper.fill(l) for l in t.splitlines()))
+
+    import colorama
+    from colorama import Fore, Back, Style
+    colorama.init()
+
+    t = re.sub(r"\n\n", "{NEWLINE}", t, flags=re.M)
+    t = re.sub(r"\n(^[^#\-\*].*)", r"\1", t, flags=re.M)
+    t = re.sub(r"{NEWLINE}", "\n\n", t, flags=re.M)
+
+    t = re.sub(r"\*\*(.*)\*\*", mdBold, t, flags=re.M)
+    t = re.sub(r"\*(.*)\*", mdLight, t, flags=re.M)
+
+    t = re.sub(r"`(.*)`", mdCodeInline, t, flags=re.M)
+    t = re.sub(r"^ {4,}(.*)", mdCodeBlock, t, flags=re.M)
+    t = re.sub(r"^([\*\-])\s*(.*)", mdList, t, flags=re.M)
+    t = re.sub(r"\[(.*)\]\((.*)\)", mdLink, t, flags=re.M)
+
+    t = wrapText(t)
+
+    t = re.sub(r"^(#+)\s*(.*)$", mdHeadline, t, flags=re.M)
+    t = re.sub(r"```(.*)```", mdCodeBlock, t, flags=re.M)
+
+    return t
+
+
+WORDS = ("steem piston blockchain witness vote reward author comment "
+         "curation payout account market power delegation block node "
+         "the a of and to in is for on with").split()
+
+
+def generate(posts, size, seed=0):
+    """ ``posts`` posts of about ``size`` kB with the usual markup
+    """
+    rnd = random.Random(seed)
+
+    def sentence():
+        words = [rnd.choice(WORDS) for _ in range(rnd.randint(6, 18))]
+        i = rnd.randrange(len(words))
+        markup = rnd.random()
+        if markup < 0.2:
+            words[i] = "**%s**" % words[i]
+        elif markup < 0.3:
+            words[i] = "*%s*" % words[i]
+        elif markup < 0.4:
+            words[i] = "`%s`" % words[i]
+        elif markup < 0.5:
+            words[i] = "[%s](https://steemit.com/@%s)" % (words[i], words[i])
+        return " ".join(words).capitalize() + "."
+
+    corpus = []
+    for _ in range(posts):
+        blocks = []
+        length = 0
+        while length < size * 1024:
+            kind = rnd.random()
+            if kind < 0.1:
+                block = "#" * rnd.randint(1, 3) + " " + sentence()
+            elif kind < 0.25:
+                block = "\n".join("* " + sentence() for _ in range(rnd.randint(2, 6)))
+            elif kind < 0.3:
+                block = "```\n" + "\n".join(
+                    "x = %d" % i for i in range(rnd.randint(2, 8))) + "\n```"
+            else:
+                # Paragraphs are hard wrapped like most posts
+                text = " ".join(sentence() for _ in range(rnd.randint(3, 10)))
+                block = TextWrapper(width=80).fill(text)
+            blocks.append(block)
+            length += len(block) + 2
+        corpus.append("\n\n".join(blocks))
+    return corpus
+
+
+def load(path):
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name)) as fp:
+            corpus.append(fp.read())
+    return corpus
+
+
+def record(path, identifiers):
+    from piston.steem import Steem
+    steem = Steem()
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    for identifier in identifiers:
+        author, permlink = identifier.lstrip("@").split("/", 1)
+        post = steem.rpc.get_content(author, permlink)
+        name = "%s-%s.md" % (author, permlink)
+        with open(os.path.join(path, name), "w") as fp:
+            fp.write(post["body"])
+        print("recorded %s (%d bytes)" % (name, len(post["body"])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', type=str, default=None,
+                        help='Directory of markdown posts')
+    parser.add_argument('--posts', type=int, default=50,
+                        help='Number of generated posts')
+    parser.add_argument('--size', type=int, default=40,
+                        help='Size of generated posts in kB')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--record', nargs="+", metavar=("DIRECTORY", "IDENTIFIER"))
+    args = parser.parse_args()
+
+    if args.record:
+        return record(args.record[0], args.record[1:])
+
+    if args.corpus:
+        corpus = load(args.corpus)
+    else:
+        corpus = generate(args.posts, args.size)
+    size = sum(len(body.encode("utf-8")) for body in corpus) / 1024.0 / 1024.0
+    print("%d posts, %.2f MB" % (len(corpus), size))
+
+    results = {}
+    for name, function in [("previous markdownify", legacy_markdownify),
+                           ("single pass renderer", render)]:
+        best = None
+        for _ in range(args.repeat):
+            start = time.time()
+            for body in corpus:
+                function(body)
+            elapsed = time.time() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[name] = size / best
+        print("%-22s %8.3f s  %8.2f MB/s" % (name, best, results[name]))
+    print("speedup: %.1fx" % (
+        results["single pass renderer"] / results["previous markdownify"]))
+
+
+if __name__ == "__main__":
+    main()
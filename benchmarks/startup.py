@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+""" Startup time of the ``piston`` executable
+
+    Runs cheap sub-commands in a fresh interpreter several times and
+    reports the best and median wall-clock time against the target.
+    Note that ``set`` writes to the local configuration.
+
+    Usage::
+
+        python3 benchmarks/startup.py [--runs 20]
+"""
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+#: Startup target in seconds for commands that do not need a node
+TARGET = 0.150
+
+invocations = [
+    ["--help"],
+    ["config"],
+    ["set", "limit", "10"],
+]
+
+
+def measure(argv, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "pistoncli"] + argv,
+            stdout=subprocess.DEVNULL,
+            check=True
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    failed = False
+    for argv in invocations:
+        timings = measure(argv, args.runs)
+        best = min(timings)
+        ok = best <= TARGET
+        failed |= not ok
+        print("piston %-18s best %6.1f ms  median %6.1f ms  target %4.0f ms  %s" % (
+            " ".join(argv),
+            best * 1e3,
+            statistics.median(timings) * 1e3,
+            TARGET * 1e3,
+            "ok" if ok else "SLOW"
+        ))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+""" Printing long listings
+
+    Prints generated ``piston list`` rows the way ``list_posts`` did
+    before (a ``TextWrapper`` per row and a ``PrettyTable`` that is
+    printed once all rows are known) and with
+    :class:`pistoncli.table.StreamingTable`, and reports the total
+    time, the time until the first line is printed and the peak memory.
+
+    Usage::
+
+        python3 benchmarks/table_render.py [--rows 10000 100000]
+"""
+import io
+import time
+import random
+import argparse
+import tracemalloc
+from textwrap import TextWrapper
+from prettytable import PrettyTable
+from pistoncli.table import StreamingTable
+
+HEADER = ["identifier", "title", "category", "replies", "payouts"]
+
+
+def generate(rows, seed=0):
+    """ Yield ``rows`` rows of ``piston list``
+    """
+    rnd = random.Random(seed)
+    words = "steem piston witness vote reward payout power market".split()
+    for i in range(rows):
+        yield {
+            "identifier": "@user%d/post-%d" % (i % 997, i),
+            "title": " ".join(rnd.choice(words) for _ in range(rnd.randint(2, 14))),
+            "category": rnd.choice(words),
+            "children": rnd.randint(0, 200),
+            "pending_payout_value": "%.3f SBD" % (rnd.random() * 1000),
+        }
+
+
+class Output(io.StringIO):
+    """ Discards the output, but remembers when it was first written to
+    """
+    first = None
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.time()
+        return len(text)
+
+
+def prettytable(rows, out):
+    t = PrettyTable(HEADER)
+    t.align = "l"
+    t.align["payouts"] = "r"
+    t.align["replies"] = "c"
+    for d in rows:
+        wrapper = TextWrapper()
+        wrapper.width = 60
+        wrapper.subsequent_indent = " "
+        t.add_row([
+            wrapper.fill(d["identifier"]),
+            wrapper.fill(d["title"]),
+            d["category"],
+            d["children"],
+            d["pending_payout_value"],
+        ])
+    out.write(str(t) + "\n")
+
+
+def streaming(rows, out):
+    t = StreamingTable(HEADER, max_widths={"identifier": 60, "title": 60},
+                       file=out)
+    t.align["payouts"] = "r"
+    t.align["replies"] = "c"
+    with t:
+        for d in rows:
+            t.add_row([
+                d["identifier"],
+                d["title"],
+                d["category"],
+                d["children"],
+                d["pending_payout_value"],
+            ])
+
+
+def measure(function, rows):
+    out = Output()
+    start = time.time()
+    function(generate(rows), out)
+    elapsed = time.time() - start
+    tracemalloc.start()
+    function(generate(rows), Output())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, out.first - start, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    print("%8s  %-16s %9s %12s %10s" % (
+        "rows", "table", "total", "first line", "peak"))
+    for rows in args.rows:
+        for name, function in [("PrettyTable", prettytable),
+                               ("StreamingTable", streaming)]:
+            elapsed, first, peak = measure(function, rows)
+            print("%8d  %-16s %8.2fs %11.3fs %8.2fMB" % (
+                rows, name, elapsed, first, peak / 1024.0 / 1024.0))
+
+
+if __name__ == "__main__":
+    main()
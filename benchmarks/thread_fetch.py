@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+""" Fetching a 1,000-comment discussion thread
+
+    Replays a recorded thread (or a generated one with ``--comments``
+    replies) with a simulated round trip time per call and compares
+
+    * the previous recursive fetch (two ``get_content_replies`` calls
+      per reply, one after another),
+    * the streaming fetch over ``--workers`` connections, as for nodes
+      without ``get_state``, and
+    * the streaming fetch of ``piston read --comments``, which starts
+      with the bulk ``get_state`` call
+
+    including the time until the first reply is available.
+
+    A thread can be recorded from a node with ``--record``.
+
+    Usage::
+
+        python3 benchmarks/thread_fetch.py [--thread thread.json] [--latency 50] [--workers 8]
+        python3 benchmarks/thread_fetch.py --record @author/permlink thread.json
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from pistoncli.discussion import Discussion, identifier
+from pistoncli.pool import ReaderPool
+
+
+def generate(comments, seed=0):
+    """ Replies of a random thread with ``comments`` replies below
+        ``root/thread``
+    """
+    rnd = random.Random(seed)
+    replies = {"root/thread": []}
+    posts = ["root/thread"]
+    for i in range(comments):
+        # Most replies go to the post itself or to recent comments
+        parent = rnd.choice(posts[:1] * 5 + posts[-50:])
+        post = {"author": "user%d" % (i % 97), "permlink": "re-%d" % i,
+                "children": 0, "body": "Comment %d" % i}
+        replies[parent].append(post)
+        replies[identifier(post)] = []
+        posts.append(identifier(post))
+    # children counts all replies below a post
+    for key in reversed(posts):
+        for post in replies[key]:
+            post["children"] = sum(
+                1 + reply["children"] for reply in replies[identifier(post)])
+    return replies
+
+
+class ReplayRPC(object):
+    """ Serves a recorded thread with a simulated round trip time
+    """
+    def __init__(self, replies, latency):
+        self.replies = replies
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def _call(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.latency)
+
+    def get_content_replies(self, author, permlink):
+        self._call()
+        return self.replies.get("%s/%s" % (author, permlink), [])
+
+    def get_state(self, path):
+        self._call()
+        root = path.split("@", 1)[1]
+        content = {}
+        for key, replies in self.replies.items():
+            post = content.setdefault(key, {"author": key.split("/")[0],
+                                            "permlink": key.split("/", 1)[1]})
+            post["replies"] = [identifier(reply) for reply in replies]
+            for reply in replies:
+                content.setdefault(identifier(reply), dict(reply))
+        return {"content": content if root in content else {}}
+
+
+class Connection(object):
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+
+
+def legacy_fetch(rpc, author, permlink):
+    """ The previous recursive fetch of ``ui.dump_recursive_comments``
+    """
+    count = 0
+    for post in rpc.get_content_replies(author, permlink):
+        count += 1
+        if len(rpc.get_content_replies(post["author"], post["permlink"])):
+            count += legacy_fetch(rpc, post["author"], post["permlink"])
+    return count
+
+
+def record(identifier_, path):
+    from piston.steem import Steem
+    author, permlink = identifier_.lstrip("@").split("/", 1)
+    root = "%s/%s" % (author, permlink)
+    replies = {"root/thread": []}
+    for _, reply in Discussion(Steem().rpc, state=False).stream(author, permlink):
+        parent = "%s/%s" % (reply["parent_author"], reply["parent_permlink"])
+        replies.setdefault("root/thread" if parent == root else parent,
+                           []).append(reply)
+    with open(path, "w") as fp:
+        json.dump(replies, fp)
+    print("recorded %d replies to %s" % (
+        sum(len(r) for r in replies.values()), path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--thread', type=str, default=None,
+                        help='Recorded thread (JSON)')
+    parser.add_argument('--comments', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=50,
+                        help='Round trip time in ms')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--record', nargs=2, metavar=("IDENTIFIER", "FILE"))
+    args = parser.parse_args()
+
+    if args.record:
+        return record(*args.record)
+
+    if args.thread:
+        with open(args.thread) as fp:
+            replies = json.load(fp)
+    else:
+        replies = generate(args.comments)
+    total = sum(len(r) for r in replies.values())
+    latency = args.latency / 1e3
+
+    def report(name, rpc, start, count):
+        print("%-28s %5d replies  %5d calls  %8.2f s" % (
+            name, count, rpc.calls, time.time() - start))
+
+    rpc = ReplayRPC(replies, latency)
+    start = time.time()
+    count = legacy_fetch(rpc, "root", "thread")
+    report("recursive (previous)", rpc, start, count)
+
+    for name, state in [("streaming, %d workers" % args.workers, False),
+                        ("get_state, then streaming", True)]:
+        rpc = ReplayRPC(replies, latency)
+        start = time.time()
+        with ReaderPool({}, workers=args.workers, factory=lambda **kw: Connection(rpc)) as pool:
+            first = None
+            count = 0
+            for _ in Discussion(rpc, pool=pool, state=state).stream("root", "thread"):
+                first = first or time.time() - start
+                count += 1
+        report(name, rpc, start, count)
+        print("%-28s %8.3f s" % ("  first reply after", first))
+        assert count == total
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+""" ``piston batch``: run many sub-commands over one session
+
+    The input holds one sub-command invocation per line, either as plain
+    text (``upvote @author/permlink --weight 50``), as a JSON list of
+    arguments or as a JSON object with an ``argv`` list. Empty lines and
+    lines starting with ``#`` are skipped.
+
+    Commands that use the wallet (i.e. sign and broadcast), or that
+    change the local configuration, run one after another in input
+    order on the batch's own :class:`piston.steem.Steem` instance.
+    Read-only commands run concurrently on a :class:`ReaderPool`. For
+    every line, a JSON object with the command's status, output and
+    runtime is written, in input order.
+"""
+import io
+import sys
+import json
+import time
+import shlex
+import collections
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, Future
+from . import commands
+from .pool import ReaderPool
+
+#: Commands that cannot be run from within a batch
+unavailable = ["shell", "daemon", "batch"]
+
+
+def parse_line(line):
+    """ Split one line of a batch file into arguments
+
+        :param str line: The line
+        :return: List of arguments, ``None`` for empty lines and comments
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line[0] in "[{":
+        argv = json.loads(line)
+        if isinstance(argv, dict):
+            argv = argv["argv"]
+        return [str(x) for x in argv]
+    return shlex.split(line)
+
+
+def parse_args(argv):
+    """ Parse a command line without exiting on errors
+
+        :param list argv: Arguments (global options and sub-command)
+        :return: ``(args, error)``
+    """
+    from .__main__ import build_parser
+    stderr = io.StringIO()
+    if isinstance(sys.stdout, ThreadOutput):
+        # Do not swallow what other threads of the batch print
+        stdout = sys.stdout.capture()
+    else:
+        stdout = contextlib.redirect_stdout(io.StringIO())
+    try:
+        with stdout, contextlib.redirect_stderr(stderr):
+            args = build_parser(argv).parse_args(argv)
+    except SystemExit as e:
+        lines = stderr.getvalue().strip().splitlines()
+        if not e.code or not lines:
+            # --help and --version print to stdout and exit with 0
+            return None, "help is not supported in batch mode"
+        return None, lines[-1]
+    if not hasattr(args, "command"):
+        return None, "No valid command given"
+    return args, None
+
+
+class ThreadOutput(io.TextIOBase):
+    """ Replacement for ``sys.stdout`` that collects what each thread
+        writes while it is inside :meth:`capture`
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    @contextlib.contextmanager
+    def capture(self):
+        self.local.buffer = io.StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+
+class Batch(object):
+    """ Execute parsed batch lines
+
+        :param piston.steem.Steem steem: Session used for commands that
+            run in order
+        :param dict options: Options of ``steem``, used to open the
+            read-only connections
+        :param list global_argv: Global options prepended to every line
+        :param int workers: Number of concurrent read-only connections
+        :param output: Stream the results are written to (defaults to
+            ``sys.stdout``)
+    """
+    def __init__(self, steem, options, global_argv=None, workers=4, output=None):
+        self.steem = steem
+        self.options = options
+        self.global_argv = global_argv or []
+        self.workers = workers
+        self.output = output
+
+    def parse(self, argv):
+        """ Parse the arguments of one line
+
+            :return: ``(args, error)``
+        """
+        args, error = parse_args(self.global_argv + argv)
+        if error:
+            return None, error
+        command = commands.registry[args.command]
+        if command.name in unavailable or command.interactive:
+            return None, "%s cannot be run in a batch" % args.command
+        return args, None
+
+    def execute(self, steem, args):
+        start = time.time()
+        result = {"command": args.command}
+        with sys.stdout.capture() as output:
+            try:
+                commands.run(args.command, steem, args)
+                result["status"] = "ok"
+            except SystemExit as e:
+                result["status"] = "error" if e.code else "ok"
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = "%s: %s" % (type(e).__name__, str(e))
+        result["output"] = output.getvalue()
+        result["time"] = round(time.time() - start, 4)
+        return result
+
+    def run(self, lines):
+        """ Run all ``lines`` and write one result per line
+
+            Results are written as soon as they and all results of the
+            lines before them are available.
+
+            :param iterable lines: Lines of the batch file
+            :return: Number of failed lines
+        """
+        stdout = sys.stdout
+        output = self.output or stdout
+        sys.stdout = ThreadOutput(stdout)
+        ordered = ThreadPoolExecutor(max_workers=1)
+        readers = ReaderPool(self.options, workers=self.workers)
+        pending = collections.deque()
+        failed = 0
+
+        def emit(block):
+            nonlocal failed
+            while pending and (block or pending[0][2].done()):
+                number, argv, future = pending.popleft()
+                result = future.result()
+                result.update({"line": number, "argv": argv})
+                failed += result["status"] != "ok"
+                output.write(json.dumps(result, sort_keys=True) + "\n")
+                output.flush()
+
+        try:
+            for number, line in enumerate(lines, 1):
+                try:
+                    argv = parse_line(line)
+                except (ValueError, KeyError, TypeError) as e:
+                    argv, args, error = [], None, "Invalid line: %s" % str(e)
+                else:
+                    if argv is None:
+                        continue
+                    args, error = self.parse(argv)
+                if error:
+                    future = Future()
+                    future.set_result({"status": "error", "error": error})
+                elif (commands.registry[args.command].wallet or
+                        not commands.registry[args.command].rpc):
+                    future = ordered.submit(self.execute, self.steem, args)
+                else:
+                    future = readers.submit(self.execute, args)
+                pending.append((number, argv, future))
+                emit(block=False)
+            emit(block=True)
+            return failed
+        finally:
+            ordered.shutdown()
+            readers.shutdown()
+            sys.stdout = stdout
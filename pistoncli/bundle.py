@@ -0,0 +1,200 @@
+""" Bundle the operations of many sub-commands into few transactions
+
+    ``upvote``, ``transfer``, ``follow``, ``resteem``,
+    ``approvewitness`` and friends each build one operation and hand it
+    to :meth:`piston.steem.Steem.finalizeOp`, which fetches a reference
+    block, signs and broadcasts a transaction for just that operation.
+
+    While :meth:`Bundle.collect` is active, ``finalizeOp`` only records
+    the operation together with the account and permission that have to
+    sign it. :meth:`Bundle.broadcast` then packs the recorded operations
+    into as few transactions as possible: operations that need the same
+    key (same account and permission) share a transaction, as long as
+    it stays below :data:`MAX_OPS` operations and :data:`MAX_SIZE`
+    bytes. Every transaction is signed once.
+
+    A voter may only vote once every :data:`VOTE_INTERVAL` seconds, and
+    a transaction with a second vote of the same voter would be rejected
+    as a whole. Every transaction therefore carries at most one vote per
+    voter; further votes go into later transactions, which are
+    broadcast at least :data:`VOTE_INTERVAL` seconds after the previous
+    vote of that voter.
+
+    A transaction that is rejected does not take the others with it:
+    :meth:`Bundle.broadcast` records the error together with the
+    operations of the transaction and either carries on with the next
+    transaction or, with ``stop_on_error``, leaves the remaining ones
+    unsent. Either way, the result tells which transactions went
+    through and which did not.
+"""
+import json
+import time
+import collections
+import contextlib
+
+#: Commands whose operations can be bundled
+bundleable = [
+    "upvote", "downvote",
+    "transfer",
+    "follow", "unfollow",
+    "resteem",
+    "approvewitness", "disapprovewitness",
+]
+
+#: Maximum number of operations per transaction
+MAX_OPS = 50
+
+#: Maximum size of a transaction in bytes (the chain allows 64 KiB)
+MAX_SIZE = 64 * 1024
+
+#: Room for the transaction header and its signature
+OVERHEAD = 256
+
+#: Seconds between two votes of one voter (``STEEMIT_MIN_VOTE_INTERVAL_SEC``)
+VOTE_INTERVAL = 3
+
+
+def operation_size(op):
+    """ Estimate the serialized size of an operation in bytes
+    """
+    try:
+        return len(bytes(op))
+    except TypeError:
+        return len(json.dumps(op, default=str))
+
+
+def is_vote(op):
+    """ Whether ``op`` is a vote (``pistonbase.operations.Vote``)
+    """
+    return type(op).__name__ == "Vote"
+
+
+class Bundle(object):
+    """ Collect operations and broadcast them in few transactions
+
+        :param piston.steem.Steem steem: Steem instance with unlocked
+            wallet
+        :param int max_ops: Maximum number of operations per transaction
+            (``1`` gives one transaction per operation)
+        :param int max_size: Maximum transaction size in bytes
+        :param float vote_interval: Seconds between two transactions
+            with votes of the same voter
+    """
+    def __init__(self, steem, max_ops=MAX_OPS, max_size=MAX_SIZE,
+                 vote_interval=VOTE_INTERVAL):
+        self.steem = steem
+        self.max_ops = max_ops
+        self.max_size = max_size
+        self.vote_interval = vote_interval
+        self.operations = []
+
+    def _record(self, ops, account, permission):
+        if not isinstance(ops, (list, tuple)):
+            ops = [ops]
+        for op in ops:
+            self.operations.append((account, permission, op))
+        return {"bundled": len(self.operations)}
+
+    @contextlib.contextmanager
+    def collect(self):
+        """ Record, instead of broadcast, what is passed to
+            ``steem.finalizeOp`` within this context
+        """
+        self.steem.finalizeOp = self._record
+        try:
+            yield self
+        finally:
+            del self.steem.finalizeOp
+
+    def transactions(self):
+        """ Group the recorded operations into transactions
+
+            The first transaction of every account comes first (in the
+            order the accounts first appear), then the second ones and
+            so on, so that the transactions with further votes of a
+            voter are spread out.
+
+            :return: List of ``(account, permission, ops)``
+        """
+        groups = collections.OrderedDict()
+        for account, permission, op in self.operations:
+            groups.setdefault((account, permission), []).append(op)
+
+        rounds = []
+        for (account, permission), ops in groups.items():
+            chunks = []
+            chunk, size, voted = [], OVERHEAD, False
+            for op in ops:
+                op_size = operation_size(op)
+                vote = is_vote(op)
+                if chunk and (len(chunk) >= self.max_ops or
+                              size + op_size > self.max_size or
+                              (vote and voted)):
+                    chunks.append(chunk)
+                    chunk, size, voted = [], OVERHEAD, False
+                chunk.append(op)
+                size += op_size
+                voted = voted or vote
+            if chunk:
+                chunks.append(chunk)
+            for i, chunk in enumerate(chunks):
+                if i == len(rounds):
+                    rounds.append([])
+                rounds[i].append((account, permission, chunk))
+        return [transaction for round in rounds for transaction in round]
+
+    def broadcast(self, stop_on_error=False):
+        """ Sign and broadcast the recorded operations
+
+            :param bool stop_on_error: Do not broadcast the remaining
+                transactions once one has failed
+            :return: ``(results, stats)`` with one dict per transaction
+                (``account``, ``permission``, ``operations`` and a
+                ``status`` of ``ok``, with the ``result``, ``error``,
+                with the ``error``, or ``skipped``) and a dict with the
+                number of ``operations``, ``transactions``, ``failed``
+                transactions, the elapsed ``time`` and ``ops_per_sec``
+        """
+        start = time.time()
+        transactions = self.transactions()
+        results = []
+        voted = {}
+        failed = False
+        for account, permission, ops in transactions:
+            result = {
+                "account": account,
+                "permission": permission,
+                "operations": ops,
+            }
+            results.append(result)
+            if failed and stop_on_error:
+                result["status"] = "skipped"
+                continue
+            votes = any(is_vote(op) for op in ops)
+            if votes and account in voted:
+                wait = voted[account] + self.vote_interval - time.time()
+                if wait > 0:
+                    time.sleep(wait)
+            try:
+                result["result"] = self.steem.finalizeOp(
+                    ops, account, permission)
+            except Exception as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+                failed = True
+                continue
+            result["status"] = "ok"
+            if votes:
+                voted[account] = time.time()
+        elapsed = time.time() - start
+        sent = sum(len(result["operations"]) for result in results
+                   if result["status"] == "ok")
+        stats = {
+            "operations": len(self.operations),
+            "transactions": len(transactions),
+            "failed": sum(result["status"] != "ok" for result in results),
+            "time": elapsed,
+            "ops_per_sec": sent / elapsed if elapsed else 0.0,
+        }
+        self.operations = []
+        return results, stats
@@ -0,0 +1,313 @@
+""" Opt-in on-disk cache for immutable chain data
+
+    Responses that can no longer change are kept in an sqlite database
+    next to piston's configuration storage, keyed by chain ID, API
+    method and parameters (so that STEEM and GOLOS data never mix):
+
+    * ``get_block`` and ``get_ops_in_block`` for irreversible blocks,
+    * ``get_account_history`` pages that end at a given index and only
+      contain irreversible operations.
+
+    Posts are not cached: even after their payout, replies, votes and
+    edits keep changing them.
+
+    Whether a block is irreversible is checked against the
+    ``last_irreversible_block_num`` of the dynamic global properties.
+    The cache is enabled with ``piston set cache true``. It is limited
+    by ``cache_max_size`` (in MB) and ``cache_max_age`` (in days), least
+    recently used entries are evicted first. Hits and misses are
+    counted per method (``piston cache stats``).
+"""
+import os
+import json
+import time
+import atexit
+import sqlite3
+import threading
+from .storage import configStorage as config
+from .nodes import rpc_method
+
+#: Default maximum size of the cache in MB
+MAX_SIZE = 100
+
+#: Default maximum age of cached entries in days
+MAX_AGE = 30
+
+#: Seconds until the last irreversible block number is looked up again
+LIB_REFRESH = 3
+
+#: Evict entries after this many writes
+EVICT_EVERY = 100
+
+
+def enabled():
+    """ Has the cache been enabled in the configuration?
+    """
+    return str(config["cache"]).lower() in ["true", "1", "yes", "on"]
+
+
+def cache_path():
+    return os.path.join(config.data_dir, "rpc_cache.sqlite")
+
+
+def chain_id(rpc, rpcexec):
+    """ Chain ID of the node behind ``rpc``
+
+        Taken from the chain parameters piston looked up when it
+        connected, or asked from the node (``get_config``).
+    """
+    params = getattr(rpc, "chain_params", None)
+    if isinstance(params, dict) and params.get("chain_id"):
+        return params["chain_id"]
+    node_config = rpcexec({
+        "method": "call",
+        "params": ["database_api", "get_config", []],
+        "jsonrpc": "2.0",
+        "id": 0
+    })
+    for key, value in (node_config or {}).items():
+        if key.endswith("_CHAIN_ID"):
+            return value
+    return None
+
+
+class RPCCache(object):
+    """ sqlite backed cache of RPC responses
+
+        :param str path: Database file (defaults to ``rpc_cache.sqlite``
+            in piston's data directory)
+        :param float max_size: Maximum size in MB
+        :param float max_age: Maximum age in days
+    """
+    def __init__(self, path=None, max_size=None, max_age=None):
+        self.path = path or cache_path()
+        self.max_size = float(max_size or config["cache_max_size"] or MAX_SIZE) * 1024 * 1024
+        self.max_age = float(max_age or config["cache_max_age"] or MAX_AGE) * 24 * 60 * 60
+        self.mutex = threading.RLock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                method TEXT,
+                value TEXT,
+                size INTEGER,
+                created REAL,
+                accessed REAL
+            );
+            CREATE TABLE IF NOT EXISTS stats (
+                method TEXT PRIMARY KEY,
+                hits INTEGER,
+                misses INTEGER
+            );
+        """)
+        self.counts = {}
+        self.writes = 0
+        self.lib = 0
+        self.lib_updated = 0
+
+    @staticmethod
+    def key(method, params, chain=None):
+        return json.dumps([chain, method, params], sort_keys=True)
+
+    def get(self, method, params, chain=None):
+        """ Cached response of ``method(*params)`` on the chain ``chain``
+
+            :return: ``(found, value)``
+        """
+        key = self.key(method, params, chain)
+        with self.mutex:
+            row = self.connection.execute(
+                "SELECT value, created FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row and now - row[1] > self.max_age:
+                self.connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                row = None
+            if row:
+                self.connection.execute(
+                    "UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+            self.count(method, hit=bool(row))
+        if row:
+            return True, json.loads(row[0])
+        return False, None
+
+    def put(self, method, params, value, chain=None):
+        """ Store the response ``value`` of ``method(*params)`` on the
+            chain ``chain``
+        """
+        key = self.key(method, params, chain)
+        data = json.dumps(value)
+        now = time.time()
+        with self.mutex:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, method, data, len(data), now, now))
+            self.connection.commit()
+            self.writes += 1
+            if self.writes % EVICT_EVERY == 0:
+                self.evict()
+
+    def count(self, method, hit):
+        hits, misses = self.counts.get(method, (0, 0))
+        self.counts[method] = (hits + hit, misses + (not hit))
+
+    def evict(self):
+        """ Remove expired entries and the least recently used ones
+            above the size limit
+        """
+        with self.mutex:
+            self.connection.execute(
+                "DELETE FROM cache WHERE created < ?",
+                (time.time() - self.max_age,))
+            size = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if size > self.max_size:
+                excess = size - self.max_size
+                rows = self.connection.execute(
+                    "SELECT key, size FROM cache ORDER BY accessed")
+                remove = []
+                for key, entry_size in rows:
+                    if excess <= 0:
+                        break
+                    remove.append((key,))
+                    excess -= entry_size
+                self.connection.executemany(
+                    "DELETE FROM cache WHERE key = ?", remove)
+            self.connection.commit()
+
+    def flush(self):
+        """ Add the hits and misses counted so far to the statistics
+        """
+        with self.mutex:
+            for method, (hits, misses) in self.counts.items():
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO stats VALUES (?, 0, 0)", (method,))
+                self.connection.execute(
+                    "UPDATE stats SET hits = hits + ?, misses = misses + ? "
+                    "WHERE method = ?", (hits, misses, method))
+            self.connection.commit()
+            self.counts = {}
+
+    def close(self):
+        with self.mutex:
+            self.flush()
+            self.evict()
+            self.connection.close()
+
+    def stats(self):
+        """ Hits, misses, entries and size per method
+
+            :rtype: list of dicts
+        """
+        self.flush()
+        with self.mutex:
+            stats = {
+                method: {"method": method, "hits": hits, "misses": misses,
+                         "entries": 0, "size": 0}
+                for method, hits, misses in self.connection.execute(
+                    "SELECT method, hits, misses FROM stats")
+            }
+            for method, entries, size in self.connection.execute(
+                    "SELECT method, COUNT(*), SUM(size) FROM cache GROUP BY method"):
+                stats.setdefault(method, {"method": method, "hits": 0, "misses": 0})
+                stats[method].update({"entries": entries, "size": size})
+        return [stats[method] for method in sorted(stats)]
+
+    def clear(self):
+        with self.mutex:
+            self.connection.execute("DELETE FROM cache")
+            self.connection.execute("DELETE FROM stats")
+            self.connection.commit()
+            self.counts = {}
+
+    def last_irreversible_block(self, rpcexec, block=None):
+        """ The last irreversible block number
+
+            It is looked up again (at most every :data:`LIB_REFRESH`
+            seconds) if ``block`` is newer than the one known.
+        """
+        with self.mutex:
+            stale = time.time() - self.lib_updated > LIB_REFRESH
+            if stale and (not self.lib or (block is not None and block > self.lib)):
+                props = rpcexec({
+                    "method": "call",
+                    "params": ["database_api", "get_dynamic_global_properties", []],
+                    "jsonrpc": "2.0",
+                    "id": 0
+                })
+                self.lib = props["last_irreversible_block_num"]
+                self.lib_updated = time.time()
+            return self.lib
+
+    def cacheable(self, method, params, value, rpcexec):
+        """ Can the response ``value`` of ``method(*params)`` never change?
+        """
+        if not value:
+            return False
+        if method in ["get_block", "get_ops_in_block"]:
+            block = int(params[0])
+            return block <= self.last_irreversible_block(rpcexec, block)
+        if method == "get_account_history":
+            start = int(params[1])
+            if start < 0 or value[-1][0] != start:
+                # Pages that end with the latest entry may still grow
+                return False
+            block = max(entry[1]["block"] for entry in value)
+            return block <= self.last_irreversible_block(rpcexec, block)
+        return False
+
+    def attach(self, steem):
+        """ Serve the cacheable calls of ``steem`` from the cache
+        """
+        rpc = steem.rpc
+        rpcexec = rpc.rpcexec
+        # Looked up on the first cacheable call
+        chain = []
+
+        def cached_rpcexec(payload):
+            method = rpc_method(payload)
+            if method not in cached_methods:
+                return rpcexec(payload)
+            if not chain:
+                chain.append(chain_id(rpc, rpcexec))
+            params = payload["params"][2] if payload.get("method") == "call" else payload.get("params")
+            found, value = self.get(method, params, chain[0])
+            if found:
+                return value
+            value = rpcexec(payload)
+            if self.cacheable(method, params, value, rpcexec):
+                self.put(method, params, value, chain[0])
+            return value
+
+        rpc.rpcexec = cached_rpcexec
+        return steem
+
+
+#: Methods whose responses may be cached
+cached_methods = [
+    "get_block",
+    "get_ops_in_block",
+    "get_account_history",
+]
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def instance():
+    """ The process-wide :class:`RPCCache`, closed when the process exits
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RPCCache()
+            atexit.register(_cache.close)
+        return _cache
+
+
+def attach(steem):
+    """ Attach the cache to ``steem`` if it has been enabled
+    """
+    if not enabled() or getattr(steem, "rpc", None) is None:
+        return steem
+    return instance().attach(steem)
@@ -0,0 +1,196 @@
+""" Registry of all sub-commands of the ``piston`` executable
+
+    Each command lives in one of the modules of this package. A module
+    provides ``parser_<command>(parser)`` to add the command's arguments
+    to its sub-parser and ``command_<command>(steem, args)`` to run it.
+
+    Modules are only imported once their command has been selected on
+    the command line, so that e.g. ``piston config`` does not pay for
+    loading the blockchain libraries.
+"""
+import importlib
+from ..storage import configStorage as config
+from collections import OrderedDict, namedtuple
+
+#: A registered command: ``module`` is relative to this package,
+#: ``rpc`` tells whether the command requires a
+#: :class:`piston.steem.Steem` instance to run, ``interactive`` whether it
+#: prompts the user (terminal, editor, stdin) and ``wallet`` whether it
+#: needs the unlocked wallet to sign or decrypt
+Command = namedtuple("Command", ["name", "module", "help", "rpc",
+                                 "interactive", "wallet"])
+
+registry = OrderedDict()
+
+
+def register(name, module, help, rpc=True, interactive=False, wallet=False):
+    registry[name] = Command(name, module, help, rpc, interactive, wallet)
+
+
+register("set", "config", "Set configuration", rpc=False)
+register("config", "config", "Show local configuration", rpc=False)
+register("info", "info", "Show infos about piston and Steem")
+register("changewalletpassphrase", "wallet", "Change wallet password",
+         interactive=True, wallet=True)
+register("addkey", "wallet", "Add a new key to the wallet",
+         interactive=True, wallet=True)
+register("delkey", "wallet", "Delete keys from the wallet",
+         interactive=True, wallet=True)
+register("getkey", "wallet", "Dump the privatekey of a pubkey from the wallet",
+         interactive=True, wallet=True)
+register("listkeys", "wallet", "List available keys in your wallet")
+register("listaccounts", "wallet", "List available accounts in your wallet")
+register("list", "posts", "List posts on Steem")
+register("categories", "posts", "Show categories")
+register("read", "posts", "Read a post on Steem")
+register("post", "posts", "Post something new",
+         interactive=True, wallet=True)
+register("reply", "posts", "Reply to an existing post",
+         interactive=True, wallet=True)
+register("edit", "posts", "Edit to an existing post",
+         interactive=True, wallet=True)
+register("upvote", "posts", "Upvote a post",
+         wallet=True)
+register("downvote", "posts", "Downvote a post",
+         wallet=True)
+register("replies", "posts", "Show recent replies to your posts")
+register("transfer", "account", "Transfer STEEM",
+         wallet=True)
+register("powerup", "account", "Power up (vest STEEM as STEEM POWER)",
+         wallet=True)
+register("powerdown", "account", "Power down (start withdrawing STEEM from piston POWER)",
+         wallet=True)
+register("powerdownroute", "account", "Setup a powerdown route",
+         wallet=True)
+register("convert", "account", "Convert STEEMDollars to Steem (takes a week to settle)",
+         wallet=True)
+register("balance", "account", "Show the balance of one more more accounts")
+register("history", "account", "Show the history of an account",
+         wallet=True)
+register("interest", "account", "Get information about interest payment")
+register("permissions", "account", "Show permissions of an account")
+register("allow", "account", "Allow an account/key to interact with your account",
+         interactive=True, wallet=True)
+register("disallow", "account", "Remove allowance an account/key to interact with your account",
+         wallet=True)
+register("newaccount", "account", "Create a new account",
+         interactive=True, wallet=True)
+register("importaccount", "wallet", "Import an account using a passphrase",
+         interactive=True, wallet=True)
+register("updatememokey", "account", "Update an account's memo key",
+         interactive=True, wallet=True)
+register("approvewitness", "witness", "Approve a witnesses",
+         wallet=True)
+register("disapprovewitness", "witness", "Disapprove a witnesses",
+         wallet=True)
+register("sign", "wallet", "Sign a provided transaction with available and required keys",
+         interactive=True, wallet=True)
+register("broadcast", "wallet", "broadcast a signed transaction",
+         interactive=True)
+register("orderbook", "market", "Obtain orderbook of the internal market")
+register("buy", "market", "Buy STEEM or SBD from the internal market",
+         wallet=True)
+register("sell", "market", "Sell STEEM or SBD from the internal market",
+         wallet=True)
+register("cancel", "market", "Cancel order in the internal market",
+         wallet=True)
+register("resteem", "posts", "Resteem an existing post",
+         wallet=True)
+register("follow", "account", "Follow another account",
+         wallet=True)
+register("unfollow", "account", "unfollow another account",
+         wallet=True)
+register("setprofile", "account", "Set a variable in an account's profile",
+         wallet=True)
+register("delprofile", "account", "Set a variable in an account's profile",
+         wallet=True)
+register("witnessupdate", "witness", "Change witness properties",
+         wallet=True)
+register("witnesscreate", "witness", "Create a witness",
+         wallet=True)
+register("nodes", "nodes", "Benchmark the latency and throughput of API nodes",
+         rpc=False)
+register("cache", "cache", "Show statistics of or clear the local cache of chain data",
+         rpc=False)
+register("daemon", "session", "Keep the connection and the unlocked wallet open for other piston calls",
+         rpc=False, interactive=True)
+register("shell", "session", "Interactive shell that runs commands over one connection and wallet",
+         rpc=False, interactive=True)
+register("batch", "session", "Run the commands listed in a file over one session",
+         rpc=False)
+register("bundle", "session", "Sign and broadcast the votes, transfers, follows, resteems and witness votes listed in a file in as few transactions as possible",
+         interactive=True, wallet=True)
+
+
+def load(name):
+    """ Import the module that provides command ``name``
+
+        :param str name: Name of the command
+        :return: module object
+    """
+    return importlib.import_module("." + registry[name].module, __name__)
+
+
+def add_arguments(name, parser):
+    """ Add the arguments of command ``name`` to its sub-parser
+    """
+    getattr(load(name), "parser_" + name)(parser)
+
+
+def run(name, steem, args):
+    """ Run command ``name``
+
+        :param str name: Name of the command
+        :param piston.steem.Steem steem: Steem instance (``None`` for
+            commands that do not require RPC)
+        :param argparse.Namespace args: Parsed arguments
+    """
+    return getattr(load(name), "command_" + name)(steem, args)
+
+
+#: Global options whose defaults are only read from the configuration
+#: once a connection is actually made
+globalConfigurationKeys = ["node", "rpcuser", "rpcpassword"]
+
+
+def steem_options(args):
+    """ Keyword arguments for :class:`piston.steem.Steem` derived from
+        the global command line options
+
+        :param argparse.Namespace args: Parsed arguments
+        :rtype: dict
+    """
+    for key in globalConfigurationKeys:
+        if getattr(args, key) is None:
+            setattr(args, key, config[key])
+
+    options = {
+        "node": args.node,
+        "rpcuser": args.rpcuser,
+        "rpcpassword": args.rpcpassword,
+        "nobroadcast": args.nobroadcast,
+        "unsigned": args.unsigned,
+        "expires": args.expires
+    }
+
+    # preload wallet with empty keys
+    if args.nowallet:
+        options.update({"wif": []})
+
+    # Signing only requires the wallet, no connection
+    # essential for offline/coldstorage signing
+    if args.command == "sign":
+        options.update({"offline": True})
+
+    return options
+
+
+def connect(args):
+    """ Instantiate :class:`piston.steem.Steem` from the global options
+
+        If more than one node is given, the connection is made to the
+        fastest one (see :mod:`pistoncli.nodes`). Immutable data is read
+        from the cache if enabled (see :mod:`pistoncli.cache`).
+    """
+    from .. import nodes, cache
+    return cache.attach(nodes.connect(steem_options(args)))
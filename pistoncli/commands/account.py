@@ -0,0 +1,879 @@
+import os
+import sys
+import json
+import argparse
+from pprint import pprint
+from collections import OrderedDict
+from prettytable import PrettyTable
+from ..storage import configStorage as config
+from piston.utils import strfage
+from piston.account import Account
+from ..ui import (
+    format_operation_details,
+    print_permissions,
+    get_terminal
+)
+from ..table import StreamingTable
+from .. import history
+from ..memos import MemoDecoder
+from ..summary import Summary
+from ..pool import ReaderPool
+from . import steem_options
+
+
+def parser_transfer(parser):
+    parser.add_argument(
+        'to',
+        type=str,
+        help='Recepient'
+    )
+    parser.add_argument(
+        'amount',
+        type=float,
+        help='Amount to transfer'
+    )
+    parser.add_argument(
+        'asset',
+        type=str,
+        choices=["STEEM", "SBD", "GOLOS", "GBG"],
+        help='Asset to transfer (i.e. STEEM or SDB)'
+    )
+    parser.add_argument(
+        'memo',
+        type=str,
+        nargs="?",
+        default="",
+        help='Optional memo'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Transfer from this account'
+    )
+
+
+def command_transfer(steem, args):
+    pprint(steem.transfer(
+        args.to,
+        args.amount,
+        args.asset,
+        memo=args.memo,
+        account=args.account
+    ))
+
+
+def parser_powerup(parser):
+    parser.add_argument(
+        'amount',
+        type=str,
+        help='Amount of VESTS to powerup'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Powerup from this account'
+    )
+    parser.add_argument(
+        '--to',
+        type=str,
+        required=False,
+        default=None,
+        help='Powerup this account'
+    )
+
+
+def command_powerup(steem, args):
+    pprint(steem.transfer_to_vesting(
+        args.amount,
+        account=args.account,
+        to=args.to
+    ))
+
+
+def parser_powerdown(parser):
+    parser.add_argument(
+        'amount',
+        type=str,
+        help='Amount of VESTS to powerdown'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='powerdown from this account'
+    )
+
+
+def command_powerdown(steem, args):
+    pprint(steem.withdraw_vesting(
+        args.amount,
+        account=args.account,
+    ))
+
+
+def parser_powerdownroute(parser):
+    parser.add_argument(
+        'to',
+        type=str,
+        default=config["default_author"],
+        help='The account receiving either VESTS/SteemPower or STEEM.'
+    )
+    parser.add_argument(
+        '--percentage',
+        type=float,
+        default=100,
+        help='The percent of the withdraw to go to the "to" account'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        default=config["default_author"],
+        help='The account which is powering down'
+    )
+    parser.add_argument(
+        '--auto_vest',
+        action='store_true',
+        help=('Set to true if the from account should receive the VESTS as'
+              'VESTS, or false if it should receive them as STEEM.')
+    )
+
+
+def command_powerdownroute(steem, args):
+    pprint(steem.set_withdraw_vesting_route(
+        args.to,
+        percentage=args.percentage,
+        account=args.account,
+        auto_vest=args.auto_vest
+    ))
+
+
+def parser_convert(parser):
+    parser.add_argument(
+        'amount',
+        type=float,
+        help='Amount of SBD to convert'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Convert from this account'
+    )
+
+
+def command_convert(steem, args):
+    pprint(steem.convert(
+        args.amount,
+        account=args.account,
+    ))
+
+
+#: Number of accounts requested per get_accounts call
+ACCOUNTS_PER_CALL = 100
+
+
+def parser_balance(parser):
+    parser.add_argument(
+        'account',
+        type=str,
+        nargs="*",
+        default=config["default_author"],
+        help='balance of these account (multiple accounts allowed)'
+    )
+    parser.add_argument(
+        '--file',
+        type=argparse.FileType('r'),
+        default=None,
+        help='Read account names from this file, one per line ("-" for stdin)'
+    )
+
+
+def _read_accounts(fp):
+    """ Account names listed in ``fp`` (one per line, ``#`` comments)
+    """
+    names = [line.split("#")[0].strip().lstrip("@") for line in fp]
+    return [name for name in names if name]
+
+
+def get_balances(steem, accounts):
+    """ Balances of many ``accounts`` with bulk ``get_accounts`` calls
+
+        The dynamic global properties (for the VESTS to STEEM
+        conversion) are read once.
+
+        :return: dict of account name and balances in the format of
+            :meth:`piston.steem.Steem.get_balances`
+    """
+    from piston.amount import Amount
+    info = steem.rpc.get_dynamic_global_properties()
+    steem_per_mvest = (
+        Amount(info["total_vesting_fund_steem"]).amount /
+        (Amount(info["total_vesting_shares"]).amount / 1e6)
+    )
+    symbol = steem.symbol("STEEM")
+    balances = {}
+    for i in range(0, len(accounts), ACCOUNTS_PER_CALL):
+        for a in steem.rpc.get_accounts(accounts[i:i + ACCOUNTS_PER_CALL]):
+            if not a:
+                continue
+            vesting_shares = Amount(a["vesting_shares"])
+            balances[a["name"]] = {
+                "balance": Amount(a["balance"]),
+                "sbd_balance": Amount(a["sbd_balance"]),
+                "vesting_shares": vesting_shares,
+                "vesting_shares_steem": Amount(
+                    vesting_shares.amount / 1e6 * steem_per_mvest, symbol),
+                "savings_balance": Amount(a["savings_balance"]),
+                "savings_sbd_balance": Amount(a["savings_sbd_balance"]),
+            }
+    return balances
+
+
+def command_balance(steem, args):
+    if not isinstance(args.account, list):
+        # Only fall back to the default author if no file is given
+        args.account = [] if args.file or not args.account else [args.account]
+    if args.file:
+        args.account += _read_accounts(args.file)
+    if not args.account:
+        print("No account given (and no default_author set, see "
+              "'piston set default_author <account>')", file=sys.stderr)
+        sys.exit(1)
+    # Unique, in the given order
+    accounts = list(OrderedDict.fromkeys(a.lstrip("@") for a in args.account))
+    core, debt = steem.symbol("STEEM"), steem.symbol("SBD")
+    t = PrettyTable(["Account", core, debt, "VESTS",
+                     "VESTS (in %s)" % core, "Savings (%s)" % core,
+                     "Savings (%s)" % debt])
+    t.align = "r"
+    balances = get_balances(steem, accounts)
+    for a in accounts:
+        if a not in balances:
+            continue
+        b = balances[a]
+        t.add_row([
+            a,
+            b["balance"],
+            b["sbd_balance"],
+            b["vesting_shares"],
+            b["vesting_shares_steem"],
+            b["savings_balance"],
+            b["savings_sbd_balance"]
+        ])
+    print(t)
+    missing = [a for a in accounts if a not in balances]
+    if missing:
+        print("Unknown account(s): %s" % ", ".join(missing), file=sys.stderr)
+        sys.exit(1)
+
+
+#: Column widths of the history table
+HISTORY_WIDTHS = {"#": 8, "time (block)": 30, "operation": 30, "details": 80}
+
+
+def parser_history(parser):
+    parser.add_argument(
+        'account',
+        type=str,
+        nargs="*",
+        default=config["default_author"],
+        help='History of these accounts'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=None,
+        help='Limit number of entries (defaults to the configured limit, '
+             'or all entries with --summary)'
+    )
+    parser.add_argument(
+        '--memos',
+        action='store_true',
+        help='Show (decode) memos'
+    )
+    parser.add_argument(
+        '--csv',
+        action='store_true',
+        help='Output in CSV format'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Output one JSON object per operation (JSON lines)'
+    )
+    parser.add_argument(
+        '--first',
+        type=int,
+        default=99999999999999,
+        help='Transaction number (#) of the last transaction to show.'
+    )
+    parser.add_argument(
+        '--types',
+        type=str,
+        nargs="*",
+        default=[],
+        help='Show only these operation types'
+    )
+    parser.add_argument(
+        '--exclude_types',
+        type=str,
+        nargs="*",
+        default=[],
+        help='Do not show operations of this type'
+    )
+    parser.add_argument(
+        '--counterparty',
+        type=str,
+        help='Show only operations with this account'
+    )
+    parser.add_argument(
+        '--since',
+        type=history.parse_bound,
+        help='Show only operations from this block number or date (UTC) on'
+    )
+    parser.add_argument(
+        '--until',
+        type=history.parse_bound,
+        help='Show only operations before this block number or date (UTC)'
+    )
+    parser.add_argument(
+        '--summary',
+        action='store_true',
+        help='Show operation counts, transfers per counterparty and rewards per day'
+    )
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help='Merge the histories of all accounts into one, newest first'
+    )
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        help='Store the history locally, fetching only new operations'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Number of concurrent connections for --sync and for the '
+             'histories of several accounts (defaults to 4)'
+    )
+
+
+def command_history(steem, args):
+    if isinstance(args.account, str):
+        args.account = [args.account]
+    # Unique, in the given order
+    args.account = list(OrderedDict.fromkeys(args.account))
+    if isinstance(args.types, str):
+        args.types = [args.types]
+
+    if args.sync:
+        with history.HistoryStore() as store, \
+                ReaderPool(steem_options(args), workers=args.workers) as pool:
+            for a in args.account:
+                count = store.sync(steem.rpc, a, pool=pool)
+                print("%s: %d new operations, %s stored" % (
+                    a, count, (store.synced(a) or -1) + 1), file=sys.stderr)
+        return
+
+    limit = args.limit
+    if limit is None:
+        # A summary covers the whole history unless limited explicitly
+        limit = -1 if args.summary else int(config["limit"])
+
+    store = None
+    if os.path.exists(history.history_path()):
+        store = history.HistoryStore()
+    pool = None
+    if len(args.account) > 1:
+        pool = ReaderPool(steem_options(args),
+                          workers=min(args.workers, len(args.account)))
+    pages = history.query_many(
+        steem.rpc,
+        args.account,
+        store=store,
+        pool=pool,
+        merge=args.merge and not args.summary,
+        first=args.first,
+        limit=limit,
+        only_ops=args.types,
+        exclude_ops=args.exclude_types,
+        counterparty=args.counterparty,
+        since=args.since,
+        until=args.until
+    )
+    try:
+        if args.summary:
+            print_summaries(pages, args.account, as_json=args.json)
+        else:
+            print_history(steem, args, pages)
+    finally:
+        if pool:
+            pool.shutdown(wait=False)
+        if store:
+            store.close()
+
+
+def print_history(steem, args, pages):
+    header = ["#", "time (block)", "operation", "details"]
+    widths = HISTORY_WIDTHS
+    if args.merge:
+        header.insert(0, "account")
+        widths = dict(HISTORY_WIDTHS, account=16)
+    if args.json:
+        t = None
+    elif args.csv:
+        import csv
+        t = csv.writer(sys.stdout, delimiter=";")
+        t.writerow(header)
+    else:
+        t = StreamingTable(header, widths=widths)
+    # Show the progress of exports on the terminal
+    progress = sys.stderr.isatty() and not sys.stdout.isatty()
+    memos = MemoDecoder(steem) if args.memos else False
+
+    try:
+        count = 0
+        for page in pages:
+            if memos:
+                memos.prepare(
+                    b[1]["op"][1]["memo"] for a, b in page
+                    if b[1]["op"][0] == "transfer")
+            for a, b in page:
+                if args.json:
+                    print(json.dumps(dict(b[1], account=a, index=b[0])))
+                    continue
+                row = [
+                    b[0],
+                    "%s (%s)" % (b[1]["timestamp"], b[1]["block"]),
+                    b[1]["op"][0],
+                    format_operation_details(b[1]["op"], memos=memos),
+                ]
+                if args.merge:
+                    row.insert(0, a)
+                if args.csv:
+                    t.writerow(row)
+                else:
+                    t.add_row(row)
+            sys.stdout.flush()
+            count += len(page)
+            if progress:
+                sys.stderr.write("\r%d operations" % count)
+        if progress and count:
+            sys.stderr.write("\n")
+        if not args.csv and not args.json:
+            t.close()
+    finally:
+        if memos:
+            memos.close()
+
+
+def print_summaries(pages, accounts, as_json=False):
+    summaries = OrderedDict(
+        (account, Summary(account)) for account in accounts)
+    current = None
+    for page in pages:
+        account = page[0][0]
+        if current and account != current:
+            # The histories come one after the other
+            print_summary(summaries.pop(current), as_json=as_json)
+        current = account
+        summaries[account].add([entry for _, entry in page])
+    for summary in summaries.values():
+        print_summary(summary, as_json=as_json)
+
+
+def print_summary(summary, as_json=False):
+    """ Print a :class:`pistoncli.summary.Summary`
+    """
+    result = summary.json()
+    if as_json:
+        print(json.dumps(result))
+        return
+    print("%s: %d operations" % (result["account"], result["operations"]))
+    t = PrettyTable(["Operation", "Count"])
+    t.align = "l"
+    t.align["Count"] = "r"
+    for kind, count in sorted(result["counts"].items(), key=lambda x: -x[1]):
+        t.add_row([kind, count])
+    print(t)
+    if result["transfers"]:
+        t = PrettyTable(["Counterparty", "Asset", "Sent", "Received"])
+        t.align = "r"
+        t.align["Counterparty"] = "l"
+        for row in result["transfers"]:
+            t.add_row([row["counterparty"], row["asset"],
+                       "%.3f" % row["sent"], "%.3f" % row["received"]])
+        print(t)
+    if result["rewards"]:
+        t = PrettyTable(["Day", "Asset", "Rewards"])
+        t.align = "r"
+        t.align["Day"] = "l"
+        for row in result["rewards"]:
+            t.add_row([row["day"], row["asset"], "%.3f" % row["amount"]])
+        print(t)
+
+
+def parser_interest(parser):
+    parser.add_argument(
+        'account',
+        type=str,
+        nargs="*",
+        default=config["default_author"],
+        help='Inspect these accounts'
+    )
+
+
+def command_interest(steem, args):
+    t = PrettyTable(["Account",
+                     "Last Interest Payment",
+                     "Next Payment",
+                     "Interest rate",
+                     "Interest"])
+    t.align = "r"
+    if isinstance(args.account, str):
+        args.account = [args.account]
+    for a in args.account:
+        i = steem.interest(a)
+
+        t.add_row([
+            a,
+            i["last_payment"],
+            "in %s" % strfage(i["next_payment_duration"]),
+            "%.1f%%" % i["interest_rate"],
+            "%.3f %s" % (i["interest"], steem.symbol("SBD")),
+        ])
+    print(t)
+
+
+def parser_permissions(parser):
+    parser.add_argument(
+        'account',
+        type=str,
+        nargs="?",
+        default=config["default_author"],
+        help='Account to show permissions for'
+    )
+
+
+def command_permissions(steem, args):
+    account = Account(args.account, steem_instance=steem)
+    print_permissions(account)
+
+
+def parser_allow(parser):
+    parser.add_argument(
+        '--account',
+        type=str,
+        nargs="?",
+        default=config["default_author"],
+        help='The account to allow action for'
+    )
+    parser.add_argument(
+        'foreign_account',
+        type=str,
+        nargs="?",
+        help='The account or key that will be allowed to interact as your account'
+    )
+    parser.add_argument(
+        '--permission',
+        type=str,
+        default="posting",
+        choices=["owner", "posting", "active"],
+        help=('The permission to grant (defaults to "posting")')
+    )
+    parser.add_argument(
+        '--weight',
+        type=int,
+        default=None,
+        help=('The weight to use instead of the (full) threshold. '
+              'If the weight is smaller than the threshold, '
+              'additional signatures are required')
+    )
+    parser.add_argument(
+        '--threshold',
+        type=int,
+        default=None,
+        help=('The permission\'s threshold that needs to be reached '
+              'by signatures to be able to interact')
+    )
+
+
+def command_allow(steem, args):
+    if not args.foreign_account:
+        from pistonbase.account import PasswordKey
+        pwd = get_terminal(text="Password for Key Derivation: ", confirm=True)
+        args.foreign_account = format(PasswordKey(args.account, pwd, args.permission).get_public(), "STM")
+    pprint(steem.allow(
+        args.foreign_account,
+        weight=args.weight,
+        account=args.account,
+        permission=args.permission,
+        threshold=args.threshold
+    ))
+
+
+def parser_disallow(parser):
+    parser.add_argument(
+        '--account',
+        type=str,
+        nargs="?",
+        default=config["default_author"],
+        help='The account to disallow action for'
+    )
+    parser.add_argument(
+        'foreign_account',
+        type=str,
+        help='The account or key whose allowance to interact as your account will be removed'
+    )
+    parser.add_argument(
+        '--permission',
+        type=str,
+        default="posting",
+        choices=["owner", "posting", "active"],
+        help=('The permission to remove (defaults to "posting")')
+    )
+    parser.add_argument(
+        '--threshold',
+        type=int,
+        default=None,
+        help=('The permission\'s threshold that needs to be reached '
+              'by signatures to be able to interact')
+    )
+
+
+def command_disallow(steem, args):
+    pprint(steem.disallow(
+        args.foreign_account,
+        account=args.account,
+        permission=args.permission,
+        threshold=args.threshold
+    ))
+
+
+def parser_newaccount(parser):
+    parser.add_argument(
+        'accountname',
+        type=str,
+        help='New account name'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Account that pays the fee'
+    )
+
+
+def command_newaccount(steem, args):
+    import getpass
+    while True:
+        pw = getpass.getpass("New Account Passphrase: ")
+        if not pw:
+            print("You cannot chosen an empty password!")
+            continue
+        else:
+            pwck = getpass.getpass(
+                "Confirm New Account Passphrase: "
+            )
+            if (pw == pwck):
+                break
+            else:
+                print("Given Passphrases do not match!")
+    pprint(steem.create_account(
+        args.accountname,
+        creator=args.account,
+        password=pw,
+    ))
+
+
+def parser_updatememokey(parser):
+    parser.add_argument(
+        '--account',
+        type=str,
+        nargs="?",
+        default=config["default_author"],
+        help='The account to updateMemoKey action for'
+    )
+    parser.add_argument(
+        '--key',
+        type=str,
+        default=None,
+        help='The new memo key'
+    )
+
+
+def command_updatememokey(steem, args):
+    if not args.key:
+        # Loop until both match
+        from pistonbase.account import PasswordKey
+        pw = get_terminal(text="Password for Memo Key: ", confirm=True, allowedempty=False)
+        memo_key = PasswordKey(args.account, pw, "memo")
+        args.key = format(memo_key.get_public_key(), "STM")
+        memo_privkey = memo_key.get_private_key()
+        # Add the key to the wallet
+        if not args.nobroadcast:
+            steem.wallet.addPrivateKey(memo_privkey)
+    pprint(steem.update_memo_key(
+        args.key,
+        account=args.account
+    ))
+
+
+def parser_follow(parser):
+    parser.add_argument(
+        'follow',
+        type=str,
+        help='Account to follow'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_account"],
+        help='Follow from this account'
+    )
+    parser.add_argument(
+        '--what',
+        type=str,
+        required=False,
+        nargs="*",
+        default=["blog"],
+        help='Follow these objects (defaults to "blog")'
+    )
+
+
+def command_follow(steem, args):
+    pprint(steem.follow(
+        args.follow,
+        what=args.what,
+        account=args.account
+    ))
+
+
+def parser_unfollow(parser):
+    parser.add_argument(
+        'unfollow',
+        type=str,
+        help='Account to unfollow'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_account"],
+        help='Unfollow from this account'
+    )
+    parser.add_argument(
+        '--what',
+        type=str,
+        required=False,
+        nargs="*",
+        default=[],
+        help='Unfollow these objects (defaults to "blog")'
+    )
+
+
+def command_unfollow(steem, args):
+    pprint(steem.unfollow(
+        args.unfollow,
+        what=args.what,
+        account=args.account
+    ))
+
+
+def parser_setprofile(parser):
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='setprofile as this user (requires to have the key installed in the wallet)'
+    )
+    parser_setprofileA = parser.add_argument_group('Multiple keys at once')
+    parser_setprofileA.add_argument(
+        '--pair',
+        type=str,
+        nargs='*',
+        help='"Key=Value" pairs'
+    )
+    parser_setprofileB = parser.add_argument_group('Just a single key')
+    parser_setprofileB.add_argument(
+        'variable',
+        type=str,
+        nargs='?',
+        help='Variable to set'
+    )
+    parser_setprofileB.add_argument(
+        'value',
+        type=str,
+        nargs='?',
+        help='Value to set'
+    )
+
+
+def command_setprofile(steem, args):
+    from piston.profile import Profile
+    keys = []
+    values = []
+    if args.pair:
+        for pair in args.pair:
+            key, value = pair.split("=")
+            keys.append(key)
+            values.append(value)
+    if args.variable and args.value:
+        keys.append(args.variable)
+        values.append(args.value)
+
+    profile = Profile(keys, values)
+
+    account = Account(args.account, steem_instance=steem)
+    account["json_metadata"] = Profile(
+        account["json_metadata"]
+        if account["json_metadata"]
+        else {}
+    )
+    account["json_metadata"].update(profile)
+
+    pprint(steem.update_account_profile(
+        account["json_metadata"],
+        account=args.account
+    ))
+
+
+def parser_delprofile(parser):
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='delprofile as this user (requires to have the key installed in the wallet)'
+    )
+    parser.add_argument(
+        'variable',
+        type=str,
+        nargs='*',
+        help='Variable to set'
+    )
+
+
+def command_delprofile(steem, args):
+    from piston.profile import Profile
+    account = Account(args.account, steem_instance=steem)
+    account["json_metadata"] = Profile(account["json_metadata"])
+
+    for var in args.variable:
+        account["json_metadata"].remove(var)
+
+    pprint(steem.update_account_profile(
+        account["json_metadata"],
+        account=args.account
+    ))
@@ -0,0 +1,41 @@
+from prettytable import PrettyTable
+
+
+def parser_cache(parser):
+    parser.add_argument(
+        'action',
+        type=str,
+        choices=["stats", "clear"],
+        help='Show hit/miss statistics of the cache or clear it'
+    )
+
+
+def command_cache(steem, args):
+    from .. import cache
+    rpccache = cache.RPCCache()
+    if args.action == "clear":
+        rpccache.clear()
+        rpccache.close()
+        return
+
+    t = PrettyTable(["Method", "Hits", "Misses", "Hit rate", "Entries", "Size [kB]"])
+    t.align = "r"
+    t.align["Method"] = "l"
+    rows = rpccache.stats()
+    total = {"method": "total"}
+    for key in ["hits", "misses", "entries", "size"]:
+        total[key] = sum(row[key] or 0 for row in rows)
+    for row in rows + [total]:
+        requests = row["hits"] + row["misses"]
+        t.add_row([
+            row["method"],
+            row["hits"],
+            row["misses"],
+            "%.1f%%" % (100.0 * row["hits"] / requests) if requests else "-",
+            row["entries"],
+            "%.1f" % ((row["size"] or 0) / 1024.0)
+        ])
+    rpccache.close()
+    print(t)
+    if not cache.enabled():
+        print('The cache is disabled, enable it with "piston set cache true"')
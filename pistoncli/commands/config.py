@@ -0,0 +1,57 @@
+from prettytable import PrettyTable
+from ..storage import configStorage as config
+
+
+availableConfigurationKeys = [
+    "default_author",
+    "default_voter",
+    "default_account",
+    "node",
+    "rpcuser",
+    "rpcpassword",
+    "default_vote_weight",
+    "list_sorting",
+    "categories_sorting",
+    "limit",
+    "post_category",
+    "cache",
+    "cache_max_size",
+    "cache_max_age",
+    "render_cache",
+]
+
+
+def parser_set(parser):
+    parser.add_argument(
+        'key',
+        type=str,
+        choices=availableConfigurationKeys,
+        help='Configuration key'
+    )
+    parser.add_argument(
+        'value',
+        type=str,
+        help='Configuration value'
+    )
+
+
+def command_set(steem, args):
+    if (args.key in ["default_author",
+                     "default_voter",
+                     "default_account"] and
+            args.value[0] == "@"):
+        args.value = args.value[1:]
+    config[args.key] = args.value
+
+
+def parser_config(parser):
+    pass
+
+
+def command_config(steem, args):
+    t = PrettyTable(["Key", "Value"])
+    t.align = "l"
+    for key in config:
+        if key in availableConfigurationKeys:  # hide internal config data
+            t.add_row([key, config[key]])
+    print(t)
@@ -0,0 +1,279 @@
+import re
+import sys
+import json
+from collections import OrderedDict
+from concurrent.futures import Future
+from prettytable import PrettyTable
+from piston.amount import Amount
+from piston.post import Post
+from piston.blockchain import Blockchain
+from . import steem_options
+from ..pool import ReaderPool
+
+
+def parser_info(parser):
+    parser.add_argument(
+        'objects',
+        nargs='*',
+        type=str,
+        help='General information about the blockchain, a block, a range of blocks (e.g. 100-200), an account name, a post, a public key, ...'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Number of concurrent connections for many objects (defaults to 4). Accounts are fetched in one call, but every account needs a call of its own for its witness'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Output one JSON object per line instead of tables'
+    )
+
+
+#: Up to this many calls are made one after another on the existing
+#: connection instead of opening new ones
+INLINE_CALLS = 2
+
+
+def classify(obj):
+    """ Type of object ``obj`` refers to
+
+        :return: ``block``, ``range``, ``account``, ``key``, ``post`` or
+            ``None``
+    """
+    if re.match("^[0-9]+$", obj):
+        return "block"
+    elif re.match("^[0-9]+-[0-9]+$", obj):
+        return "range"
+    elif re.match("^[a-zA-Z0-9\-\._]{2,16}$", obj):
+        return "account"
+    elif re.match("^STM.{48,55}$", obj):
+        return "key"
+    elif re.match(".*@.{3,16}/.*$", obj):
+        return "post"
+
+
+def _call(steem, func, arg):
+    """ Run ``func(steem, arg)`` right away, wrapped in a future
+    """
+    future = Future()
+    try:
+        future.set_result(func(steem, arg))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _get_accounts(steem, names):
+    return {
+        account["name"]: account
+        for account in steem.rpc.get_accounts(names) if account
+    }
+
+
+def _get_witness(steem, name):
+    # The API looks up witnesses by account one at a time only
+    # (get_witnesses takes object ids), so these calls run concurrently
+    return steem.rpc.get_witness_by_account(name)
+
+
+def _get_key_references(steem, keys):
+    return [
+        names[0] if names else None
+        for names in steem.rpc.get_key_references(keys, api="account_by_key")
+    ]
+
+
+def _get_block(steem, number):
+    return steem.rpc.get_block(int(number))
+
+
+def block_range(obj):
+    """ Block numbers of a range ``<from>-<to>`` (both included)
+    """
+    first, last = [int(x) for x in obj.split("-")]
+    step = 1 if last >= first else -1
+    return range(first, last + step, step)
+
+
+def _get_post(steem, identifier):
+    return Post(identifier, steem_instance=steem)
+
+
+def command_info(steem, args):
+    if not args.objects:
+        t = PrettyTable(["Key", "Value"])
+        t.align = "l"
+        blockchain = Blockchain(steem_instance=steem, mode="head")
+        info = blockchain.info()
+        median_price = steem.rpc.get_current_median_history_price()
+        steem_per_mvest = (
+            Amount(info["total_vesting_fund_steem"]).amount /
+            (Amount(info["total_vesting_shares"]).amount / 1e6)
+        )
+        price = (
+            Amount(median_price["base"]).amount /
+            Amount(median_price["quote"]).amount
+        )
+        for key in info:
+            t.add_row([key, info[key]])
+        t.add_row(["steem per mvest", steem_per_mvest])
+        t.add_row(["internal price", price])
+        print(t.get_string(sortby="Key"))
+
+    objects = [(obj, classify(obj)) for obj in args.objects]
+    if not objects:
+        return
+
+    # Group the objects into as few calls as possible and run all
+    # of them concurrently
+    names = list(OrderedDict.fromkeys(
+        obj for obj, kind in objects if kind == "account"))
+    keys = list(OrderedDict.fromkeys(
+        obj for obj, kind in objects if kind == "key"))
+    calls = []
+    if names:
+        calls.append(("accounts", _get_accounts, names))
+        calls.extend(("witness", _get_witness, name) for name in names)
+    if keys:
+        calls.append(("keys", _get_key_references, keys))
+    for obj, kind in objects:
+        if kind == "block":
+            calls.append((obj, _get_block, obj))
+        elif kind == "post":
+            calls.append((obj, _get_post, obj))
+
+    pool = None
+    if len(calls) > INLINE_CALLS:
+        pool = ReaderPool(
+            steem_options(args),
+            workers=min(args.workers, len(calls))
+        )
+    futures = {}
+    for key, func, arg in calls:
+        if key == "witness":
+            key = ("witness", arg)
+        if key in futures:
+            continue
+        if pool:
+            futures[key] = pool.submit(func, arg)
+        else:
+            futures[key] = _call(steem, func, arg)
+
+    try:
+        if names:
+            accounts = futures["accounts"].result()
+        if keys:
+            references = dict(zip(keys, futures["keys"].result()))
+
+        for obj, kind in objects:
+            if kind == "block":
+                print_block(obj, futures[obj].result(), args.json)
+            elif kind == "range":
+                # Streamed through a bounded window of concurrent requests
+                numbers = block_range(obj)
+                with ReaderPool(steem_options(args), workers=args.workers) as blocks:
+                    for number, block in zip(numbers, blocks.map(_get_block, numbers)):
+                        print_block(number, block, args.json)
+            elif kind == "account":
+                account = accounts.get(obj)
+                witness = futures[("witness", obj)].result()
+                if args.json:
+                    print(json.dumps({"account": obj, "info": account, "witness": witness},
+                                     default=str))
+                    continue
+                if not account:
+                    print("Account %s unknown" % obj)
+                    continue
+                print_account(account)
+
+                # witness available?
+                if witness:
+                    t = PrettyTable(["Key", "Value"])
+                    t.align = "l"
+                    for key in sorted(witness):
+                        value = witness[key]
+                        if key in ["props",
+                                   "sbd_exchange_rate"]:
+                            value = json.dumps(value, indent=4)
+                        t.add_row([key, value])
+                    print(t)
+            elif kind == "key":
+                account = references.get(obj)
+                if args.json:
+                    print(json.dumps({"key": obj, "account": account}))
+                elif account:
+                    t = PrettyTable(["Account"])
+                    t.align = "l"
+                    t.add_row([account])
+                    print(t)
+                else:
+                    print("Public Key %s not known" % obj)
+            elif kind == "post":
+                post = futures[obj].result()
+                if args.json:
+                    print(json.dumps({"post": obj, "info": post}, default=str))
+                elif post:
+                    t = PrettyTable(["Key", "Value"])
+                    t.align = "l"
+                    for key in sorted(post):
+                        value = post[key]
+                        if (key in ["tags",
+                                    "json_metadata",
+                                    "active_votes"
+                                    ]):
+                            value = json.dumps(value, indent=4)
+                        t.add_row([key, value])
+                    print(t)
+                else:
+                    print("Post %s not known" % obj)
+            else:
+                print("Couldn't identify object to read")
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def print_block(number, block, as_json=False):
+    if as_json:
+        print(json.dumps({"block": int(number), "info": block}))
+        sys.stdout.flush()
+    elif block:
+        t = PrettyTable(["Key", "Value"])
+        t.align = "l"
+        for key in sorted(block):
+            value = block[key]
+            if key == "transactions":
+                value = json.dumps(value, indent=4)
+            t.add_row([key, value])
+        print(t)
+    else:
+        print("Block number %s unknown" % number)
+
+
+def print_account(account):
+    from math import log10
+    t = PrettyTable(["Key", "Value"])
+    t.align = "l"
+    for key in sorted(account):
+        value = account[key]
+        if (key == "json_metadata"):
+            value = json.dumps(
+                json.loads(value or "{}"),
+                indent=4
+            )
+        if key in ["posting",
+                   "witness_votes",
+                   "active",
+                   "owner"]:
+            value = json.dumps(value, indent=4)
+        if key == "reputation" and int(value) > 0:
+            value = int(value)
+            rep = (max(log10(value) - 9, 0) * 9 + 25 if value > 0
+                   else max(log10(-value) - 9, 0) * -9 + 25)
+            value = "{:.2f} ({:d})".format(
+                rep, value
+            )
+        t.add_row([key, value])
+    print(t)
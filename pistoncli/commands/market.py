@@ -0,0 +1,175 @@
+import sys
+from pprint import pprint
+from prettytable import PrettyTable
+from ..storage import configStorage as config
+from piston.dex import Dex
+
+
+def parser_orderbook(parser):
+    parser.add_argument(
+        '--chart',
+        action='store_true',
+        help="Enable charting (requires matplotlib)"
+    )
+
+
+def command_orderbook(steem, args):
+    if args.chart:
+        try:
+            import numpy
+            import Gnuplot
+            from itertools import accumulate
+        except:
+            print("To use --chart, you need gnuplot and gnuplot-py installed")
+            sys.exit(1)
+    dex = Dex(steem)
+    orderbook = dex.returnOrderBook()
+
+    if args.chart:
+        g = Gnuplot.Gnuplot()
+        g.title("Steem internal market - SBD:STEEM")
+        g.xlabel("price in SBD")
+        g.ylabel("volume")
+        g("""
+            set style data line
+            set term xterm
+            set border 15
+        """)
+        xbids = [x["price"] for x in orderbook["bids"]]
+        ybids = list(accumulate([x["sbd"] for x in orderbook["bids"]]))
+        dbids = Gnuplot.Data(xbids, ybids, with_="lines")
+        xasks = [x["price"] for x in orderbook["asks"]]
+        yasks = list(accumulate([x["sbd"] for x in orderbook["asks"]]))
+        dasks = Gnuplot.Data(xasks, yasks, with_="lines")
+        g("set terminal dumb")
+        g.plot(dbids, dasks)  # write SVG data directly to stdout ...
+
+    t = {}
+    # Bid side
+    bidssteem = 0
+    bidssbd = 0
+    t["bids"] = PrettyTable([
+        "SBD", "sum SBD", "STEEM", "sum STEEM", "price"
+    ])
+    for i, o in enumerate(orderbook["asks"]):
+        bidssbd += orderbook["bids"][i]["sbd"]
+        bidssteem += orderbook["bids"][i]["steem"]
+        t["bids"].add_row([
+            "%.3f Ṩ" % orderbook["bids"][i]["sbd"],
+            "%.3f ∑" % bidssbd,
+            "%.3f ȿ" % orderbook["bids"][i]["steem"],
+            "%.3f ∑" % bidssteem,
+            "%.3f Ṩ/ȿ" % orderbook["bids"][i]["price"],
+        ])
+
+    # Ask side
+    askssteem = 0
+    askssbd = 0
+    t["asks"] = PrettyTable([
+        "price", "STEEM", "sum STEEM", "SBD", "sum SBD"
+    ])
+    for i, o in enumerate(orderbook["asks"]):
+        askssbd += orderbook["asks"][i]["sbd"]
+        askssteem += orderbook["asks"][i]["steem"]
+        t["asks"].add_row([
+            "%.3f Ṩ/ȿ" % orderbook["asks"][i]["price"],
+            "%.3f ȿ" % orderbook["asks"][i]["steem"],
+            "%.3f ∑" % askssteem,
+            "%.3f Ṩ" % orderbook["asks"][i]["sbd"],
+            "%.3f ∑" % askssbd
+        ])
+
+    book = PrettyTable(["bids", "asks"])
+    book.add_row([t["bids"], t["asks"]])
+    print(book)
+
+
+def _add_order_arguments(parser, side):
+    parser.add_argument(
+        'amount',
+        type=float,
+        help='Amount to %s' % side
+    )
+    parser.add_argument(
+        'asset',
+        type=str,
+        choices=["STEEM", "SBD", "GOLOS", "GBG"],
+        help='Asset to %s (i.e. STEEM or SDB)' % side
+    )
+    parser.add_argument(
+        'price',
+        type=float,
+        help='Limit %s price denoted in (SBD per STEEM)' % side
+    )
+
+
+def parser_buy(parser):
+    _add_order_arguments(parser, "buy")
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_account"],
+        help='Buy with this account (defaults to "default_account")'
+    )
+
+
+def command_buy(steem, args):
+    if args.asset == steem.symbol("SBD"):
+        price = 1.0 / args.price
+    else:
+        price = args.price
+    dex = Dex(steem)
+    pprint(dex.buy(
+        args.amount,
+        args.asset,
+        price,
+        account=args.account
+    ))
+
+
+def parser_sell(parser):
+    _add_order_arguments(parser, "sell")
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_account"],
+        help='Sell from this account (defaults to "default_account")'
+    )
+
+
+def command_sell(steem, args):
+    if args.asset == steem.symbol("SBD"):
+        price = 1.0 / args.price
+    else:
+        price = args.price
+    dex = Dex(steem)
+    pprint(dex.sell(
+        args.amount,
+        args.asset,
+        price,
+        account=args.account
+    ))
+
+
+def parser_cancel(parser):
+    parser.add_argument(
+        'orderid',
+        type=int,
+        help='Orderid'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_account"],
+        help='Cancel from this account (defaults to "default_account")'
+    )
+
+
+def command_cancel(steem, args):
+    dex = Dex(steem)
+    pprint(
+        dex.cancel(args.orderid)
+    )
@@ -0,0 +1,114 @@
+import sys
+import json
+from prettytable import PrettyTable
+from ..storage import configStorage as config
+from .. import nodes
+
+
+def parser_nodes(parser):
+    parser.add_argument(
+        'action',
+        type=str,
+        choices=["bench"],
+        help='Action to perform (bench: measure latency and throughput)'
+    )
+    parser.add_argument(
+        'nodes',
+        type=str,
+        nargs="*",
+        help='Websocket endpoints (defaults to the configured node(s))'
+    )
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=20,
+        help='Connections and calls per method for the latency percentiles (defaults to 20)'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='Connections used to measure the throughput (defaults to 4)'
+    )
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=5,
+        help='Seconds to measure the throughput for, 0 to skip (defaults to 5)'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        default=config["default_account"] or "steemit",
+        help='Account used for get_accounts'
+    )
+    parser.add_argument(
+        '--post',
+        type=str,
+        default="@xeroc/piston-readme",
+        help='@author/permlink used for get_content_replies'
+    )
+    parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Output as JSON'
+    )
+
+
+def command_nodes(steem, args):
+    from ..nodebench import bench, PERCENTILES
+
+    urls = args.nodes or nodes.parse_nodes(args.node or config["node"])
+    results = []
+    for url in urls:
+        try:
+            results.append(bench(
+                url,
+                runs=args.runs,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                account=args.account,
+                post=args.post,
+            ))
+        except Exception as e:
+            results.append({
+                "node": url,
+                "error": "%s: %s" % (type(e).__name__, str(e))
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=4))
+    else:
+        columns = ["p%d [ms]" % p for p in PERCENTILES]
+        t = PrettyTable(["Node", "Call"] + columns)
+        t.align = "r"
+        t.align["Node"] = "l"
+        t.align["Call"] = "l"
+        for result in results:
+            if "error" in result:
+                t.add_row([result["node"], result["error"]] + [""] * len(columns))
+                continue
+            rows = [("connect", result["connect"])] + list(result["calls"].items())
+            for name, stats in rows:
+                t.add_row([result["node"], name] +
+                          [stats["p%d" % p] for p in PERCENTILES])
+        print(t)
+
+        t = PrettyTable(["Node", "Concurrency", "Calls", "Calls/s", "Errors"])
+        t.align = "r"
+        t.align["Node"] = "l"
+        for result in results:
+            if "throughput" in result:
+                throughput = result["throughput"]
+                t.add_row([
+                    result["node"],
+                    throughput["concurrency"],
+                    throughput["calls"],
+                    throughput["calls_per_sec"],
+                    result["errors"],
+                ])
+        if any("throughput" in result for result in results):
+            print(t)
+
+    if any("error" in result for result in results):
+        sys.exit(1)
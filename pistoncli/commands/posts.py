@@ -0,0 +1,565 @@
+import itertools
+from pprint import pprint
+import frontmatter
+from ..storage import configStorage as config
+from piston.utils import (
+    resolveIdentifier,
+    yaml_parse_file,
+)
+from piston.amount import Amount
+from piston.post import Post
+from . import steem_options
+from ..pool import ReaderPool
+from ..discussion import Discussion, identifier
+from .. import rendercache
+from ..table import StreamingTable
+from ..pipeline import threaded
+from ..ui import (
+    dump_recursive_parents,
+    dump_recursive_comments,
+    list_posts,
+)
+
+#: Posts per call when ``piston list`` pages (the API's maximum)
+PAGE_SIZE = 100
+
+
+def parser_list(parser):
+    parser.add_argument(
+        '--start',
+        type=str,
+        help='Start list from this identifier (pagination)'
+    )
+    parser.add_argument(
+        '--category',
+        type=str,
+        help='Only posts with in this category'
+    )
+    parser.add_argument(
+        '--sort',
+        type=str,
+        default=config["list_sorting"],
+        choices=["trending", "created", "active", "cashout", "payout", "votes", "children", "hot"],
+        help='Sort posts'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=config["limit"],
+        help='Limit posts by number'
+    )
+    parser.add_argument(
+        '--columns',
+        type=str,
+        nargs="+",
+        help='Display custom columns'
+    )
+    parser.add_argument(
+        '--all',
+        action='store_true',
+        help='List all posts (fetched page by page)'
+    )
+
+
+def get_posts_pages(steem, sort, category=None, start=None, limit=None):
+    """ Yield the posts of ``steem.get_posts()`` page by page
+
+        Pages of at most :data:`PAGE_SIZE` posts are requested until
+        ``limit`` posts (or, with ``limit=None``, all posts) are known.
+        Every page starts at the last post of the previous one, so
+        posts of the previous page are skipped.
+    """
+    seen = set()
+    while limit is None or limit > 0:
+        size = PAGE_SIZE if limit is None else min(limit + bool(seen), PAGE_SIZE)
+        page = steem.get_posts(
+            limit=size,
+            sort=sort,
+            category=category,
+            start=start
+        )
+        posts = [post for post in page if identifier(post) not in seen]
+        if limit is not None:
+            posts = posts[:limit]
+            limit -= len(posts)
+        if posts:
+            yield posts
+        if len(page) < size or not posts:
+            return
+        seen = set(identifier(post) for post in page)
+        start = "@" + identifier(page[-1])
+
+
+def command_list(steem, args):
+    if not args.all and (args.limit is None or int(args.limit) <= PAGE_SIZE):
+        list_posts(
+            steem.get_posts(
+                limit=args.limit,
+                sort=args.sort,
+                category=args.category,
+                start=args.start
+            ),
+            args.columns
+        )
+        return
+    # The next page is fetched while the current one is printed
+    pages = threaded(get_posts_pages(
+        steem,
+        args.sort,
+        category=args.category,
+        start=args.start,
+        limit=None if args.all else int(args.limit)
+    ), maxsize=1)
+    list_posts(itertools.chain.from_iterable(pages), args.columns)
+
+
+def parser_categories(parser):
+    parser.add_argument(
+        '--sort',
+        type=str,
+        default=config["categories_sorting"],
+        choices=["trending", "best", "active", "recent"],
+        help='Sort categories'
+    )
+    parser.add_argument(
+        'category',
+        nargs="?",
+        type=str,
+        help='Only categories used by this author'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=config["limit"],
+        help='Limit categories by number'
+    )
+
+
+def command_categories(steem, args):
+    categories = steem.get_categories(
+        sort=args.sort,
+        begin=args.category,
+        limit=args.limit
+    )
+    with StreamingTable(["name", "discussions", "payouts"]) as t:
+        for category in categories:
+            t.add_row([
+                category["name"],
+                category["discussions"],
+                category["total_payouts"],
+            ])
+
+
+def parser_read(parser):
+    parser.add_argument(
+        'post',
+        type=str,
+        help='@author/permlink-identifier of the post to read (e.g. @xeroc/python-steem-0-1)'
+    )
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Show full header information (YAML formated)'
+    )
+    parser.add_argument(
+        '--comments',
+        action='store_true',
+        help='Also show all comments'
+    )
+    parser.add_argument(
+        '--parents',
+        type=int,
+        default=0,
+        help='Show x parents for the reply'
+    )
+    parser.add_argument(
+        '--format',
+        type=str,
+        default=config["format"],
+        help='Format post',
+        choices=["markdown", "raw"],
+    )
+    parser.add_argument(
+        '--max-depth',
+        type=int,
+        default=None,
+        help='Only show comments up to this depth (1: direct replies only)'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=None,
+        help='Only show this many comments'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Number of concurrent connections to fetch comments (defaults to 4)'
+    )
+
+
+def command_read(steem, args):
+    post_author, post_permlink = resolveIdentifier(args.post)
+    pool = None
+    if args.comments:
+        pool = ReaderPool(steem_options(args), workers=args.workers)
+    discussion = Discussion(steem.rpc, pool=pool)
+    if args.parents and args.comments:
+        # The discussion state, fetched for --comments anyway, holds the
+        # post itself, so --parents does not have to ask for it
+        discussion.fetch_state("%s/%s" % (post_author, post_permlink))
+
+    if args.parents:
+        # FIXME inconsistency, use @author/permlink instead!
+        dump_recursive_parents(
+            steem.rpc,
+            post_author,
+            post_permlink,
+            args.parents,
+            format=args.format,
+            discussion=discussion
+        )
+
+    if not args.comments and not args.parents:
+        post = steem.get_content(args.post)
+
+        if post["id"] == "0.0.0":
+            print("Can't find post %s" % args.post)
+            return
+        body = rendercache.render(post["body"], format=args.format)
+
+        if args.full:
+            meta = {}
+            for key in post:
+                if key in ["steem", "body"]:
+                    continue
+                if isinstance(post[key], Amount):
+                    meta[key] = str(post[key])
+                else:
+                    meta[key] = post[key]
+            yaml = frontmatter.Post(body, **meta)
+            print(frontmatter.dumps(yaml))
+        else:
+            print(body)
+
+    if args.comments:
+        with pool:
+            dump_recursive_comments(
+                steem.rpc,
+                post_author,
+                post_permlink,
+                format=args.format,
+                discussion=discussion,
+                max_depth=args.max_depth,
+                limit=args.limit
+            )
+
+    if args.verbose > 3:
+        rendercache.report()
+
+
+def parser_post(parser):
+    parser.add_argument(
+        '--author',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Publish post as this user (requires to have the key installed in the wallet)'
+    )
+    parser.add_argument(
+        '--permlink',
+        type=str,
+        required=False,
+        help='The permlink (together with the author identifies the post uniquely)'
+    )
+    parser.add_argument(
+        '--category',
+        default=config["post_category"],
+        type=str,
+        help='Specify category'
+    )
+    parser.add_argument(
+        '--tags',
+        default=[],
+        help='Specify tags',
+        nargs='*',
+    )
+    parser.add_argument(
+        '--title',
+        type=str,
+        required=False,
+        help='Title of the post'
+    )
+    parser.add_argument(
+        '--file',
+        type=str,
+        default=None,
+        help='Filename to open. If not present, or "-", stdin will be used'
+    )
+
+
+def command_post(steem, args):
+    initmeta = {
+        "title": args.title or "required",
+        "author": args.author or "required",
+        "category": args.category or "required",
+        "tags": args.tags or [],
+        "max_accepted_payout": "1000000.000 %s" % steem.symbol("SBD"),
+        "percent_steem_dollars": 100,
+        "allow_votes": True,
+        "allow_curation_rewards": True,
+    }
+
+    post = frontmatter.Post("", **initmeta)
+    meta, json_meta, body = yaml_parse_file(args, initial_content=post)
+
+    # Default "app"
+    if "app" not in json_meta:
+        import pkg_resources  # part of setuptools
+        version = pkg_resources.require("piston-cli")[0].version
+        json_meta["app"] = "piston/{}".format(version)
+
+    if not body:
+        print("Empty body! Not posting!")
+        return
+
+    for required in ["author", "title", "category"]:
+        if (required not in meta or
+                not meta[required] or
+                meta[required] == "required"):
+            print("'%s' required!" % required)
+            # TODO, instead of terminating here, send the user back
+            # to the EDITOR
+            return
+
+    pprint(steem.post(
+        meta["title"],
+        body,
+        author=meta["author"],
+        category=meta["category"],
+        meta=json_meta,
+    ))
+
+
+def parser_reply(parser):
+    parser.add_argument(
+        'replyto',
+        type=str,
+        help='@author/permlink-identifier of the post to reply to (e.g. @xeroc/python-steem-0-1)'
+    )
+    parser.add_argument(
+        '--author',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Publish post as this user (requires to have the key installed in the wallet)'
+    )
+    parser.add_argument(
+        '--permlink',
+        type=str,
+        required=False,
+        help='The permlink (together with the author identifies the post uniquely)'
+    )
+    parser.add_argument(
+        '--title',
+        type=str,
+        required=False,
+        help='Title of the post'
+    )
+    parser.add_argument(
+        '--file',
+        type=str,
+        required=False,
+        help='Send file as responds. If "-", read from stdin'
+    )
+
+
+def command_reply(steem, args):
+    from textwrap import indent
+    parent = steem.get_content(args.replyto)
+    if parent["id"] == "0.0.0":
+        print("Can't find post %s" % args.replyto)
+        return
+
+    reply_message = indent(parent["body"], "> ")
+
+    post = frontmatter.Post(reply_message, **{
+        "title": args.title if args.title else "Re: " + parent["title"],
+        "author": args.author if args.author else "required",
+        "replyto": args.replyto,
+    })
+
+    meta, json_meta, message = yaml_parse_file(args, initial_content=post)
+
+    for required in ["author", "title"]:
+        if (required not in meta or
+                not meta[required] or
+                meta[required] == "required"):
+            print("'%s' required!" % required)
+            # TODO, instead of terminating here, send the user back
+            # to the EDITOR
+            return
+
+    pprint(steem.reply(
+        meta["replyto"],
+        message,
+        title=meta["title"],
+        author=meta["author"],
+        meta=json_meta,
+    ))
+
+
+def parser_edit(parser):
+    parser.add_argument(
+        'post',
+        type=str,
+        help='@author/permlink-identifier of the post to edit to (e.g. @xeroc/python-steem-0-1)'
+    )
+    parser.add_argument(
+        '--author',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Post an edit as another author'
+    )
+    parser.add_argument(
+        '--file',
+        type=str,
+        required=False,
+        help='Patch with content of this file'
+    )
+    parser.add_argument(
+        '--replace',
+        action='store_true',
+        help="Don't patch but replace original post (will make you lose votes)"
+    )
+
+
+def command_edit(steem, args):
+    original_post = steem.get_content(args.post)
+
+    edited_message = None
+    if original_post["id"] == "0.0.0":
+        print("Can't find post %s" % args.post)
+        return
+
+    post = frontmatter.Post(original_post["body"], **{
+        "title": original_post["title"] + " (immutable)",
+        "author": original_post["author"] + " (immutable)",
+        "tags": original_post["tags"]
+    })
+
+    meta, json_meta, edited_message = yaml_parse_file(args, initial_content=post)
+    pprint(steem.edit(
+        args.post,
+        edited_message,
+        replace=args.replace,
+        meta=json_meta,
+    ))
+
+
+def parser_upvote(parser):
+    parser.add_argument(
+        'post',
+        type=str,
+        help='@author/permlink-identifier of the post to upvote to (e.g. @xeroc/python-steem-0-1)'
+    )
+    parser.add_argument(
+        '--voter',
+        type=str,
+        required=False,
+        default=config["default_voter"],
+        help='The voter account name'
+    )
+    parser.add_argument(
+        '--weight',
+        type=float,
+        default=config["default_vote_weight"],
+        required=False,
+        help='Actual weight (from 0.1 to 100.0)'
+    )
+
+
+def command_upvote(steem, args):
+    post = Post(args.post, steem_instance=steem)
+    if args.command == "downvote":
+        weight = -float(args.weight)
+    else:
+        weight = +float(args.weight)
+    if not args.voter:
+        print("Not voter provided!")
+        return
+    pprint(post.vote(weight, voter=args.voter))
+
+
+def parser_downvote(parser):
+    parser.add_argument(
+        '--voter',
+        type=str,
+        default=config["default_voter"],
+        help='The voter account name'
+    )
+    parser.add_argument(
+        'post',
+        type=str,
+        help='@author/permlink-identifier of the post to downvote to (e.g. @xeroc/python-steem-0-1)'
+    )
+    parser.add_argument(
+        '--weight',
+        type=float,
+        default=config["default_vote_weight"],
+        required=False,
+        help='Actual weight (from 0.1 to 100.0)'
+    )
+
+
+command_downvote = command_upvote
+
+
+def parser_replies(parser):
+    parser.add_argument(
+        '--author',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Show replies to this author'
+    )
+    parser.add_argument(
+        '--limit',
+        type=int,
+        default=config["limit"],
+        help='Limit posts by number'
+    )
+
+
+def command_replies(steem, args):
+    if not args.author:
+        print("Please specify an author via --author\n "
+              "or define your default author with:\n"
+              "   piston set default_author x")
+    else:
+        discussions = steem.get_replies(args.author)
+        list_posts(itertools.islice(discussions, args.limit))
+
+
+def parser_resteem(parser):
+    parser.add_argument(
+        'identifier',
+        type=str,
+        help='@author/permlink-identifier of the post to resteem'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Resteem as this user (requires to have the key installed in the wallet)'
+    )
+
+
+def command_resteem(steem, args):
+    pprint(steem.resteem(
+        args.identifier,
+        account=args.account
+    ))
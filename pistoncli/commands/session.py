@@ -0,0 +1,191 @@
+import io
+import sys
+import contextlib
+from pprint import pprint
+from . import connect, steem_options, run
+from .. import daemon
+
+
+def _global_argv(name):
+    """ Global options given on the command line before command ``name``
+        (they apply to every command run by the shell or batch)
+    """
+    argv = sys.argv[1:]
+    return argv[:argv.index(name)] if name in argv else []
+
+
+def parser_daemon(parser):
+    parser.add_argument(
+        '--unlock-timeout',
+        type=int,
+        default=900,
+        help='Lock the wallet again after this many seconds without requests (0: never, defaults to 900)'
+    )
+    parser.add_argument(
+        '--stop',
+        action='store_true',
+        help='Stop the running daemon'
+    )
+
+
+def command_daemon(steem, args):
+    if args.stop:
+        if not daemon.stop():
+            print("piston daemon is not running")
+        return
+
+    options = steem_options(args)
+    steem = connect(args)
+    server = daemon.Daemon(
+        steem,
+        options,
+        unlock_timeout=args.unlock_timeout
+    )
+    try:
+        server.unlock()
+        print("piston daemon listening on %s" % server.path)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def parser_shell(parser):
+    parser.add_argument(
+        '--history',
+        type=str,
+        default=None,
+        help='History file (defaults to "shell_history" in piston\'s data directory)'
+    )
+
+
+def command_shell(steem, args):
+    from ..shell import Shell
+    steem = connect(args)
+    if not args.nowallet:
+        steem.wallet.unlock()
+
+    Shell(
+        steem,
+        global_argv=_global_argv("shell"),
+        history=args.history
+    ).cmdloop()
+
+
+def parser_batch(parser):
+    parser.add_argument(
+        'file',
+        type=str,
+        nargs="?",
+        default="-",
+        help='File with one command per line (text or JSON). If "-" or not present, stdin will be used'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Number of concurrent connections for read-only commands (defaults to 4)'
+    )
+
+
+def command_batch(steem, args):
+    from ..batch import Batch
+    options = steem_options(args)
+    steem = connect(args)
+    batch = Batch(
+        steem,
+        options,
+        global_argv=_global_argv("batch"),
+        workers=args.workers
+    )
+    if args.file == "-":
+        failed = batch.run(sys.stdin)
+    else:
+        with open(args.file) as fp:
+            failed = batch.run(fp)
+    if failed:
+        sys.exit(1)
+
+
+def parser_bundle(parser):
+    parser.add_argument(
+        'file',
+        type=str,
+        nargs="?",
+        default="-",
+        help='File with one upvote, downvote, transfer, follow, unfollow, resteem, approvewitness or disapprovewitness command per line. If "-" or not present, stdin will be used'
+    )
+    parser.add_argument(
+        '--max-ops',
+        type=int,
+        default=None,
+        help='Maximum number of operations per transaction (defaults to 50, 1 sends one transaction per operation)'
+    )
+    parser.add_argument(
+        '--stop-on-error',
+        action='store_true',
+        help='Do not broadcast the remaining transactions once one has failed'
+    )
+
+
+def command_bundle(steem, args):
+    from ..batch import parse_line, parse_args
+    from ..bundle import Bundle, bundleable, MAX_OPS
+
+    if args.file == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(args.file) as fp:
+            lines = fp.readlines()
+
+    # Parse everything before anything is signed
+    global_argv = _global_argv("bundle")
+    parsed = []
+    for number, line in enumerate(lines, 1):
+        try:
+            argv = parse_line(line)
+        except (ValueError, KeyError, TypeError) as e:
+            print("Line %d: Invalid line: %s" % (number, str(e)))
+            sys.exit(1)
+        if argv is None:
+            continue
+        cmdargs, error = parse_args(global_argv + argv)
+        if not error and cmdargs.command not in bundleable:
+            error = "%s cannot be bundled" % cmdargs.command
+        if error:
+            print("Line %d: %s" % (number, error))
+            sys.exit(1)
+        parsed.append(cmdargs)
+
+    bundle = Bundle(steem, max_ops=args.max_ops or MAX_OPS)
+    with bundle.collect(), contextlib.redirect_stdout(io.StringIO()):
+        for cmdargs in parsed:
+            run(cmdargs.command, steem, cmdargs)
+
+    results, stats = bundle.broadcast(stop_on_error=args.stop_on_error)
+    for number, result in enumerate(results, 1):
+        if result["status"] == "ok":
+            pprint(result["result"])
+            continue
+        if result["status"] == "error":
+            reason = "failed: %s" % result["error"]
+        else:
+            reason = "not broadcast"
+        print("Transaction %d (%s, %s, %d operations) %s" % (
+            number,
+            result["account"],
+            result["permission"],
+            len(result["operations"]),
+            reason
+        ), file=sys.stderr)
+        for op in result["operations"]:
+            print("    %s" % str(op), file=sys.stderr)
+    print("%d operations in %d transactions (%d failed), %.1f ops/s" % (
+        stats["operations"],
+        stats["transactions"],
+        stats["failed"],
+        stats["ops_per_sec"]
+    ), file=sys.stderr)
+    if stats["failed"]:
+        sys.exit(1)
@@ -0,0 +1,218 @@
+import os
+import sys
+from pprint import pprint
+from prettytable import PrettyTable
+from ..storage import configStorage as config
+from piston.account import Account
+from ..ui import confirm
+from ..table import StreamingTable
+
+
+def parser_changewalletpassphrase(parser):
+    pass
+
+
+def command_changewalletpassphrase(steem, args):
+    steem.wallet.changePassphrase()
+
+
+def parser_addkey(parser):
+    parser.add_argument(
+        '--unsafe-import-key',
+        nargs='*',
+        type=str,
+        help='private key to import into the wallet (unsafe, unless you delete your bash history)'
+    )
+
+
+def command_addkey(steem, args):
+    if args.unsafe_import_key:
+        for key in args.unsafe_import_key:
+            try:
+                steem.wallet.addPrivateKey(key)
+            except Exception as e:
+                print(str(e))
+    else:
+        import getpass
+        while True:
+            wifkey = getpass.getpass('Private Key (wif) [Enter to quit]:')
+            if not wifkey:
+                break
+            try:
+                steem.wallet.addPrivateKey(wifkey)
+            except Exception as e:
+                print(str(e))
+                continue
+
+            installedKeys = steem.wallet.getPublicKeys()
+            if len(installedKeys) == 1:
+                name = steem.wallet.getAccountFromPublicKey(installedKeys[0])
+                print("=" * 30)
+                print("Setting new default user: %s" % name)
+                print()
+                print("You can change these settings with:")
+                print("    piston set default_author <account>")
+                print("    piston set default_voter <account>")
+                print("    piston set default_account <account>")
+                print("=" * 30)
+                config["default_author"] = name
+                config["default_voter"] = name
+                config["default_account"] = name
+
+
+def parser_delkey(parser):
+    parser.add_argument(
+        'pub',
+        nargs='*',
+        type=str,
+        help='the public key to delete from the wallet'
+    )
+
+
+def command_delkey(steem, args):
+    if confirm(
+        "Are you sure you want to delete keys from your wallet?\n"
+        "This step is IRREVERSIBLE! If you don't have a backup, "
+        "You may lose access to your account!"
+    ):
+        for pub in args.pub:
+            steem.wallet.removePrivateKeyFromPublicKey(pub)
+
+
+def parser_getkey(parser):
+    parser.add_argument(
+        'pub',
+        type=str,
+        help='the public key for which to show the private key'
+    )
+
+
+def command_getkey(steem, args):
+    print(steem.wallet.getPrivateKeyForPublicKey(args.pub))
+
+
+def parser_listkeys(parser):
+    pass
+
+
+def command_listkeys(steem, args):
+    t = PrettyTable(["Available Key"])
+    t.align = "l"
+    for key in steem.wallet.getPublicKeys():
+        t.add_row([key])
+    print(t)
+
+
+def parser_listaccounts(parser):
+    pass
+
+
+def command_listaccounts(steem, args):
+    with StreamingTable(["Name", "Type", "Available Key"]) as t:
+        for account in steem.wallet.getAccounts():
+            t.add_row([
+                account["name"] or "n/a",
+                account["type"] or "n/a",
+                account["pubkey"]
+            ])
+
+
+def parser_importaccount(parser):
+    parser.add_argument(
+        'account',
+        type=str,
+        help='Account name'
+    )
+    parser.add_argument(
+        '--roles',
+        type=str,
+        nargs="*",
+        default=["active", "posting", "memo"],  # no owner
+        help='Import specified keys (owner, active, posting, memo)'
+    )
+
+
+def command_importaccount(steem, args):
+    from pistonbase.account import PasswordKey
+    import getpass
+    password = getpass.getpass("Account Passphrase: ")
+    account = Account(args.account, steem_instance=steem)
+    imported = False
+
+    if "owner" in args.roles:
+        owner_key = PasswordKey(args.account, password, role="owner")
+        owner_pubkey = format(owner_key.get_public_key(), "STM")
+        if owner_pubkey in [x[0] for x in account["owner"]["key_auths"]]:
+            print("Importing owner key!")
+            owner_privkey = owner_key.get_private_key()
+            steem.wallet.addPrivateKey(owner_privkey)
+            imported = True
+
+    if "active" in args.roles:
+        active_key = PasswordKey(args.account, password, role="active")
+        active_pubkey = format(active_key.get_public_key(), "STM")
+        if active_pubkey in [x[0] for x in account["active"]["key_auths"]]:
+            print("Importing active key!")
+            active_privkey = active_key.get_private_key()
+            steem.wallet.addPrivateKey(active_privkey)
+            imported = True
+
+    if "posting" in args.roles:
+        posting_key = PasswordKey(args.account, password, role="posting")
+        posting_pubkey = format(posting_key.get_public_key(), "STM")
+        if posting_pubkey in [x[0] for x in account["posting"]["key_auths"]]:
+            print("Importing posting key!")
+            posting_privkey = posting_key.get_private_key()
+            steem.wallet.addPrivateKey(posting_privkey)
+            imported = True
+
+    if "memo" in args.roles:
+        memo_key = PasswordKey(args.account, password, role="memo")
+        memo_pubkey = format(memo_key.get_public_key(), "STM")
+        if memo_pubkey == account["memo_key"]:
+            print("Importing memo key!")
+            memo_privkey = memo_key.get_private_key()
+            steem.wallet.addPrivateKey(memo_privkey)
+            imported = True
+
+    if not imported:
+        print("No matching key(s) found. Password correct?")
+
+
+def _read_transaction(args):
+    if args.file and args.file != "-":
+        if not os.path.isfile(args.file):
+            raise Exception("File %s does not exist!" % args.file)
+        with open(args.file) as fp:
+            tx = fp.read()
+    else:
+        tx = sys.stdin.read()
+    return eval(tx)
+
+
+def parser_sign(parser):
+    parser.add_argument(
+        '--file',
+        type=str,
+        required=False,
+        help='Load transaction from file. If "-", read from stdin (defaults to "-")'
+    )
+
+
+def command_sign(steem, args):
+    tx = _read_transaction(args)
+    pprint(steem.sign(tx))
+
+
+def parser_broadcast(parser):
+    parser.add_argument(
+        '--file',
+        type=str,
+        required=False,
+        help='Load transaction from file. If "-", read from stdin (defaults to "-")'
+    )
+
+
+def command_broadcast(steem, args):
+    tx = _read_transaction(args)
+    steem.broadcast(tx)
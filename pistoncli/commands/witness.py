@@ -0,0 +1,156 @@
+from pprint import pprint
+from ..storage import configStorage as config
+from piston.amount import Amount
+from piston.witness import Witness
+
+
+def parser_approvewitness(parser):
+    parser.add_argument(
+        'witness',
+        type=str,
+        help='Witness to approve'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Your account'
+    )
+
+
+def command_approvewitness(steem, args):
+    pprint(steem.approve_witness(
+        args.witness,
+        account=args.account
+    ))
+
+
+def parser_disapprovewitness(parser):
+    parser.add_argument(
+        'witness',
+        type=str,
+        help='Witness to disapprove'
+    )
+    parser.add_argument(
+        '--account',
+        type=str,
+        required=False,
+        default=config["default_author"],
+        help='Your account'
+    )
+
+
+def command_disapprovewitness(steem, args):
+    pprint(steem.disapprove_witness(
+        args.witness,
+        account=args.account
+    ))
+
+
+def parser_witnessupdate(parser):
+    parser.add_argument(
+        '--witness',
+        type=str,
+        default=config["default_account"],
+        help='Witness name'
+    )
+    parser.add_argument(
+        '--maximum_block_size',
+        type=float,
+        required=False,
+        help='Max block size'
+    )
+    parser.add_argument(
+        '--account_creation_fee',
+        type=float,
+        required=False,
+        help='Account creation fee'
+    )
+    parser.add_argument(
+        '--sbd_interest_rate',
+        type=float,
+        required=False,
+        help='SBD interest rate in percent'
+    )
+    parser.add_argument(
+        '--url',
+        type=str,
+        required=False,
+        help='Witness URL'
+    )
+    parser.add_argument(
+        '--signing_key',
+        type=str,
+        required=False,
+        help='Signing Key'
+    )
+
+
+def command_witnessupdate(steem, args):
+    witness = Witness(args.witness, steem_instance=steem)
+    props = witness["props"]
+    if args.account_creation_fee:
+        props["account_creation_fee"] = str(Amount("%f STEEM" % args.account_creation_fee))
+    if args.maximum_block_size:
+        props["maximum_block_size"] = args.maximum_block_size
+    if args.sbd_interest_rate:
+        props["sbd_interest_rate"] = int(args.sbd_interest_rate * 100)
+
+    pprint(steem.witness_update(
+        args.signing_key or witness["signing_key"],
+        args.url or witness["url"],
+        props,
+        account=args.witness
+    ))
+
+
+def parser_witnesscreate(parser):
+    parser.add_argument(
+        'witness',
+        type=str,
+        help='Witness name'
+    )
+    parser.add_argument(
+        'signing_key',
+        type=str,
+        help='Signing Key'
+    )
+    parser.add_argument(
+        '--maximum_block_size',
+        type=float,
+        default="65536",
+        help='Max block size'
+    )
+    parser.add_argument(
+        '--account_creation_fee',
+        type=float,
+        default=30,
+        help='Account creation fee'
+    )
+    parser.add_argument(
+        '--sbd_interest_rate',
+        type=float,
+        default=0.0,
+        help='SBD interest rate in percent'
+    )
+    parser.add_argument(
+        '--url',
+        type=str,
+        default="",
+        help='Witness URL'
+    )
+
+
+def command_witnesscreate(steem, args):
+    props = {
+        "account_creation_fee": str(Amount("%f STEEM" % args.account_creation_fee)),
+        "maximum_block_size": args.maximum_block_size,
+        "sbd_interest_rate": int(args.sbd_interest_rate * 100)
+    }
+    pprint(steem.witness_update(
+        args.signing_key,
+        args.url,
+        props,
+        account=args.witness
+    ))
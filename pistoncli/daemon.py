@@ -0,0 +1,322 @@
+""" Persistent ``piston daemon`` and thin-client forwarding
+
+    The daemon keeps one :class:`piston.steem.Steem` instance alive, and
+    with it the websocket connection, the configuration snapshot and the
+    unlocked wallet. It serves sub-commands over a local Unix socket:
+    a client sends the parsed arguments of its command as one line of
+    JSON and receives the command's output as it is written, in chunks
+    of stdout and stderr (one line of JSON each), followed by a line
+    with the status (and error, or exit code) of the command. Long listings and
+    exports therefore stream through the daemon just like they do
+    in-process.
+
+    Regular ``piston <command>`` calls forward themselves to a running
+    daemon through :func:`forward` and fall back to running in-process
+    whenever the daemon is not running, was started with different
+    connection options, or cannot run the command (e.g. because the
+    wallet has been locked again after the idle timeout).
+"""
+import io
+import os
+import sys
+import json
+import socket
+import argparse
+import threading
+import contextlib
+import socketserver
+from .storage import configStorage as config
+from . import commands
+
+#: Characters of stdout sent at once (unless flushed earlier)
+CHUNK_SIZE = 64 * 1024
+
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path():
+    """ Path of the daemon's Unix socket (inside piston's data directory)
+    """
+    return os.path.join(config.data_dir, "piston.sock")
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _request(path, request, output=None):
+    """ Send ``request`` and return the final response
+
+        :param callable output: Called with every chunk of output
+            (``{"stdout": text}`` or ``{"stderr": text}``) before the
+            response
+    """
+    sock = _connect(path)
+    if not sock:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode("utf-8") + b"\n")
+        stream.flush()
+        for line in stream:
+            response = json.loads(line.decode("utf-8"))
+            if "status" in response:
+                return response
+            if output:
+                output(response)
+    raise DaemonError("piston daemon closed the connection")
+
+
+def _write(chunk):
+    for name, text in chunk.items():
+        stream = getattr(sys, name)
+        stream.write(text)
+        stream.flush()
+
+
+def running(path=None):
+    """ Is a daemon listening on ``path``?
+    """
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def forward(args, path=None):
+    """ Run the parsed command line ``args`` in a running daemon
+
+        :param argparse.Namespace args: Parsed arguments
+        :param str path: Socket path (defaults to :func:`socket_path`)
+        :return: ``True`` if the daemon ran the command, ``False`` if it
+            has to be run in-process
+    """
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return False
+    try:
+        request = {
+            "options": commands.steem_options(args),
+            "args": vars(args),
+            "tty": {"stdout": sys.stdout.isatty(),
+                    "stderr": sys.stderr.isatty()},
+        }
+        json.dumps(request)
+    except TypeError:
+        return False
+
+    # Once the request has been sent, the command may have been
+    # broadcast already. Do not fall back to running it a second time.
+    response = _request(path, request, output=_write)
+    if not response or response["status"] == "fallback":
+        return False
+    if response["status"] == "error":
+        if response.get("error"):
+            print(response["error"], file=sys.stderr)
+        sys.exit(response.get("code", 1))
+    return True
+
+
+def stop(path=None):
+    """ Ask the daemon listening on ``path`` to shut down
+
+        :return: ``True`` if a daemon was running
+    """
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return False
+    return bool(_request(path, {"stop": True}))
+
+
+class Output(io.TextIOBase):
+    """ Text stream that sends what is written to it to the client
+
+        :param callable send: Sends a message to the client
+        :param str name: ``stdout`` or ``stderr``
+        :param bool tty: Whether the client's stream is a terminal
+        :param bool buffered: Collect up to :data:`CHUNK_SIZE`
+            characters (or until flushed) instead of sending every write
+    """
+    encoding = "utf-8"
+
+    def __init__(self, send, name, tty=False, buffered=True):
+        self.send = send
+        self.name = name
+        self.tty = tty
+        self.buffered = buffered
+        self.buffer = []
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return self.tty
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if not self.buffered or self.size >= CHUNK_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            text = "".join(self.buffer)
+            self.buffer = []
+            self.size = 0
+            self.send({self.name: text})
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def send(self, message):
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            self.send(self.server.execute(
+                json.loads(line.decode("utf-8")), self.send))
+        except OSError:
+            # The client went away (e.g. ``piston history | head``)
+            pass
+
+
+class Daemon(socketserver.UnixStreamServer):
+    """ Serve piston sub-commands over a Unix socket
+
+        Requests are handled one at a time, so the commands can share
+        the same :class:`piston.steem.Steem` instance.
+
+        :param piston.steem.Steem steem: Connected Steem instance
+        :param dict options: Options ``steem`` was created with (see
+            :func:`pistoncli.commands.steem_options`); requests made with
+            other options are run by the client itself
+        :param str path: Socket path
+        :param int unlock_timeout: Lock the wallet after this many
+            seconds without requests (``0`` keeps it unlocked)
+    """
+    def __init__(self, steem, options, path=None, unlock_timeout=900):
+        self.steem = steem
+        self.options = options
+        self.path = path or socket_path()
+        self.unlock_timeout = unlock_timeout
+        self.mutex = threading.Lock()
+        self.locked = True
+        self.timer = None
+
+        if running(self.path):
+            raise DaemonError("piston daemon is already running (%s)" % self.path)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        # Anyone who can connect can use the unlocked wallet, so the
+        # socket must never exist with looser permissions than 0600
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.__init__(
+                self, self.path, RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def unlock(self):
+        """ Unlock the wallet (prompts for the passphrase)
+        """
+        if "wif" not in self.options:
+            self.steem.wallet.unlock()
+        self.locked = False
+        self.touch()
+
+    def lock(self):
+        with self.mutex:
+            self.steem.wallet.lock()
+            self.locked = True
+
+    def touch(self):
+        """ Restart the idle timer of the unlocked wallet
+        """
+        if self.timer:
+            self.timer.cancel()
+        if self.unlock_timeout and not self.locked:
+            self.timer = threading.Timer(self.unlock_timeout, self.lock)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def execute(self, request, send=None):
+        """ Run the command of ``request``
+
+            :param callable send: Sends the output of the command to the
+                client while it runs
+            :return: Final response: the ``status`` and, if the command
+                failed, the ``error`` message and the exit ``code``
+        """
+        if request.get("stop"):
+            threading.Thread(target=self.shutdown).start()
+            return {"status": "ok"}
+
+        args = argparse.Namespace(**request["args"])
+        command = commands.registry.get(getattr(args, "command", None))
+        if (request["options"] != self.options or
+                not command or
+                not command.rpc or
+                command.interactive):
+            return {"status": "fallback"}
+
+        with self.mutex:
+            if command.wallet and self.locked:
+                return {"status": "fallback"}
+            # Pick up changes of ``piston set`` since the last command
+            config.refresh()
+            send = send or (lambda message: None)
+            tty = request.get("tty", {})
+            stdout = Output(send, "stdout", tty.get("stdout", False))
+            stderr = Output(send, "stderr", tty.get("stderr", False),
+                            buffered=False)
+            try:
+                with contextlib.redirect_stdout(stdout), \
+                        contextlib.redirect_stderr(stderr):
+                    try:
+                        commands.run(command.name, self.steem, args)
+                    finally:
+                        stdout.flush()
+            except SystemExit as e:
+                # The command printed its error before ``sys.exit(1)``
+                if isinstance(e.code, int):
+                    if e.code:
+                        return {"status": "error", "error": "",
+                                "code": e.code}
+                elif e.code is not None:
+                    return {"status": "error", "error": str(e.code),
+                            "code": 1}
+            except Exception as e:
+                return {"status": "error",
+                        "error": "%s: %s" % (type(e).__name__, str(e)),
+                        "code": 1}
+            finally:
+                self.touch()
+        return {"status": "ok"}
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if self.timer:
+            self.timer.cancel()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,191 @@
+""" Fetch the replies and parents of a discussion thread
+
+    :meth:`Discussion.stream` first asks the node for the discussion
+    state (``get_state``), which returns the whole thread in one call.
+    If the node does not offer it, or parts of the thread are missing,
+    the remaining replies are fetched while the thread is walked, with
+    at most one ``get_content_replies`` call per post. Posts without
+    children are not asked for replies, and the replies of the posts
+    visited next are fetched concurrently if a
+    :class:`pistoncli.pool.ReaderPool` is given.
+
+    The posts of the discussion state are kept, so the parents and the
+    replies of a post (``piston read --parents --comments``) share them.
+"""
+
+#: Maximum number of posts whose replies :meth:`Discussion.stream`
+#: fetches ahead of time
+LOOKAHEAD = 256
+
+
+def identifier(post):
+    """ ``author/permlink`` of ``post``
+    """
+    return "%s/%s" % (post["author"], post["permlink"])
+
+
+def _get_replies(steem, key):
+    author, permlink = key.split("/", 1)
+    return steem.rpc.get_content_replies(author, permlink)
+
+
+class Discussion(object):
+    """ Replies of a thread
+
+        :param rpc: RPC connection of :class:`piston.steem.Steem`
+        :param pistoncli.pool.ReaderPool pool: Fetch the replies of a
+            level concurrently
+        :param bool state: Try to fetch the thread with ``get_state``
+    """
+    def __init__(self, rpc, pool=None, state=True):
+        self.rpc = rpc
+        self.pool = pool
+        self.state = state
+        #: Replies per ``author/permlink``
+        self.replies = {}
+        #: Posts per ``author/permlink``
+        self.contents = {}
+        #: Number of RPC calls made
+        self.calls = 0
+        #: Threads that have been asked for with ``get_state``
+        self.states = set()
+
+    def content(self, author, permlink):
+        """ The post ``@author/permlink`` (fetched once)
+        """
+        key = "%s/%s" % (author, permlink)
+        if key not in self.contents:
+            self.calls += 1
+            self.contents[key] = self.rpc.get_content(author, permlink)
+        return self.contents[key]
+
+    def ancestors(self, author, permlink, limit=1):
+        """ The post ``@author/permlink`` and up to ``limit`` of its
+            parents, the oldest first
+        """
+        posts = [self.content(author, permlink)]
+        while len(posts) <= limit and posts[-1]["parent_author"]:
+            posts.append(self.content(posts[-1]["parent_author"],
+                                      posts[-1]["parent_permlink"]))
+        return list(reversed(posts))
+
+    def add(self, key, replies):
+        self.replies[key] = replies
+        for reply in replies:
+            self.contents.setdefault(identifier(reply), reply)
+
+    def fetch_state(self, root):
+        """ Take as much of the thread below ``root``
+            (``author/permlink``) as possible from ``get_state``
+
+            The node is asked only once per thread. All posts of the
+            state are kept in :attr:`contents`.
+
+            :return: Posts whose replies still have to be fetched
+        """
+        if root in self.states:
+            return []
+        self.states.add(root)
+        try:
+            self.calls += 1
+            content = self.rpc.get_state("/piston/@%s" % root)["content"]
+        except Exception:
+            return [root]
+        for key, post in content.items():
+            self.contents.setdefault(key, post)
+        missing = []
+        level = [root]
+        while level:
+            children = []
+            for key in level:
+                post = content.get(key)
+                if (post is None or "replies" not in post or
+                        (not post["replies"] and post.get("children", 0) > 0)):
+                    missing.append(key)
+                    continue
+                replies = [content.get(reply) for reply in post["replies"]]
+                if None in replies:
+                    missing.append(key)
+                    continue
+                self.add(key, replies)
+                children.extend(
+                    identifier(reply) for reply in replies
+                    if reply.get("children", 1) > 0)
+            level = children
+        return missing
+
+    def stream(self, author, permlink, max_depth=None, limit=None,
+               prefetch=None):
+        """ Fetch and yield ``(depth, reply)`` for the replies below
+            ``@author/permlink``, depth first in the order of the node
+
+            The thread is taken from ``get_state`` first (see
+            :meth:`fetch_state`). Replies that are missing from it are
+            fetched while the thread is walked, yielded as soon as they
+            are known and not kept. With a pool, the replies of the
+            posts that are visited next are fetched ahead of time, with
+            at most ``prefetch`` requests at once and at most
+            :data:`LOOKAHEAD` posts ahead, so memory does not grow with
+            the size of the thread beyond the discussion state.
+
+            :param int max_depth: Do not fetch replies deeper than this
+                (``1`` only yields the direct replies)
+            :param int limit: Stop after this many replies
+            :param int prefetch: Number of concurrent requests for
+                replies ahead (defaults to twice the pool's workers)
+        """
+        if prefetch is None:
+            prefetch = 2 * self.pool.workers if self.pool else 0
+        pending = {}
+
+        def replies(key):
+            if key in self.replies:
+                return self.replies[key]
+            if key in pending:
+                return pending.pop(key)[1].result()
+            self.calls += 1
+            return self.rpc.get_content_replies(*key.split("/", 1))
+
+        def expand(depth, key):
+            if max_depth is not None and depth >= max_depth:
+                return []
+            return [(depth, reply) for reply in reversed(replies(key))]
+
+        def wanted(depth, reply):
+            return ((max_depth is None or depth + 1 < max_depth) and
+                    reply.get("children", 1) > 0)
+
+        root = "%s/%s" % (author, permlink)
+        if self.state:
+            self.fetch_state(root)
+
+        count = 0
+        stack = expand(0, root)
+        while stack and (limit is None or count < limit):
+            depth, reply = stack.pop()
+            yield depth, reply
+            count += 1
+            if wanted(depth, reply):
+                stack.extend(expand(depth + 1, identifier(reply)))
+
+            # Fetch the replies of the posts that are visited next, and
+            # of the replies that have been prefetched already
+            if self.pool and prefetch:
+                upcoming = list(reversed(stack[-LOOKAHEAD:]))
+                running = 0
+                for child_depth, future in list(pending.values()):
+                    if not future.done():
+                        running += 1
+                    elif not future.exception():
+                        upcoming.extend(
+                            (child_depth, child) for child in future.result())
+                for post_depth, post in upcoming:
+                    if running >= prefetch or len(pending) >= LOOKAHEAD:
+                        break
+                    key = identifier(post)
+                    if (wanted(post_depth, post) and key not in pending and
+                            key not in self.replies):
+                        self.calls += 1
+                        running += 1
+                        pending[key] = (post_depth + 1,
+                                        self.pool.submit(_get_replies, key))
@@ -0,0 +1,479 @@
+""" Account history, page by page
+
+    :func:`pages` walks the history of an account from the newest to
+    the oldest operation with ``get_account_history``, one page of
+    :data:`PAGE_SIZE` operations per call, and yields every page as soon
+    as it arrives. Nothing but the current page is kept, so even
+    histories of millions of operations are processed in bounded
+    memory.
+
+    The history of an account only ever grows, and every operation has
+    a sequence number (its index). A :class:`HistoryStore` keeps the
+    history of accounts in an sqlite database next to piston's
+    configuration storage, together with the highest index stored for
+    each account. :meth:`HistoryStore.sync` (``piston history --sync``)
+    only fetches the operations after it, in large pages that are
+    requested concurrently, and :func:`query` serves the stored part of
+    a history from disk. The store is indexed by operation type,
+    counterparty, block number and timestamp, so filtered queries
+    (e.g. all transfers with one account within a month) only read the
+    matching operations.
+
+    :func:`query_many` fetches the histories of several accounts at
+    once: every account is walked in a thread of its own, while the
+    calls themselves run on the connections of a
+    :class:`pistoncli.pool.ReaderPool`, which caps the number of
+    concurrent requests. The histories are either yielded one after the
+    other or merged into a single history, newest first.
+"""
+import os
+import json
+import heapq
+import itertools
+import threading
+from .pipeline import threaded
+from .storage import configStorage as config
+
+#: Operations per ``get_account_history`` call
+PAGE_SIZE = 1000
+
+#: Operations per ``get_account_history`` call when syncing
+SYNC_PAGE_SIZE = 2000
+
+#: Pages fetched ahead in total, over all accounts, while the histories
+#: of other accounts are printed (:func:`query_many`)
+PREFETCH = 64
+
+#: Pages each account's history is fetched ahead when merging (at most)
+MERGE_PREFETCH = 4
+
+#: Fields of operations that name accounts, in order of precedence
+ACCOUNT_FIELDS = [
+    "from", "to", "voter", "author", "parent_author", "curator",
+    "comment_author", "delegator", "delegatee", "creator",
+    "new_account_name", "account", "owner", "current_owner", "open_owner",
+    "witness", "publisher", "producer", "agent", "who", "receiver",
+]
+
+
+def counterparty_of(account, op):
+    """ The other account involved in the operation ``op`` of
+        ``account`` (``account`` itself if there is none)
+    """
+    data = op[1]
+    if not isinstance(data, dict):
+        return None
+    own = None
+    for field in ACCOUNT_FIELDS:
+        name = data.get(field)
+        if not name or not isinstance(name, str):
+            continue
+        if name != account:
+            return name
+        own = name
+    return own
+
+
+def parse_bound(value):
+    """ Block number or timestamp of ``--since`` and ``--until``
+
+        :param str value: Block number, or date (``2017-03-01``) or
+            time (``2017-03-01T12:00:00``) in UTC
+        :return: ``int`` for block numbers, ``str`` for timestamps
+    """
+    import datetime
+    if value.isdigit():
+        return int(value)
+    value = value.replace(" ", "T")
+    for format in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d", "%Y-%m"]:
+        try:
+            time = datetime.datetime.strptime(value, format)
+        except ValueError:
+            continue
+        return time.strftime("%Y-%m-%dT%H:%M:%S")
+    raise ValueError("Not a block number or date: %s" % value)
+
+
+def _position(op, bound):
+    # Block number or timestamp of ``op``, depending on ``bound``
+    return op["block"] if isinstance(bound, int) else op["timestamp"]
+
+
+def pages(rpc, account, first=99999999999999, limit=None, only_ops=None,
+          exclude_ops=None, counterparty=None, since=None, until=None,
+          page_size=PAGE_SIZE, stop=None):
+    """ Yield the history of ``account`` in pages, newest first
+
+        Entries are ``[index, operation]`` as returned by
+        ``get_account_history``, like
+        :meth:`piston.account.Account.rawhistory`.
+
+        :param rpc: RPC connection of :class:`piston.steem.Steem`
+        :param int first: Index of the newest entry
+        :param int limit: Stop after this many (matching) entries
+            (``None`` or negative for all)
+        :param list only_ops: Only yield these operation types
+        :param list exclude_ops: Skip these operation types
+        :param str counterparty: Only yield operations with this
+            account (see :func:`counterparty_of`)
+        :param since: Only yield operations from this block or time on
+            (see :func:`parse_bound`)
+        :param until: Only yield operations before this block or time
+        :param int page_size: Entries per call
+        :param int stop: Stop at this index (exclusive)
+    """
+    if limit is not None and limit < 0:
+        limit = None
+    count = 0
+    size = min(page_size, first)
+    while first >= 0 and size >= 0:
+        entries = rpc.get_account_history(account, first, size)
+        page = []
+        stopped = False
+        for entry in reversed(entries):
+            if stop is not None and entry[0] <= stop:
+                stopped = True
+                break
+            if since is not None and _position(entry[1], since) < since:
+                stopped = True
+                break
+            op = entry[1]["op"][0]
+            if exclude_ops and op in exclude_ops:
+                continue
+            if only_ops and op not in only_ops:
+                continue
+            if until is not None and _position(entry[1], until) >= until:
+                continue
+            if (counterparty and
+                    counterparty_of(account, entry[1]["op"]) != counterparty):
+                continue
+            page.append(entry)
+            count += 1
+            if limit is not None and count >= limit:
+                break
+        if page:
+            yield page
+        if (stopped or (limit is not None and count >= limit) or
+                len(entries) <= size):
+            # The call returns up to ``size + 1`` entries, fewer at the
+            # beginning of the history
+            return
+        first = entries[0][0] - 1
+        size = min(page_size, first)
+
+
+def history_path():
+    return os.path.join(config.data_dir, "history.sqlite")
+
+
+def _get_range(steem, request):
+    account, last, size = request
+    return steem.rpc.get_account_history(account, last, size)
+
+
+class HistoryStore(object):
+    """ Local copy of the history of accounts
+
+        Only operations in irreversible blocks are stored, so the
+        stored part of a history never changes.
+
+        :param str path: Database file (defaults to ``history.sqlite``
+            in piston's data directory)
+    """
+    def __init__(self, path=None):
+        import sqlite3
+        self.path = path or history_path()
+        self.mutex = threading.RLock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                account TEXT,
+                idx INTEGER,
+                block INTEGER,
+                timestamp TEXT,
+                op_type TEXT,
+                data TEXT,
+                PRIMARY KEY (account, idx)
+            );
+            CREATE TABLE IF NOT EXISTS synced (
+                account TEXT PRIMARY KEY,
+                last INTEGER
+            );
+        """)
+        columns = [row[1] for row in
+                   self.connection.execute("PRAGMA table_info(history)")]
+        if "counterparty" not in columns:
+            self._add_counterparty()
+        self.connection.executescript("""
+            CREATE INDEX IF NOT EXISTS history_op_type
+                ON history (account, op_type, idx);
+            CREATE INDEX IF NOT EXISTS history_counterparty
+                ON history (account, counterparty, idx);
+            CREATE INDEX IF NOT EXISTS history_block
+                ON history (account, block);
+            CREATE INDEX IF NOT EXISTS history_timestamp
+                ON history (account, timestamp);
+        """)
+
+    def _add_counterparty(self):
+        # Stores of earlier versions have no counterparty column
+        self.connection.execute(
+            "ALTER TABLE history ADD COLUMN counterparty TEXT")
+        rows = self.connection.execute(
+            "SELECT account, idx, data FROM history").fetchall()
+        self.connection.executemany(
+            "UPDATE history SET counterparty = ? WHERE account = ? AND idx = ?",
+            [(counterparty_of(account, json.loads(data)["op"]), account, index)
+             for account, index, data in rows])
+        self.connection.commit()
+
+    def close(self):
+        with self.mutex:
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def synced(self, account):
+        """ Highest index stored for ``account`` (``None`` if it has not
+            been synced)
+        """
+        with self.mutex:
+            row = self.connection.execute(
+                "SELECT last FROM synced WHERE account = ?", (account,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store(self, account, entries):
+        """ Add ``entries`` (in ascending order, following the highest
+            stored index) to the history of ``account``
+        """
+        if not entries:
+            return
+        with self.mutex:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO history (account, idx, block, "
+                "timestamp, op_type, data, counterparty) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(account, index, op["block"], op["timestamp"], op["op"][0],
+                  json.dumps(op), counterparty_of(account, op["op"]))
+                 for index, op in entries])
+            self.connection.execute(
+                "INSERT OR REPLACE INTO synced VALUES (?, ?)",
+                (account, entries[-1][0]))
+            self.connection.commit()
+
+    def sync(self, rpc, account, pool=None, page_size=SYNC_PAGE_SIZE):
+        """ Fetch and store the operations of ``account`` after the
+            highest stored index
+
+            The missing index range is split into pages of
+            ``page_size`` operations that are fetched concurrently on
+            ``pool`` (a :class:`pistoncli.pool.ReaderPool`) and stored
+            in order, so an interrupted sync resumes where it stopped.
+
+            :return: Number of new operations
+        """
+        latest = rpc.get_account_history(account, -1, 0)
+        if not latest:
+            return 0
+        latest = latest[-1][0]
+        irreversible = rpc.get_dynamic_global_properties()[
+            "last_irreversible_block_num"]
+        last = self.synced(account)
+        start = 0 if last is None else last + 1
+        requests = [
+            (account, min(lo + page_size - 1, latest),
+             min(lo + page_size - 1, latest) - lo)
+            for lo in range(start, latest + 1, page_size)
+        ]
+        if pool:
+            results = pool.map(_get_range, requests)
+        else:
+            results = (rpc.get_account_history(*request) for request in requests)
+        count = 0
+        for entries in results:
+            entries = [entry for entry in entries if entry[0] >= start]
+            final = [entry for entry in entries
+                     if entry[1]["block"] <= irreversible]
+            self.store(account, final)
+            count += len(final)
+            start += len(final)
+            if len(final) < len(entries):
+                # Operations of reversible blocks are fetched next time
+                break
+        return count
+
+    def _first_index(self, account, bound):
+        # Index of the first operation at or after the block or time
+        # (several operations share a block and a timestamp)
+        column = "block" if isinstance(bound, int) else "timestamp"
+        row = self.connection.execute(
+            "SELECT idx FROM history WHERE account = ? AND %s >= ? "
+            "ORDER BY %s, idx LIMIT 1" % (column, column), (account, bound)
+        ).fetchone()
+        return row[0] if row else None
+
+    def pages(self, account, first=99999999999999, limit=None,
+              only_ops=None, exclude_ops=None, counterparty=None,
+              since=None, until=None, page_size=PAGE_SIZE):
+        """ Yield the stored history of ``account`` in pages, newest
+            first, like :func:`pages`
+
+            ``since`` and ``until`` are turned into a range of indices
+            first (operations are ordered by block and time), the other
+            filters are answered by the indexes of the store.
+        """
+        if limit is not None and limit < 0:
+            limit = None
+        lowest = 0
+        with self.mutex:
+            if since is not None:
+                lowest = self._first_index(account, since)
+                if lowest is None:
+                    return
+            if until is not None:
+                highest = self._first_index(account, until)
+                if highest is not None:
+                    first = min(first, highest - 1)
+        where = "account = ? AND idx <= ? AND idx >= ?"
+        params = []
+        if only_ops:
+            where += " AND op_type IN (%s)" % ",".join("?" * len(only_ops))
+            params.extend(only_ops)
+        if exclude_ops:
+            where += " AND op_type NOT IN (%s)" % ",".join("?" * len(exclude_ops))
+            params.extend(exclude_ops)
+        if counterparty:
+            where += " AND counterparty = ?"
+            params.append(counterparty)
+        while limit is None or limit > 0:
+            size = page_size if limit is None else min(limit, page_size)
+            with self.mutex:
+                rows = self.connection.execute(
+                    "SELECT idx, data FROM history WHERE " + where +
+                    " ORDER BY idx DESC LIMIT ?",
+                    [account, first, lowest] + params + [size]).fetchall()
+            if not rows:
+                return
+            yield [[index, json.loads(data)] for index, data in rows]
+            if limit is not None:
+                limit -= len(rows)
+            if len(rows) < size:
+                return
+            first = rows[-1][0] - 1
+
+
+def query(rpc, account, store=None, first=99999999999999, limit=None,
+          **filters):
+    """ Yield the history of ``account`` in pages, newest first
+
+        Operations that are in ``store`` (a :class:`HistoryStore`) are
+        read from disk, only the newer ones are fetched from the node.
+
+        :param filters: ``only_ops``, ``exclude_ops``, ``counterparty``,
+            ``since`` and ``until`` (see :func:`pages`)
+    """
+    if limit is not None and limit < 0:
+        limit = None
+    last = store.synced(account) if store else None
+    if last is None:
+        for page in pages(rpc, account, first=first, limit=limit, **filters):
+            yield page
+        return
+    if first > last:
+        for page in pages(rpc, account, first=first, limit=limit,
+                          stop=last, **filters):
+            yield page
+            if limit is not None:
+                limit -= len(page)
+        first = last
+    if limit is None or limit > 0:
+        for page in store.pages(account, first=first, limit=limit, **filters):
+            yield page
+
+
+class PooledRPC(object):
+    """ ``get_account_history`` on the connections of a
+        :class:`pistoncli.pool.ReaderPool`, so that :func:`pages` and
+        :func:`query` can be used from several threads at once
+    """
+    def __init__(self, pool):
+        self.pool = pool
+
+    def get_account_history(self, account, first, limit):
+        return self.pool.submit(_get_range, (account, first, limit)).result()
+
+
+def _entries(account, pages):
+    for page in pages:
+        for entry in page:
+            yield account, entry
+
+
+def _started(streams, window):
+    """ Start the lazy ``streams`` (callables) ``window`` at a time: the
+        one yielded and the next ones
+    """
+    streams = iter(streams)
+    running = [stream() for stream in itertools.islice(streams, window)]
+    while running:
+        yield running.pop(0)
+        # The previous one is consumed
+        running.extend(stream() for stream in itertools.islice(streams, 1))
+
+
+def query_many(rpc, accounts, store=None, pool=None, merge=False,
+               prefetch=None, **filters):
+    """ Yield the histories of ``accounts`` in pages of
+        ``(account, entry)``
+
+        With a ``pool``, the histories are fetched concurrently and at
+        most ``prefetch`` pages (defaults to :data:`PREFETCH`) are held
+        back in total until they are consumed, however many accounts
+        there are. One after the other, only as many histories as the
+        pool has workers are fetched at once (the one printed and the
+        next ones), sharing the pages. Merged, all histories are
+        consumed side by side and each holds back its share (at least
+        one page), but no more than :data:`MERGE_PREFETCH` pages. Without a pool, the histories
+        are fetched from ``rpc`` one after the other.
+
+        :param bool merge: Merge the histories into one, newest first
+            (by timestamp), instead of yielding them one after the other
+        :param filters: ``first``, ``limit`` (per account), ``only_ops``,
+            ``exclude_ops``, ``counterparty``, ``since`` and ``until``
+            (see :func:`query`)
+    """
+    if prefetch is None:
+        prefetch = PREFETCH
+    if not pool:
+        streams = [query(rpc, account, store=store, **filters)
+                   for account in accounts]
+    else:
+        rpc = PooledRPC(pool)
+        window = len(accounts) if merge else min(pool.workers, len(accounts))
+        # Every stream holds one more page while its queue is full
+        maxsize = max(1, prefetch // max(window, 1) - 1)
+        if merge:
+            maxsize = min(maxsize, MERGE_PREFETCH)
+        streams = _started(
+            [lambda account=account: threaded(
+                query(rpc, account, store=store, **filters), maxsize=maxsize)
+             for account in accounts], window)
+    if not merge:
+        for account, stream in zip(accounts, streams):
+            for page in stream:
+                yield [(account, entry) for entry in page]
+        return
+    merged = heapq.merge(
+        *[_entries(account, stream)
+          for account, stream in zip(accounts, streams)],
+        key=lambda item: item[1][1]["timestamp"], reverse=True)
+    while True:
+        page = list(itertools.islice(merged, PAGE_SIZE))
+        if not page:
+            return
+        yield page
@@ -0,0 +1,177 @@
+""" Render markdown for the terminal
+
+    All patterns are compiled once. A body is rendered line by line in
+    a single pass: every line is classified as headline, list item,
+    code or paragraph text, consecutive paragraph lines are joined, and
+    all inline markup (bold, light, inline code and links) of a
+    paragraph is replaced by one combined regular expression. Wrapping
+    ignores the color codes, so lines are never cut short.
+"""
+import re
+
+#: Width of the rendered text
+WIDTH = 120
+
+_headline = re.compile(r"^(#+)\s*(.*)$")
+_list_item = re.compile(r"^([\*\-])\s+(.*)$")
+_code_block = re.compile(r"^ {4,}(.*)$")
+_fence = re.compile(r"^```(.*?)(```)?\s*$")
+_inline = re.compile(
+    r"\*\*(?P<bold>.+?)\*\*"
+    r"|`(?P<code>[^`]+)`"
+    r"|\[(?P<text>[^\]]*)\]\((?P<url>[^)]*)\)"
+    r"|\*(?P<light>[^*]+)\*"
+)
+_escape = re.compile(r"\x1b\[[0-9;]*m")
+
+_colors = None
+
+
+def colors():
+    """ colorama's ``Fore``, ``Back`` and ``Style`` (initialized once)
+    """
+    global _colors
+    if _colors is None:
+        import colorama
+        colorama.init()
+        _colors = (colorama.Fore, colorama.Back, colorama.Style)
+    return _colors
+
+
+class Renderer(object):
+    """ Terminal renderer for markdown
+
+        :param int width: Width of the rendered text
+    """
+    def __init__(self, width=WIDTH):
+        self.width = width
+        Fore, Back, Style = colors()
+        self.bold = (Style.BRIGHT, Style.NORMAL)
+        self.light = (Style.DIM, Style.NORMAL)
+        self.code = (Back.WHITE + Fore.BLUE, Fore.RESET + Back.RESET)
+        self.link = (Fore.RED, Fore.GREEN, Fore.RESET)
+        self.bullet = (Fore.GREEN, Fore.RESET)
+        self.headlines = [
+            Back.RED,
+            Back.GREEN,
+            Back.YELLOW,
+            Back.BLUE,
+            Back.MAGENTA,
+            Back.CYAN,
+        ]
+        self.reset = Back.RESET
+        # Wrapping patterns per width
+        self._lines = {}
+
+    def _inline(self, match):
+        kind = match.lastgroup
+        if kind == "bold":
+            return self.bold[0] + match.group("bold") + self.bold[1]
+        elif kind == "code":
+            return self.code[0] + " " + match.group("code") + " " + self.code[1]
+        elif kind == "light":
+            return self.light[0] + match.group("light") + self.light[1]
+        return (self.link[0] + "[%s]" % match.group("text") +
+                self.link[1] + "(%s)" % match.group("url") + self.link[2])
+
+    def wrap(self, text, indent=""):
+        """ Wrap ``text`` at word boundaries, not counting color codes
+        """
+        width = self.width - len(indent)
+        if "\x1b" not in text:
+            if width not in self._lines:
+                self._lines[width] = re.compile(
+                    r"\S(?:.{0,%d}\S)?(?=\s|$)|\S+" % max(width - 2, 0))
+            lines = self._lines[width].findall(" ".join(text.split()))
+            return [indent + line for line in lines] or [indent]
+        lines = []
+        line, length = [], 0
+        for word in text.split():
+            size = len(_escape.sub("", word)) if "\x1b" in word else len(word)
+            if line and length + 1 + size > width:
+                lines.append(indent + " ".join(line))
+                line, length = [], 0
+            length += size + bool(line)
+            line.append(word)
+        if line or not lines:
+            lines.append(indent + " ".join(line))
+        return lines
+
+    def code_line(self, text):
+        return "    " + self.code[0] + "   " + text + "   " + self.code[1]
+
+    def render(self, text):
+        """ Render ``text`` (markdown)
+
+            :rtype: str
+        """
+        out = []
+        paragraph = []
+        fenced = False
+
+        def flush():
+            if paragraph:
+                out.extend(self.wrap(_inline.sub(self._inline, " ".join(paragraph))))
+                del paragraph[:]
+
+        for line in text.splitlines():
+            fence = _fence.match(line)
+            if fenced:
+                if line.rstrip().endswith("```"):
+                    fenced = False
+                    line = line.rstrip()[:-3]
+                    if not line:
+                        continue
+                out.append(self.code_line(line))
+                continue
+            if fence:
+                flush()
+                if fence.group(2):
+                    # ```code``` on a single line
+                    out.append(self.code_line(fence.group(1)))
+                else:
+                    # The rest of the line names the language
+                    fenced = True
+                continue
+            if not line.strip():
+                flush()
+                out.append("")
+                continue
+            code = _code_block.match(line)
+            if code:
+                flush()
+                out.append(self.code_line(code.group(1)))
+                continue
+            headline = _headline.match(line)
+            if headline:
+                flush()
+                level, title = headline.groups()
+                color = self.headlines[len(level) % len(self.headlines)]
+                out.append(
+                    self.bold[0] + color +
+                    '{:^{len}}'.format(title, len=self.width) +
+                    self.reset + self.bold[1])
+                continue
+            item = _list_item.match(line)
+            if item:
+                flush()
+                marker, rest = item.groups()
+                bullet = self.bullet[0] + " " + marker + " " + self.bullet[1]
+                wrapped = self.wrap(_inline.sub(self._inline, rest), indent="   ")
+                wrapped[0] = bullet + wrapped[0][3:]
+                out.extend(wrapped)
+                continue
+            paragraph.append(line.strip())
+        flush()
+        return "\n".join(out)
+
+
+_renderers = {}
+
+
+def render(text, width=WIDTH):
+    """ Render markdown ``text`` for the terminal
+    """
+    if width not in _renderers:
+        _renderers[width] = Renderer(width)
+    return _renderers[width].render(text)
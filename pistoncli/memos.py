@@ -0,0 +1,193 @@
+""" Decoding encrypted memos in bulk
+
+    An encrypted memo (``#...``) names the public memo keys of sender
+    and receiver. Decoding it takes the wallet's private key for one of
+    them and the ECDH shared secret with the other (the counterparty),
+    from which the AES key of the memo is derived. The shared secret
+    is by far the most expensive part, and it is the same for all memos
+    exchanged with one counterparty.
+
+    A :class:`MemoDecoder` therefore looks up the wallet keys of the
+    session once, caches the shared secret per pair of keys and, for
+    large batches (:meth:`MemoDecoder.prepare`), computes the missing
+    secrets on a process pool, as the elliptic curve arithmetic is
+    CPU-bound. It decrypts the memos itself, with the primitives of
+    :mod:`piston.memo`, so the library is used as it is.
+"""
+import struct
+import threading
+from binascii import unhexlify
+from concurrent.futures import ProcessPoolExecutor
+
+#: Compute shared secrets on a process pool from this many on
+POOL_THRESHOLD = 8
+
+
+def parse_memo(memo):
+    """ Fields of an encrypted ``memo``
+
+        :return: ``(from_key, to_key, nonce, check, cipher)`` with the
+            public keys, the nonce (``str``), the checksum (``int``) and
+            the encrypted message (``bytes``)
+    """
+    from piston.memo import base58decode, PublicKey
+    raw = base58decode(memo[1:])
+    from_key = PublicKey(raw[:66])
+    to_key = PublicKey(raw[66:132])
+    raw = raw[132:]
+    nonce = str(struct.unpack_from("<Q", unhexlify(raw[:16]))[0])
+    check = struct.unpack_from("<I", unhexlify(raw[16:24]))[0]
+    data = unhexlify(raw[24:])
+    # The message is prefixed with its length (varint)
+    offset = 0
+    while data[offset] & 0x80:
+        offset += 1
+    return from_key, to_key, nonce, check, data[offset + 1:]
+
+
+def _unpad(data):
+    # PKCS#7
+    count = data[-1] if data else 0
+    if 0 < count <= 16 and data[-count:] == bytes([count]) * count:
+        return data[:-count]
+    return data
+
+
+def _shared_secret(wif, pub):
+    # Runs in a worker process
+    from piston.memo import get_shared_secret, PrivateKey, PublicKey
+    return get_shared_secret(PrivateKey(wif), PublicKey(pub))
+
+
+class MemoDecoder(object):
+    """ Decode the encrypted memos of a session
+
+        The process pool of :meth:`prepare` is started once and kept
+        until :meth:`close` (or the end of a ``with`` block).
+
+        :param piston.steem.Steem steem: Session whose wallet holds the
+            memo keys
+        :param int workers: Processes for :meth:`prepare` (defaults to
+            the number of CPUs)
+    """
+    def __init__(self, steem, workers=None):
+        self.steem = steem
+        self.workers = workers
+        #: Private keys (WIF) per public key, ``None`` if not in the wallet
+        self.keys = {}
+        self.private_keys = {}
+        #: Shared secrets per ``(own public key, counterparty's public key)``
+        self.secrets = {}
+        self.mutex = threading.Lock()
+        self.executor = None
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _private(self, wif):
+        # Deriving the public key of a private key is expensive as well
+        if wif not in self.private_keys:
+            from piston.memo import PrivateKey
+            self.private_keys[wif] = PrivateKey(wif)
+        return self.private_keys[wif]
+
+    def private_key(self, pub):
+        """ WIF of the public key ``pub`` (looked up once)
+        """
+        pub = str(pub)
+        if pub not in self.keys:
+            try:
+                self.keys[pub] = self.steem.wallet.getPrivateKeyForPublicKey(pub)
+            except Exception:
+                self.keys[pub] = None
+        return self.keys[pub]
+
+    def _key_pair(self, from_key, to_key):
+        """ ``(wif, own key, counterparty's key)`` to decode a memo
+            between ``from_key`` and ``to_key`` with
+        """
+        wif = self.private_key(to_key)
+        if wif:
+            return wif, str(to_key), str(from_key)
+        wif = self.private_key(from_key)
+        if wif:
+            return wif, str(from_key), str(to_key)
+        return None, None, None
+
+    def prepare(self, memos):
+        """ Compute the shared secrets needed for ``memos`` ahead of
+            decoding them, on a process pool if there are many
+        """
+        missing = {}
+        for memo in memos:
+            if not memo or memo[0] != "#":
+                continue
+            try:
+                from_key, to_key = parse_memo(memo)[:2]
+            except Exception:
+                continue
+            wif, own, other = self._key_pair(from_key, to_key)
+            if wif is None:
+                continue
+            if (own, other) not in self.secrets:
+                missing[(own, other)] = (wif, other)
+        if not missing:
+            return
+        if len(missing) < POOL_THRESHOLD:
+            results = [_shared_secret(*args) for args in missing.values()]
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            wifs, pubs = zip(*missing.values())
+            results = list(self.executor.map(_shared_secret, wifs, pubs,
+                                             chunksize=16))
+        with self.mutex:
+            self.secrets.update(zip(missing, results))
+
+    def shared_secret(self, wif, own, other):
+        """ Shared secret of the keys ``own`` (with the private key
+            ``wif``) and ``other`` (computed once)
+        """
+        key = (own, other)
+        if key not in self.secrets:
+            from piston.memo import get_shared_secret, PublicKey
+            secret = get_shared_secret(self._private(wif), PublicKey(other))
+            with self.mutex:
+                self.secrets[key] = secret
+        return self.secrets[key]
+
+    def decode(self, memo):
+        """ Plain text of ``memo``
+
+            Memos that are not encrypted, or for which the wallet has no
+            key, are returned as they are.
+        """
+        if not memo or memo[0] != "#":
+            return memo
+        from piston.memo import init_aes
+        try:
+            from_key, to_key, nonce, check, cipher = parse_memo(memo)
+        except Exception:
+            return memo
+        wif, own, other = self._key_pair(from_key, to_key)
+        if wif is None:
+            return memo
+        aes, checksum = init_aes(self.shared_secret(wif, own, other), nonce)
+        if check != checksum:
+            raise ValueError("Checksum failure")
+        return _unpad(aes.decrypt(cipher)).decode("utf8")
+
+    def decode_many(self, memos):
+        """ Plain text of all ``memos``
+        """
+        memos = list(memos)
+        self.prepare(memos)
+        return [self.decode(memo) for memo in memos]
@@ -0,0 +1,153 @@
+""" Latency and throughput of API nodes (``piston nodes bench``)
+
+    For every node, the benchmark measures
+
+    * the time it takes to open a websocket connection,
+    * the latency percentiles of a few representative API calls, made
+      one after another over one connection, and
+    * the sustained throughput of those calls over ``concurrency``
+      connections for ``duration`` seconds.
+
+    Only the websocket API is used, so any server that speaks the
+    ``call`` protocol of ``steemd`` (e.g. a local stand-in) can be
+    benchmarked.
+"""
+import math
+import time
+import threading
+from .nodes import call
+
+#: Latency percentiles that are reported
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(values, p):
+    """ ``p``-th percentile of ``values`` (nearest rank)
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(int(math.ceil(p / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+def summarize(values):
+    """ Percentiles of ``values`` (in seconds) in milliseconds
+    """
+    return {
+        "p%d" % p: None if not values else round(percentile(values, p) * 1e3, 2)
+        for p in PERCENTILES
+    }
+
+
+def representative_calls(ws, account="steemit", post="@xeroc/piston-readme"):
+    """ The calls to benchmark as ``(method, params)``
+
+        The block is chosen relative to the node's head block.
+    """
+    author, permlink = post.lstrip("@").split("/", 1)
+    props = call(ws, "get_dynamic_global_properties")
+    block = max(int(props.get("head_block_number", 1)) - 1000, 1)
+    return [
+        ("get_dynamic_global_properties", []),
+        ("get_accounts", [[account]]),
+        ("get_block", [block]),
+        ("get_content_replies", [author, permlink]),
+    ]
+
+
+def bench(url, runs=20, concurrency=4, duration=5.0, account="steemit",
+          post="@xeroc/piston-readme", timeout=10):
+    """ Benchmark the node at ``url``
+
+        :param str url: Websocket endpoint
+        :param int runs: Connections and calls per method for the
+            latency percentiles
+        :param int concurrency: Connections used for the throughput
+        :param float duration: Seconds to measure the throughput for
+            (``0`` skips the throughput)
+        :param str account: Account for ``get_accounts``
+        :param str post: ``@author/permlink`` for ``get_content_replies``
+        :return: dict with ``connect``, ``calls``, ``throughput`` and
+            ``errors``
+    """
+    from websocket import create_connection
+    result = {"node": url, "errors": 0}
+
+    connects = []
+    for _ in range(runs):
+        start = time.time()
+        ws = create_connection(url, timeout=timeout)
+        connects.append(time.time() - start)
+        ws.close()
+    result["connect"] = summarize(connects)
+
+    ws = create_connection(url, timeout=timeout)
+    try:
+        calls = representative_calls(ws, account=account, post=post)
+        result["calls"] = {}
+        for method, params in calls:
+            latencies = []
+            for _ in range(runs):
+                start = time.time()
+                try:
+                    call(ws, method, params)
+                except ValueError:
+                    result["errors"] += 1
+                    continue
+                latencies.append(time.time() - start)
+            result["calls"][method] = summarize(latencies)
+    finally:
+        ws.close()
+
+    if duration:
+        result["throughput"] = throughput(
+            url, calls, concurrency, duration, timeout=timeout)
+        result["errors"] += result["throughput"]["errors"]
+    return result
+
+
+def throughput(url, calls, concurrency, duration, timeout=10):
+    """ Calls per second over ``concurrency`` connections
+
+        Every connection makes ``calls`` round-robin, one after
+        another, for ``duration`` seconds.
+    """
+    from websocket import create_connection
+    counts = [0] * concurrency
+    errors = [0] * concurrency
+    deadline = time.time() + duration
+
+    def worker(i):
+        try:
+            ws = create_connection(url, timeout=timeout)
+        except Exception:
+            errors[i] += 1
+            return
+        try:
+            while time.time() < deadline:
+                method, params = calls[counts[i] % len(calls)]
+                try:
+                    call(ws, method, params)
+                except ValueError:
+                    errors[i] += 1
+                counts[i] += 1
+        except Exception:
+            errors[i] += 1
+        finally:
+            ws.close()
+
+    start = time.time()
+    threads = [threading.Thread(target=worker, args=(i,))
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    return {
+        "concurrency": concurrency,
+        "calls": sum(counts),
+        "calls_per_sec": round(sum(counts) / elapsed, 1) if elapsed else 0.0,
+        "errors": sum(errors),
+    }
@@ -0,0 +1,311 @@
+""" Pool of API nodes with latency-based selection and failover
+
+    The ``node`` configuration key (and ``--node``) may list several
+    websocket endpoints, separated by commas. For every endpoint, the
+    pool keeps a moving average of its latency and of its error rate.
+    Connections are made to the endpoint with the best score, and a
+    read that fails because the connection broke is retried on the next
+    best endpoint. Broadcasts are never retried.
+
+    The scores are stored in piston's configuration (under an internal
+    key) when the process exits, so only endpoints without a recent
+    score are probed on startup.
+"""
+import json
+import time
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .storage import configStorage as config
+
+#: Configuration key the scores are stored under
+SCORES_KEY = "node_scores"
+
+#: Weight of a new measurement in the moving averages
+ALPHA = 0.3
+
+#: Scores older than this (in seconds) are refreshed by probing
+MAX_AGE = 24 * 60 * 60
+
+#: Endpoints that failed within this many seconds are used last
+RETRY_AFTER = 5 * 60
+
+#: Timeout for probes and for calls on pooled connections (in seconds)
+TIMEOUT = 10
+
+
+def parse_nodes(node):
+    """ Split the ``node`` option into a list of endpoints
+
+        :param node: Comma separated string or list of endpoints
+        :rtype: list
+    """
+    if not node:
+        return []
+    if isinstance(node, str):
+        node = node.replace(",", " ").split()
+    return list(node)
+
+
+def rpc_method(payload):
+    """ Name of the API method called by an RPC ``payload``
+    """
+    if payload.get("method") == "call":
+        return payload["params"][1]
+    return payload.get("method", "")
+
+
+def idempotent(payload):
+    """ Can ``payload`` be sent again (i.e. to another node)?
+    """
+    return not rpc_method(payload).startswith("broadcast")
+
+
+def connection_errors():
+    """ Exceptions that mean the connection to a node is broken
+    """
+    try:
+        from websocket import WebSocketException
+    except ImportError:
+        return (OSError,)
+    return (OSError, WebSocketException)
+
+
+def call(ws, method, params=None, api="database_api"):
+    """ Call ``api.method`` over an open websocket ``ws``
+    """
+    ws.send(json.dumps({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "call",
+        "params": [api, method, params or []]
+    }))
+    response = json.loads(ws.recv())
+    if "error" in response:
+        raise ValueError(response["error"].get("message", response["error"]))
+    return response["result"]
+
+
+def probe(url, timeout=TIMEOUT):
+    """ Latency of one ``get_dynamic_global_properties`` call on ``url``
+
+        :return: Seconds, including the connection setup
+    """
+    from websocket import create_connection
+    start = time.time()
+    ws = create_connection(url, timeout=timeout)
+    try:
+        call(ws, "get_dynamic_global_properties")
+    finally:
+        ws.close()
+    return time.time() - start
+
+
+class NodePool(object):
+    """ Scores of a list of endpoints
+
+        :param list urls: Endpoints
+        :param callable prober: Measures the latency of an endpoint
+            (defaults to :func:`probe`)
+    """
+    def __init__(self, urls, prober=None):
+        self.urls = list(urls)
+        self.prober = prober or probe
+        self.mutex = threading.Lock()
+        self.scores = {}
+        self.changed = False
+        stored = config[SCORES_KEY]
+        if stored:
+            try:
+                scores = json.loads(stored)
+            except ValueError:
+                scores = {}
+            self.scores = {
+                url: score for url, score in scores.items() if url in self.urls}
+
+    def record(self, url, latency=None, error=False):
+        """ Update the moving averages of ``url`` with a call that took
+            ``latency`` seconds or failed
+        """
+        with self.mutex:
+            now = time.time()
+            score = self.scores.get(url)
+            if score is None:
+                score = {"latency": latency or TIMEOUT,
+                         "errors": 1.0 if error else 0.0,
+                         "failed": 0}
+            else:
+                if latency is not None:
+                    score["latency"] += ALPHA * (latency - score["latency"])
+                score["errors"] += ALPHA * (float(error) - score["errors"])
+            if error:
+                score["failed"] = now
+            score["updated"] = now
+            self.scores[url] = score
+            self.changed = True
+
+    def score(self, url):
+        """ Expected cost of a call on ``url`` (lower is better)
+        """
+        score = self.scores[url]
+        return score["latency"] * (1 + 10 * score["errors"])
+
+    def stale(self):
+        """ Endpoints without a recent score
+        """
+        now = time.time()
+        return [url for url in self.urls
+                if url not in self.scores or
+                now - self.scores[url]["updated"] > MAX_AGE]
+
+    def probe(self):
+        """ Probe all endpoints without a recent score, concurrently
+        """
+        def measure(url):
+            try:
+                self.record(url, latency=self.prober(url))
+            except Exception:
+                self.record(url, error=True)
+
+        stale = self.stale()
+        if stale:
+            with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                list(executor.map(measure, stale))
+
+    def ranked(self):
+        """ Endpoints ordered from best to worst
+        """
+        now = time.time()
+
+        def key(url):
+            if url not in self.scores:
+                return (1, 0, self.urls.index(url))
+            recently_failed = now - self.scores[url]["failed"] < RETRY_AFTER
+            return (int(recently_failed), self.score(url), self.urls.index(url))
+
+        return sorted(self.urls, key=key)
+
+    def save(self):
+        """ Persist the scores in the configuration storage
+        """
+        if not self.changed:
+            return
+        with self.mutex:
+            stored = config[SCORES_KEY]
+            try:
+                scores = json.loads(stored) if stored else {}
+            except ValueError:
+                scores = {}
+            scores.update(self.scores)
+            config[SCORES_KEY] = json.dumps(scores)
+            self.changed = False
+
+    def attach(self, steem):
+        """ Route the RPC calls of ``steem`` through the pool
+
+            Latencies of all calls are recorded. If the connection
+            breaks during an idempotent call, the call is repeated on
+            the next best endpoint.
+        """
+        rpc = steem.rpc
+        rpcexec = rpc.rpcexec
+        errors = connection_errors()
+
+        def failover_rpcexec(payload):
+            tried = []
+            while True:
+                url = rpc.url
+                tried.append(url)
+                start = time.time()
+                try:
+                    result = rpcexec(payload)
+                except errors:
+                    self.record(url, error=True)
+                    if not idempotent(payload) or not self.reconnect(rpc, tried):
+                        raise
+                    continue
+                self.record(url, latency=time.time() - start)
+                return result
+
+        rpc.rpcexec = failover_rpcexec
+        return steem
+
+    def reconnect(self, rpc, tried):
+        """ Connect ``rpc`` to the best endpoint not in ``tried``
+
+            :return: ``False`` if no endpoint is left
+        """
+        errors = connection_errors()
+        for url in self.ranked():
+            if url in tried:
+                continue
+            rpc.url = url
+            try:
+                rpc.wsconnect()
+            except errors:
+                tried.append(url)
+                self.record(url, error=True)
+                continue
+            set_timeout(rpc)
+            return True
+        return False
+
+
+def set_timeout(rpc):
+    """ Let calls on ``rpc``'s websocket time out after :data:`TIMEOUT`
+    """
+    ws = getattr(rpc, "ws", None)
+    if ws is not None and hasattr(ws, "settimeout"):
+        ws.settimeout(TIMEOUT)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def pool(urls):
+    """ The process-wide :class:`NodePool` for ``urls``
+
+        Its scores are saved when the process exits.
+    """
+    key = tuple(urls)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = NodePool(urls)
+            _pools[key].probe()
+            atexit.register(_pools[key].save)
+        return _pools[key]
+
+
+def connect(options, factory=None):
+    """ Instantiate :class:`piston.steem.Steem` from ``options``
+
+        If ``options["node"]`` lists more than one endpoint, the
+        instance connects to the best one and fails over to the others.
+
+        :param dict options: Keyword arguments for
+            :class:`piston.steem.Steem`
+        :param callable factory: Creates the instance (defaults to
+            :class:`piston.steem.Steem`)
+    """
+    if factory is None:
+        from piston.steem import Steem as factory
+    urls = parse_nodes(options.get("node"))
+    if len(urls) < 2 or options.get("offline"):
+        if urls:
+            options = dict(options, node=urls[0])
+        return factory(**options)
+
+    nodes = pool(urls)
+    errors = connection_errors()
+    ranked = nodes.ranked()
+    for url in ranked:
+        try:
+            steem = factory(**dict(options, node=url))
+        except errors:
+            nodes.record(url, error=True)
+            if url == ranked[-1]:
+                raise
+            continue
+        set_timeout(steem.rpc)
+        return nodes.attach(steem)
@@ -0,0 +1,74 @@
+""" Threaded stages connected by bounded queues
+
+    :func:`threaded` runs an iterable (e.g. a generator that fetches or
+    renders) in a thread of its own and hands its items over through a
+    bounded queue. Chaining stages lets fetching, rendering and output
+    overlap, while the queue sizes bound the memory in between::
+
+        fetched = threaded(fetch(), maxsize=64)
+        rendered = threaded((render(item) for item in fetched), maxsize=64)
+        for text in rendered:
+            print(text)
+"""
+import queue
+import threading
+
+_done = object()
+
+
+class _Failure(object):
+
+    def __init__(self, exception):
+        self.exception = exception
+
+
+def threaded(iterable, maxsize=64):
+    """ Iterate over ``iterable`` in a separate thread
+
+        The stage starts right away, not only once the first item is
+        requested, so that several stages can be started at once.
+        Exceptions of the stage are raised in the consumer. If the
+        consumer stops early, the stage stops as well.
+
+        :param iterable iterable: The stage
+        :param int maxsize: Number of items buffered between the stage
+            and the consumer
+    """
+    items = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_done)
+        except Exception as e:
+            put(_Failure(e))
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return _consume(items, stop)
+
+
+def _consume(items, stop):
+    try:
+        while True:
+            item = items.get()
+            if item is _done:
+                return
+            if isinstance(item, _Failure):
+                raise item.exception
+            yield item
+    finally:
+        stop.set()
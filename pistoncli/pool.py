@@ -0,0 +1,78 @@
+""" Concurrent read-only access to the Steem API
+
+    A websocket connection cannot be shared between threads, so each
+    worker of a :class:`ReaderPool` opens its own read-only
+    :class:`piston.steem.Steem` instance (without wallet) the first time
+    it is used and keeps it for the lifetime of the pool.
+"""
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ReaderPool(object):
+    """ Thread pool of read-only Steem connections
+
+        :param dict options: Keyword arguments for
+            :class:`piston.steem.Steem` (see
+            :func:`pistoncli.commands.steem_options`)
+        :param int workers: Number of threads (and connections)
+        :param callable factory: Creates a connection from ``options``
+            (defaults to :class:`piston.steem.Steem`, see
+            :func:`pistoncli.nodes.connect`, with the cache of
+            :mod:`pistoncli.cache` if enabled)
+    """
+    def __init__(self, options, workers=4, factory=None):
+        self.options = dict(options)
+        # Reads do not need the wallet
+        self.options["wif"] = []
+        self.workers = workers
+        self.factory = factory
+        self.local = threading.local()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def steem(self):
+        """ The calling thread's connection
+        """
+        if not hasattr(self.local, "steem"):
+            from . import nodes, cache
+            steem = nodes.connect(self.options, factory=self.factory)
+            if self.factory is None:
+                steem = cache.attach(steem)
+            self.local.steem = steem
+        return self.local.steem
+
+    def _call(self, func, *args):
+        return func(self.steem(), *args)
+
+    def submit(self, func, *args):
+        """ Run ``func(steem, *args)`` on a worker
+
+            :rtype: :class:`concurrent.futures.Future`
+        """
+        return self.executor.submit(self._call, func, *args)
+
+    def map(self, func, items, prefetch=None):
+        """ Yield ``func(steem, item)`` for all ``items``, in order
+
+            The calls run concurrently, but at most ``prefetch`` (defaults
+            to twice the number of workers) results are held back, so
+            long (or endless) iterables are processed in constant memory.
+        """
+        prefetch = prefetch or 2 * self.workers
+        pending = collections.deque()
+        for item in items:
+            pending.append(self.submit(func, item))
+            if len(pending) >= prefetch:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
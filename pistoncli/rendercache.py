@@ -0,0 +1,209 @@
+""" Cache of rendered post bodies
+
+    Rendering a body with :mod:`pistoncli.markdown` only depends on the
+    body, the output width and the ``--format``, so the result is
+    cached under the SHA-256 hash of the body together with both. Every
+    process keeps the most recently used bodies in memory, which a
+    running ``piston daemon`` or ``piston shell`` shares between all of
+    its commands. With ``piston set render_cache true``, rendered
+    bodies are also kept in an sqlite database next to piston's
+    configuration storage, which all piston processes share.
+"""
+import os
+import sys
+import time
+import atexit
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from .storage import configStorage as config
+from . import markdown
+
+#: Rendered bodies kept in memory
+MEMORY_ENTRIES = 1024
+
+#: Rendered bodies kept on disk
+DISK_ENTRIES = 20000
+
+#: Trim the database after this many writes
+EVICT_EVERY = 100
+
+
+def disk_enabled():
+    """ Has the on-disk layer been enabled in the configuration?
+    """
+    return str(config["render_cache"]).lower() in ["true", "1", "yes", "on"]
+
+
+def cache_path():
+    return os.path.join(config.data_dir, "render_cache.sqlite")
+
+
+def render_body(body, format="markdown", width=markdown.WIDTH):
+    """ ``body`` as it is shown for ``--format``
+
+        Only ``markdown`` is rendered, other formats show the body as is.
+    """
+    if format == "markdown":
+        return markdown.render(body, width=width)
+    return body
+
+
+class RenderCache(object):
+    """ LRU of rendered bodies with an optional sqlite layer
+
+        :param int entries: Rendered bodies kept in memory
+        :param str path: Database file of the on-disk layer (``None``
+            keeps the cache in memory only)
+        :param int disk_entries: Rendered bodies kept on disk
+    """
+    def __init__(self, entries=MEMORY_ENTRIES, path=None,
+                 disk_entries=DISK_ENTRIES):
+        self.entries = entries
+        self.disk_entries = disk_entries
+        self.mutex = threading.RLock()
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.connection = None
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS render (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    accessed REAL
+                )
+            """)
+
+    @staticmethod
+    def key(body, width, format):
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        return "%s:%d:%s" % (digest, width, format)
+
+    def render(self, body, format="markdown", width=markdown.WIDTH):
+        """ :func:`render_body`, served from the cache if possible
+        """
+        key = self.key(body, width, format)
+        with self.mutex:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return self.memory[key]
+            value = self._load(key)
+            if value is not None:
+                self.disk_hits += 1
+                self._remember(key, value)
+                return value
+            self.misses += 1
+        # Render without holding the lock, so threads render concurrently
+        value = render_body(body, format=format, width=width)
+        with self.mutex:
+            self._remember(key, value)
+            self._store(key, value)
+        return value
+
+    def _remember(self, key, value):
+        self.memory[key] = value
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.entries:
+            self.memory.popitem(last=False)
+
+    def _load(self, key):
+        if self.connection is None:
+            return None
+        row = self.connection.execute(
+            "SELECT value FROM render WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute(
+            "UPDATE render SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.connection.commit()
+        return row[0]
+
+    def _store(self, key, value):
+        if self.connection is None:
+            return
+        self.connection.execute(
+            "INSERT OR REPLACE INTO render VALUES (?, ?, ?)",
+            (key, value, time.time()))
+        self.connection.commit()
+        self.writes += 1
+        if self.writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """ Remove the least recently used bodies above
+            ``disk_entries`` from the database
+        """
+        with self.mutex:
+            if self.connection is None:
+                return
+            self.connection.execute(
+                "DELETE FROM render WHERE key IN ("
+                "SELECT key FROM render ORDER BY accessed DESC "
+                "LIMIT -1 OFFSET ?)", (self.disk_entries,))
+            self.connection.commit()
+
+    def stats(self):
+        """ Hits (from memory and from disk), misses and the hit rate
+        """
+        with self.mutex:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.disk_hits) / float(requests)
+                             if requests else None),
+            }
+
+    def clear(self):
+        with self.mutex:
+            self.memory.clear()
+            if self.connection is not None:
+                self.connection.execute("DELETE FROM render")
+                self.connection.commit()
+
+    def close(self):
+        with self.mutex:
+            if self.connection is not None:
+                self.evict()
+                self.connection.close()
+                self.connection = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def instance():
+    """ The process-wide :class:`RenderCache`, closed when the process
+        exits
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache(path=cache_path() if disk_enabled() else None)
+            atexit.register(_cache.close)
+        return _cache
+
+
+def render(body, format="markdown", width=markdown.WIDTH):
+    """ ``body`` rendered for ``--format`` through the process-wide cache
+    """
+    return instance().render(body, format=format, width=width)
+
+
+def report(file=None):
+    """ Print the hit rate of the process-wide cache (``--verbose``)
+    """
+    stats = instance().stats()
+    if stats["hit_rate"] is None:
+        return
+    print("render cache: %d hits (%d from disk), %d misses, %.1f%% hit rate" % (
+        stats["hits"] + stats["disk_hits"], stats["disk_hits"],
+        stats["misses"], 100 * stats["hit_rate"]), file=file or sys.stderr)
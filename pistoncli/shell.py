@@ -0,0 +1,126 @@
+""" Interactive ``piston shell``
+
+    Every line is parsed with the same grammar as the ``piston``
+    executable and run against one long-lived
+    :class:`piston.steem.Steem` instance, so the websocket connection is
+    opened and the wallet is unlocked only once per session.
+"""
+import os
+import sys
+import cmd
+import time
+import shlex
+from .storage import configStorage as config
+from . import commands
+
+#: Commands that cannot be run from within the shell
+unavailable = ["shell", "daemon"]
+
+
+class Shell(cmd.Cmd):
+    """ Read-eval-print loop for piston sub-commands
+
+        :param piston.steem.Steem steem: Steem instance shared by all
+            commands
+        :param list global_argv: Global options (e.g. ``--node <url>``)
+            that are prepended to every line
+        :param str history: Path of the readline history file
+    """
+    intro = ('Piston shell. Type "help" for the list of commands, '
+             '"<command> -h" for their arguments and "exit" to quit.')
+    prompt = "piston> "
+
+    def __init__(self, steem, global_argv=None, history=None):
+        cmd.Cmd.__init__(self)
+        self.steem = steem
+        self.global_argv = global_argv or []
+        self.history = history or os.path.join(config.data_dir, "shell_history")
+        self.options = {}
+
+    def preloop(self):
+        try:
+            import readline
+            if os.path.exists(self.history):
+                readline.read_history_file(self.history)
+            readline.set_completer_delims(" \t\n")
+        except ImportError:
+            pass
+
+    def postloop(self):
+        try:
+            import readline
+            readline.write_history_file(self.history)
+        except (ImportError, OSError):
+            pass
+
+    def emptyline(self):
+        # Do not repeat the last command
+        pass
+
+    def do_EOF(self, line):
+        print()
+        return True
+
+    def do_exit(self, line):
+        """ Leave the shell """
+        return True
+
+    do_quit = do_exit
+
+    def do_help(self, line):
+        """ Show the available commands or the help of a command """
+        if line:
+            self.default(line + " --help")
+        else:
+            self.default("--help")
+
+    def default(self, line):
+        from .__main__ import build_parser
+        try:
+            argv = self.global_argv + shlex.split(line)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return
+
+        start = time.time()
+        try:
+            args = build_parser(argv).parse_args(argv)
+            if not hasattr(args, "command"):
+                print("No valid command given", file=sys.stderr)
+                return
+            if args.command in unavailable:
+                print("%s is not available in the shell" % args.command,
+                      file=sys.stderr)
+                return
+            commands.run(args.command, self.steem, args)
+        except SystemExit:
+            # argparse errors and --help
+            return
+        except KeyboardInterrupt:
+            print("Interrupted", file=sys.stderr)
+        except Exception as e:
+            print("%s: %s" % (type(e).__name__, str(e)), file=sys.stderr)
+        print("(%.0f ms)" % ((time.time() - start) * 1e3), file=sys.stderr)
+
+    def completenames(self, text, *ignored):
+        names = ["exit", "help", "quit"] + [
+            name for name in commands.registry if name not in unavailable]
+        return [name for name in names if name.startswith(text)]
+
+    def completedefault(self, text, line, begidx, endidx):
+        name = line.split()[0]
+        if name not in commands.registry:
+            return []
+        if name not in self.options:
+            from .__main__ import build_parser
+            parser = build_parser([name])
+            subparser = parser._subparsers._group_actions[0].choices[name]
+            self.options[name] = sorted(
+                option
+                for action in subparser._actions
+                for option in action.option_strings
+            )
+        return [option for option in self.options[name] if option.startswith(text)]
+
+    def complete_help(self, text, line, begidx, endidx):
+        return self.completenames(text)
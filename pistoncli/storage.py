@@ -0,0 +1,119 @@
+""" In-memory snapshot of piston's configuration storage
+
+    :class:`piston.storage.Configuration` runs one SQL query per key
+    lookup. The command line reads the same handful of keys over and
+    over to fill in argument defaults, so we load the whole
+    configuration table once, on first access, and serve all further
+    lookups from memory. Writes go through to the storage.
+
+    Long-running processes (``piston daemon``) call
+    :meth:`ConfigurationSnapshot.refresh` to pick up changes that other
+    processes (``piston set``) made to the storage in the meantime.
+"""
+import os
+import sqlite3
+
+
+class ConfigurationSnapshot(object):
+    """ Dict-like, read-cached view on :class:`piston.storage.Configuration`
+
+        :param storage: Configuration storage to wrap (defaults to
+            :data:`piston.storage.configStorage`, imported on first use)
+    """
+    def __init__(self, storage=None):
+        self._storage = storage
+        self._values = None
+        self._stamp = None
+        #: Number of times the underlying storage has been read
+        self.reads = 0
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            from piston.storage import configStorage
+            self._storage = configStorage
+        return self._storage
+
+    @property
+    def data_dir(self):
+        """ Directory that holds piston's local storage
+        """
+        storage = self.storage
+        return (getattr(storage, "data_dir", None) or
+                os.path.dirname(storage.sqlDataBaseFile))
+
+    def _read_all(self):
+        """ Read all stored keys with a single query
+        """
+        storage = self.storage
+        self.reads += 1
+        try:
+            connection = sqlite3.connect(storage.sqlDataBaseFile)
+            cursor = connection.cursor()
+            cursor.execute("SELECT key, value FROM %s" % storage.__tablename__)
+            values = dict(cursor.fetchall())
+            connection.close()
+            return values
+        except (AttributeError, sqlite3.Error):
+            # Not the sqlite backed storage we know, ask it key by key
+            return {key: storage[key] for key in storage}
+
+    def _file_stamp(self):
+        # Modification time and size of the database file
+        try:
+            stat = os.stat(self.storage.sqlDataBaseFile)
+        except (AttributeError, OSError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """ (Re)load the snapshot from the storage
+        """
+        self._stamp = self._file_stamp()
+        self._values = dict(getattr(self.storage, "defaults", {}))
+        self._values.update(self._read_all())
+
+    def refresh(self):
+        """ Reload the snapshot if the storage has been changed since it
+            was loaded
+
+            :return: ``True`` if the snapshot was reloaded
+        """
+        if self._values is None or self._file_stamp() == self._stamp:
+            return False
+        self.load()
+        return True
+
+    @property
+    def values(self):
+        if self._values is None:
+            self.load()
+        return self._values
+
+    def __getitem__(self, key):
+        """ Like :class:`piston.storage.Configuration`, returns ``None``
+            for unknown keys
+        """
+        return self.values.get(key)
+
+    def get(self, key, default=None):
+        value = self[key]
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __setitem__(self, key, value):
+        self.storage[key] = value
+        if self._values is not None:
+            self._values[key] = value
+            self._stamp = self._file_stamp()
+
+
+configStorage = ConfigurationSnapshot()
@@ -0,0 +1,78 @@
+""" Aggregates of an account history (``piston history --summary``)
+
+    The history is consumed page by page and every operation is added
+    to running sums per operation type, per counterparty and asset
+    (transfers) and per day and asset (rewards). Only these sums are
+    kept, so memory does not grow with the length of the history.
+"""
+
+#: Amount fields of reward operations
+REWARD_FIELDS = {
+    "author_reward": ["sbd_payout", "steem_payout", "vesting_payout"],
+    "curation_reward": ["reward"],
+    "comment_benefactor_reward": ["reward"],
+    "producer_reward": ["vesting_shares"],
+    "interest": ["interest"],
+    "liquidity_reward": ["payout"],
+    "fill_vesting_withdraw": ["deposited"],
+}
+
+
+class Summary(object):
+    """ Operation counts, transfers per counterparty and rewards per
+        day of the history of ``account``
+    """
+    def __init__(self, account):
+        self.account = account
+        #: Operations per type
+        self.counts = {}
+        #: Sent and received amounts per ``(counterparty, asset)``
+        self.transfers = {}
+        #: Rewards per ``(day, asset)``
+        self.rewards = {}
+        self.operations = 0
+
+    def add(self, entries):
+        """ Add the history ``entries`` (``[index, operation]``)
+        """
+        account = self.account
+        counts = self.counts
+        transfers = self.transfers
+        rewards = self.rewards
+        for _, op in entries:
+            kind, data = op["op"]
+            counts[kind] = counts.get(kind, 0) + 1
+            if kind == "transfer":
+                value, asset = data["amount"].split(" ")
+                if data["from"] == account:
+                    key, direction = (data["to"], asset), "sent"
+                else:
+                    key, direction = (data["from"], asset), "received"
+                sums = transfers.get(key)
+                if sums is None:
+                    sums = transfers[key] = {"sent": 0.0, "received": 0.0}
+                sums[direction] += float(value)
+            elif kind in REWARD_FIELDS:
+                day = op["timestamp"][:10]
+                for field in REWARD_FIELDS[kind]:
+                    if field in data:
+                        value, asset = data[field].split(" ")
+                        key = (day, asset)
+                        rewards[key] = rewards.get(key, 0.0) + float(value)
+        self.operations += len(entries)
+
+    def json(self):
+        return {
+            "account": self.account,
+            "operations": self.operations,
+            "counts": self.counts,
+            "transfers": [
+                {"counterparty": party, "asset": asset,
+                 "sent": sums["sent"], "received": sums["received"]}
+                for (party, asset), sums in sorted(self.transfers.items())
+            ],
+            "rewards": [
+                {"day": day, "asset": asset, "amount": amount}
+                for (day, asset), amount in sorted(self.rewards.items())
+            ],
+        }
@@ -0,0 +1,125 @@
+""" Tables that are printed while their rows arrive
+
+    :class:`prettytable.PrettyTable` keeps all rows and computes the
+    column widths over all of them before anything is printed. A
+    :class:`StreamingTable` instead takes its column widths from the
+    header and the first ``sample`` rows (or from fixed ``widths``) and
+    prints every later row right away, so long listings start printing
+    immediately and their memory does not grow with the number of rows.
+    Cells wider than their column are wrapped onto several lines. The
+    layout is the same as PrettyTable's.
+"""
+import re
+import sys
+
+#: Number of rows the column widths are taken from
+SAMPLE = 100
+
+
+class StreamingTable(object):
+    """ Table that prints its rows as they are added
+
+        :param list header: Column names
+        :param dict widths: Fixed widths per column (the others are
+            sampled)
+        :param dict max_widths: Maximum widths of sampled columns
+        :param int sample: Number of rows the widths are sampled from
+            (``0`` uses the width of the header)
+        :param file: Stream the table is printed to (defaults to
+            ``sys.stdout``)
+
+        Columns are left aligned unless set otherwise through
+        :attr:`align` (``"l"``, ``"c"`` or ``"r"`` per column name).
+        Use it as a context manager or call :meth:`close` to print the
+        last rows and the bottom border.
+    """
+    def __init__(self, header, widths=None, max_widths=None, sample=SAMPLE,
+                 file=None):
+        self.header = list(header)
+        self.fixed = widths or {}
+        self.max_widths = max_widths or {}
+        self.sample = sample
+        self.file = file or sys.stdout
+        self.align = {}
+        self.rows = []
+        self.widths = None
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_row(self, row):
+        row = [str(cell) for cell in row]
+        self.count += 1
+        if self.widths is None:
+            if (len(self.rows) < self.sample and
+                    len(self.fixed) < len(self.header)):
+                self.rows.append(row)
+                return
+            self._start()
+        self._write(row)
+
+    def close(self):
+        """ Print the remaining rows and the bottom border
+        """
+        if self.widths is None:
+            self._start()
+        self.file.write(self.border + "\n")
+        self.file.flush()
+
+    def _start(self):
+        widths = []
+        for i, name in enumerate(self.header):
+            if name in self.fixed:
+                widths.append(self.fixed[name])
+                continue
+            width = max([len(name)] + [
+                len(line) for row in self.rows for line in row[i].splitlines()
+            ])
+            if name in self.max_widths:
+                width = min(width, max(self.max_widths[name], len(name)))
+            widths.append(width)
+        self.widths = widths
+        # Lines of at most w characters, broken at spaces if possible
+        self.wrappers = [
+            re.compile(r"\S.{0,%d}(?=\s|$)|\S{1,%d}" % (max(w - 1, 0), max(w, 1)))
+            for w in widths
+        ]
+        self.border = "+" + "+".join("-" * (w + 2) for w in widths) + "+"
+        self.formats = [
+            "{:%s%d}" % ({"r": ">", "c": "^"}.get(self.align.get(name), "<"), w)
+            for name, w in zip(self.header, widths)
+        ]
+        self.file.write(self.border + "\n")
+        self.file.write(self._line(self.formats, self.header) + "\n")
+        self.file.write(self.border + "\n")
+        rows, self.rows = self.rows, []
+        for row in rows:
+            self._write(row)
+
+    def _line(self, formats, cells):
+        return "| " + " | ".join(
+            f.format(cell) for f, cell in zip(formats, cells)) + " |"
+
+    def _write(self, row):
+        if all(len(cell) <= w and "\n" not in cell
+               for cell, w in zip(row, self.widths)):
+            self.file.write(self._line(self.formats, row) + "\n")
+            return
+        columns = []
+        for cell, w, wrapper in zip(row, self.widths, self.wrappers):
+            lines = []
+            for line in cell.splitlines() or [""]:
+                if len(line) > w:
+                    lines.extend(l.rstrip() for l in wrapper.findall(line))
+                else:
+                    lines.append(line)
+            columns.append(lines)
+        height = max(len(lines) for lines in columns)
+        for i in range(height):
+            self.file.write(self._line(self.formats, [
+                lines[i] if i < len(lines) else "" for lines in columns
+            ]) + "\n")
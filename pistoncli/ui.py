@@ -1,15 +1,13 @@
 import sys
 import json
 from prettytable import PrettyTable, ALL as allBorders
-from textwrap import fill, TextWrapper
 import frontmatter
-import re
-from piston.storage import configStorage as config
+import itertools
 from piston.utils import constructIdentifier
 from piston import steem as stm
-
-# For recursive display of a discussion thread (--comments + --parents)
-currentThreadDepth = 0
+from . import rendercache
+from .table import StreamingTable
+from .memos import MemoDecoder
 
 
 class UIError(Exception):
@@ -17,160 +15,59 @@ class UIError(Exception):
 
 
 def markdownify(t):
-    width = 120
-
-    def mdCodeBlock(t):
-        return ("    " +
-                Back.WHITE +
-                Fore.BLUE +
-                "   " +
-                t.group(1) +
-                "   " +
-                Fore.RESET +
-                Back.RESET)
-
-    def mdCodeInline(t):
-        return (Back.WHITE +
-                Fore.BLUE +
-                " " +
-                t.group(1) +
-                " " +
-                Fore.RESET +
-                Back.RESET)
-
-    def mdList(t):
-        return (Fore.GREEN +
-                " " +
-                t.group(1) +
-                " " +
-                Fore.RESET +
-                t.group(2))
-
-    def mdLink(t):
-        return (Fore.RED +
-                "[%s]" % t.group(1) +
-                Fore.GREEN +
-                "(%s)" % t.group(2) +
-                Fore.RESET)
-
-    def mdHeadline(t):
-        colors = [
-            Back.RED,
-            Back.GREEN,
-            Back.YELLOW,
-            Back.BLUE,
-            Back.MAGENTA,
-            Back.CYAN,
-        ]
-        color = colors[len(t.group(1)) % len(colors)]
-        # width = 80 - 15 * len(t.group(1))
-        headline = (color +
-                    '{:^{len}}'.format(t.group(2), len=width) +
-                    Back.RESET)
-        return (Style.BRIGHT +
-                headline +
-                Style.NORMAL)
-
-    def mdBold(t):
-        return (Style.BRIGHT +
-                t.group(1) +
-                Style.NORMAL)
-
-    def mdLight(t):
-        return (Style.DIM +
-                t.group(1) +
-                Style.NORMAL)
-
-    def wrapText(t):
-        postWrapper = TextWrapper()
-        postWrapper.width = width
-        return ("\n".join(postWrapper.fill(l) for l in t.splitlines()))
-
-    import colorama
-    from colorama import Fore, Back, Style
-    colorama.init()
-
-    t = re.sub(r"\n\n", "{NEWLINE}", t, flags=re.M)
-    t = re.sub(r"\n(^[^#\-\*].*)", r"\1", t, flags=re.M)
-    t = re.sub(r"{NEWLINE}", "\n\n", t, flags=re.M)
-
-    t = re.sub(r"\*\*(.*)\*\*", mdBold, t, flags=re.M)
-    t = re.sub(r"\*(.*)\*", mdLight, t, flags=re.M)
-
-    t = re.sub(r"`(.*)`", mdCodeInline, t, flags=re.M)
-    t = re.sub(r"^ {4,}(.*)", mdCodeBlock, t, flags=re.M)
-    t = re.sub(r"^([\*\-])\s*(.*)", mdList, t, flags=re.M)
-    t = re.sub(r"\[(.*)\]\((.*)\)", mdLink, t, flags=re.M)
-
-    t = wrapText(t)
-
-    t = re.sub(r"^(#+)\s*(.*)$", mdHeadline, t, flags=re.M)
-    t = re.sub(r"```(.*)```", mdCodeBlock, t, flags=re.M)
-
-    return t
-
-
-def __get_text_wrapper(width=60):
-    """
-    Get text wrapper with a fixed with.
-
-    :param width: width of the wrapper. Default 60.
-    :return: text wrapper
-    :rtype: :py:class:`TextWrapper`
+    """ Render markdown ``t`` for the terminal (see :mod:`pistoncli.markdown`)
     """
-    wrapper = TextWrapper()
-    wrapper.width = width
-    wrapper.subsequent_indent = " "
-
-    return wrapper
+    from .markdown import render
+    return render(t)
 
 
 def list_posts(discussions, custom_columns=None):
     """
-    List posts using PrettyTable. Use default layout if custom column list
+    List posts in a :class:`pistoncli.table.StreamingTable`, printing
+    every row as it arrives. Use default layout if custom column list
     is not specified. Default layout is [ "identifier", "title", "category",
     "replies", "votes", "payouts"]. Custom layout can contain one or more
     allowed columns and rows always start with [ "identifier", "title" ].
 
-    :param discussions: discussions (posts) list
+    :param discussions: discussions (posts) list or iterator
     :type discussions: list
     :param custom_columns: custom columns to display
     :type custom_columns: list
 
     :raises: :py:class:`UIError`: If tried to use wrong column(s).
     """
-    if not discussions:
+    if isinstance(discussions, dict):
+        discussions = [discussions[d] for d in discussions]
+    discussions = iter(discussions or [])
+    first = next(discussions, None)
+    if first is None:
         return
+    discussions = itertools.chain([first], discussions)
+    max_widths = {"identifier": 60, "title": 60}
     if not custom_columns:
-        t = PrettyTable([
+        t = StreamingTable([
             "identifier",
             "title",
             "category",
             "replies",
             # "votes",
             "payouts",
-        ])
-        t.align = "l"
+        ], max_widths=max_widths)
         t.align["payouts"] = "r"
         # t.align["votes"] = "r"
         t.align["replies"] = "c"
-        for d in discussions:
-            # Some discussions are dicts or identifiers
-            if isinstance(d, str):
-                d = discussions[d]
-            identifier = constructIdentifier(d["author"], d["permlink"])
-            identifier_wrapper = __get_text_wrapper()
-            row = [
-                identifier_wrapper.fill(identifier),
-                identifier_wrapper.fill(d["title"]),
-                d["category"],
-                d["children"],
-                # d["net_rshares"],
-                d["pending_payout_value"],
-            ]
-            t.add_row(row)
+        with t:
+            for d in discussions:
+                t.add_row([
+                    constructIdentifier(d["author"], d["permlink"]),
+                    d["title"],
+                    d["category"],
+                    d["children"],
+                    # d["net_rshares"],
+                    d["pending_payout_value"],
+                ])
     else:
-        available_attrs = set(vars(discussions[0]))
+        available_attrs = set(vars(first))
         if not set(custom_columns).issubset(available_attrs):
             wrong_columns = set(custom_columns).difference(available_attrs)
             raise UIError("Please use allowed column names only: %s. "
@@ -181,96 +78,106 @@ def list_posts(discussions, custom_columns=None):
             if c in custom_columns:
                 custom_columns.insert(0, custom_columns.pop(
                     custom_columns.index(c)))
-        t = PrettyTable(custom_columns)
-        t.align = "l"
-        for d in discussions:
-            display_columns = custom_columns.copy()
-            if isinstance(d, str):
-                d = discussions[d]
-            identifier = constructIdentifier(d["author"], d["permlink"])
-            identifier_wrapper = __get_text_wrapper()
-            row = []
-            # identifier and title always go first if available
-            if "identifier" in display_columns:
-                row.append(identifier_wrapper.fill(identifier))
-                display_columns.remove("identifier")
-            if "title" in display_columns:
-                row.append(identifier_wrapper.fill(d["title"]))
-                display_columns.remove("title")
-            for column in display_columns:
-                row.append(d[column])
-            if row:
-                t.add_row(row)
-    print(t)
+        with StreamingTable(custom_columns, max_widths=max_widths) as t:
+            for d in discussions:
+                row = []
+                for column in custom_columns:
+                    if column == "identifier":
+                        row.append(constructIdentifier(d["author"], d["permlink"]))
+                    else:
+                        row.append(d[column])
+                if row:
+                    t.add_row(row)
+
+
+def format_post(post, format="markdown"):
+    """ ``post`` with its author, permlink and identifier as YAML header
+    """
+    meta = {}
+    for key in ["author", "permlink"]:
+        meta[key] = post[key]
+    meta["reply"] = "@{author}/{permlink}".format(**post)
+    body = rendercache.render(post["body"], format=format)
+    yaml = frontmatter.Post(body, **meta)
+    return frontmatter.dumps(yaml)
+
+
+def dump_post(post, format="markdown"):
+    print(format_post(post, format=format))
 
 
 def dump_recursive_parents(rpc,
                            post_author,
                            post_permlink,
                            limit=1,
-                           format="markdown"):
-    global currentThreadDepth
+                           format="markdown",
+                           discussion=None):
+    """ Print up to ``limit`` parents of a post (the oldest first),
+        followed by the post itself
 
-    limit = int(limit)
-
-    postWrapper = TextWrapper()
-    postWrapper.width = 120
-    postWrapper.initial_indent = "  " * (limit)
-    postWrapper.subsequent_indent = "  " * (limit)
+        :param pistoncli.discussion.Discussion discussion: Reuse the
+            posts fetched by this discussion
+    """
+    from .discussion import Discussion
+    discussion = discussion or Discussion(rpc)
+    for post in discussion.ancestors(post_author, post_permlink, int(limit)):
+        dump_post(post, format=format)
 
-    if limit > currentThreadDepth:
-        currentThreadDepth = limit + 1
 
-    post = rpc.get_content(post_author, post_permlink)
+def dump_recursive_comments(rpc,
+                            post_author,
+                            post_permlink,
+                            format="markdown",
+                            pool=None,
+                            discussion=None,
+                            max_depth=None,
+                            limit=None):
+    """ Print all replies below a post, depth first
+
+        Fetching, rendering and printing run concurrently, connected by
+        bounded queues, so the first replies show up right away and
+        memory does not grow with the size of the thread.
+
+        :param pistoncli.pool.ReaderPool pool: Fetch replies concurrently
+        :param pistoncli.discussion.Discussion discussion: Reuse the
+            posts fetched by this discussion
+        :param int max_depth: Only show replies up to this depth
+        :param int limit: Only show this many replies
+    """
+    from .discussion import Discussion
+    from .pipeline import threaded
+    discussion = discussion or Discussion(rpc, pool=pool)
+    fetched = threaded(discussion.stream(
+        post_author,
+        post_permlink,
+        max_depth=max_depth,
+        limit=limit
+    ))
+    rendered = threaded(format_post(post, format=format) for _, post in fetched)
+    for text in rendered:
+        print(text)
+        sys.stdout.flush()
 
-    if limit and post["parent_author"]:
-        parent = rpc.get_content_replies(post["parent_author"], post["parent_permlink"])
-        if len(parent):
-            dump_recursive_parents(rpc, post["parent_author"], post["parent_permlink"], limit - 1)
 
-    meta = {}
-    for key in ["author", "permlink"]:
-        meta[key] = post[key]
-    meta["reply"] = "@{author}/{permlink}".format(**post)
-    if format == "markdown":
-        body = markdownify(post["body"])
-    else:
-        body = post["body"]
-    yaml = frontmatter.Post(body, **meta)
-    print(frontmatter.dumps(yaml))
+_decoder = None
 
 
-def dump_recursive_comments(rpc,
-                            post_author,
-                            post_permlink,
-                            depth=0,
-                            format="markdown"):
-    global currentThreadDepth
-    postWrapper = TextWrapper()
-    postWrapper.width = 120
-    postWrapper.initial_indent = "  " * (depth + currentThreadDepth)
-    postWrapper.subsequent_indent = "  " * (depth + currentThreadDepth)
-
-    depth = int(depth)
-
-    posts = rpc.get_content_replies(post_author, post_permlink)
-    for post in posts:
-        meta = {}
-        for key in ["author", "permlink"]:
-            meta[key] = post[key]
-        meta["reply"] = "@{author}/{permlink}".format(**post)
-        if format == "markdown":
-            body = markdownify(post["body"])
-        else:
-            body = post["body"]
-        yaml = frontmatter.Post(body, **meta)
-        print(frontmatter.dumps(yaml))
-        reply = rpc.get_content_replies(post["author"], post["permlink"])
-        if len(reply):
-            dump_recursive_comments(rpc, post["author"], post["permlink"], depth + 1)
+def _memo_decoder():
+    global _decoder
+    if _decoder is None:
+        import atexit
+        _decoder = MemoDecoder(stm.Steem())
+        atexit.register(_decoder.close)
+    return _decoder
 
 
 def format_operation_details(op, memos=False):
+    """ Summary of the operation ``op``
+
+        :param memos: Decode the memos of transfers, with the given
+            :class:`pistoncli.memos.MemoDecoder` or (``True``) with one
+            of a new session
+    """
     if op[0] == "vote":
         return "%s: %s" % (
             op[1]["voter"],
@@ -289,12 +196,9 @@ def format_operation_details(op, memos=False):
         )
 
         if memos:
-            memo = op[1]["memo"]
-            if len(memo) > 0 and memo[0] == "#":
-                steem = stm.Steem()
-                # memo = steem.decode_memo(memo, op[1]["from"])
-                memo = steem.decode_memo(memo, op)
-            str_ += " (%s)" % memo
+            if not isinstance(memos, MemoDecoder):
+                memos = _memo_decoder()
+            str_ += " (%s)" % memos.decode(op[1]["memo"])
         return str_
     elif op[0] == "interest":
         return "%s" % (
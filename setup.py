@@ -19,7 +19,7 @@ setup(
     maintainer_email='<Fabian@chainsquad.com>',
     url='http://cli.piston.rocks',
     keywords=['steem', 'library', 'api', 'rpc', 'cli'],
-    packages=["pistoncli"],
+    packages=["pistoncli", "pistoncli.commands"],
     # https://github.com/pallets/flask/issues/1562
     zip_safe=False,
     classifiers=[
@@ -0,0 +1,58 @@
+import io
+import sys
+import threading
+import unittest
+from pistoncli.batch import parse_line, parse_args, ThreadOutput
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_parse_line(self):
+        self.assertIsNone(parse_line(""))
+        self.assertIsNone(parse_line("  # comment"))
+        self.assertEqual(parse_line('upvote "@a/b" --weight 50'),
+                         ["upvote", "@a/b", "--weight", "50"])
+        self.assertEqual(parse_line('["transfer", "bob", 1.5, "SBD"]'),
+                         ["transfer", "bob", "1.5", "SBD"])
+        self.assertEqual(parse_line('{"argv": ["follow", "bob"]}'),
+                         ["follow", "bob"])
+        with self.assertRaises(ValueError):
+            parse_line('["unterminated"')
+
+    def test_parse_args_help(self):
+        stdout = io.StringIO()
+        sys.stdout, saved = stdout, sys.stdout
+        try:
+            args, error = parse_args(["config", "--help"])
+        finally:
+            sys.stdout = saved
+        self.assertIsNone(args)
+        self.assertEqual(error, "help is not supported in batch mode")
+        self.assertEqual(stdout.getvalue(), "")
+
+        args, error = parse_args(["config", "--unknown"])
+        self.assertIsNone(args)
+        self.assertIn("unrecognized arguments", error)
+
+    def test_thread_output(self):
+        stream = io.StringIO()
+        output = ThreadOutput(stream)
+        captured = {}
+
+        def worker(name):
+            with output.capture() as buffer:
+                output.write(name)
+            captured[name] = buffer.getvalue()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in "abc"]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        output.write("main")
+        self.assertEqual(captured, {"a": "a", "b": "b", "c": "c"})
+        self.assertEqual(stream.getvalue(), "main")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from pistoncli.bundle import Bundle
+
+
+class Vote(dict):
+    pass
+
+
+class FakeSteem(object):
+
+    def __init__(self):
+        self.transactions = []
+
+    def finalizeOp(self, ops, account, permission):
+        self.transactions.append((account, permission, ops))
+        return len(self.transactions)
+
+    def follow(self, name, account=None):
+        return self.finalizeOp({"follow": name}, account, "posting")
+
+    def transfer(self, to, account=None):
+        return self.finalizeOp({"to": to}, account, "active")
+
+    def vote(self, identifier, voter=None):
+        return self.finalizeOp(
+            Vote(voter=voter, permlink=identifier), voter, "posting")
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_group_by_signer(self):
+        steem = FakeSteem()
+        bundle = Bundle(steem)
+        with bundle.collect():
+            steem.follow("a", account="x")
+            steem.transfer("b", account="x")
+            steem.follow("c", account="y")
+            steem.follow("d", account="x")
+        self.assertEqual(steem.transactions, [])
+
+        results, stats = bundle.broadcast()
+        self.assertEqual([r["result"] for r in results], [1, 2, 3])
+        self.assertEqual([r["status"] for r in results], ["ok"] * 3)
+        self.assertEqual(steem.transactions, [
+            ("x", "posting", [{"follow": "a"}, {"follow": "d"}]),
+            ("x", "active", [{"to": "b"}]),
+            ("y", "posting", [{"follow": "c"}]),
+        ])
+        self.assertEqual(stats["operations"], 4)
+        self.assertEqual(stats["transactions"], 3)
+
+    def test_limits(self):
+        steem = FakeSteem()
+        bundle = Bundle(steem, max_ops=2)
+        with bundle.collect():
+            for name in "abcde":
+                steem.follow(name, account="x")
+        self.assertEqual(
+            [len(ops) for _, _, ops in bundle.transactions()], [2, 2, 1])
+
+        bundle = Bundle(steem, max_size=300)
+        with bundle.collect():
+            for name in "abc":
+                steem.follow(name * 30, account="x")
+        self.assertEqual(
+            [len(ops) for _, _, ops in bundle.transactions()], [1, 1, 1])
+
+    def test_one_vote_per_voter(self):
+        import time
+        steem = FakeSteem()
+        bundle = Bundle(steem, vote_interval=0.2)
+        with bundle.collect():
+            steem.vote("a", voter="foo")
+            steem.follow("x", account="foo")
+            steem.vote("b", voter="foo")
+            steem.vote("c", voter="bar")
+        self.assertEqual(
+            [(account, [op.get("permlink", "follow") for op in ops])
+             for account, _, ops in bundle.transactions()],
+            [("foo", ["a", "follow"]), ("bar", ["c"]), ("foo", ["b"])])
+
+        start = time.time()
+        results, stats = bundle.broadcast()
+        self.assertEqual(stats["transactions"], 3)
+        self.assertGreaterEqual(time.time() - start, 0.2)
+
+    def test_errors(self):
+        class Failing(FakeSteem):
+            def finalizeOp(self, ops, account, permission):
+                if account == "y":
+                    raise ValueError("missing authority")
+                return FakeSteem.finalizeOp(self, ops, account, permission)
+
+        def collect(steem):
+            bundle = Bundle(steem)
+            with bundle.collect():
+                steem.follow("a", account="x")
+                steem.follow("b", account="y")
+                steem.transfer("c", account="x")
+            return bundle
+
+        steem = Failing()
+        results, stats = collect(steem).broadcast()
+        self.assertEqual(
+            [(r["account"], r["status"]) for r in results],
+            [("x", "ok"), ("y", "error"), ("x", "ok")])
+        self.assertEqual(results[1]["error"], "missing authority")
+        self.assertEqual(results[1]["operations"], [{"follow": "b"}])
+        self.assertEqual(len(steem.transactions), 2)
+        self.assertEqual(stats["failed"], 1)
+
+        steem = Failing()
+        results, stats = collect(steem).broadcast(stop_on_error=True)
+        self.assertEqual(
+            [r["status"] for r in results], ["ok", "error", "skipped"])
+        self.assertEqual(results[2]["operations"], [{"to": "c"}])
+        self.assertEqual(len(steem.transactions), 1)
+        self.assertEqual(stats["failed"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
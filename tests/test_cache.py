@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pistoncli import cache
+from pistoncli.storage import ConfigurationSnapshot
+
+
+class RPC(object):
+
+    def __init__(self):
+        self.calls = []
+        self.lib = 100
+
+    def rpcexec(self, payload):
+        method, params = payload["params"][1], payload["params"][2]
+        self.calls.append(method)
+        if method == "get_dynamic_global_properties":
+            return {"last_irreversible_block_num": self.lib}
+        if method == "get_block":
+            return {"previous": params[0] - 1}
+        if method == "get_account_history":
+            start, limit = params[1:]
+            start = 150 if start < 0 else start
+            return [[i, {"block": i}] for i in range(start - limit, start + 1)]
+        if method == "get_content":
+            return {"last_payout": "2016-08-01T00:00:00",
+                    "cashout_time": "1969-12-31T23:59:59"}
+        return {}
+
+
+class Steem(object):
+
+    def __init__(self, chain_id=None):
+        self.rpc = RPC()
+        if chain_id:
+            self.rpc.chain_params = {"chain_id": chain_id}
+
+
+def call(steem, method, *params):
+    return steem.rpc.rpcexec({"method": "call", "params": [0, method, list(params)]})
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.config = cache.config
+        cache.config = ConfigurationSnapshot({})
+        self.cache = cache.RPCCache(os.path.join(self.dir, "cache.sqlite"))
+        self.steem = self.cache.attach(Steem())
+
+    def tearDown(self):
+        cache.config = self.config
+        self.cache.close()
+        shutil.rmtree(self.dir)
+
+    def test_irreversible_blocks(self):
+        rpc = self.steem.rpc
+        call(self.steem, "get_block", 50)
+        call(self.steem, "get_block", 50)
+        self.assertEqual(rpc.calls.count("get_block"), 1)
+        self.assertEqual(rpc.calls.count("get_dynamic_global_properties"), 1)
+
+        # Reversible blocks are refetched
+        self.cache.lib_updated = 0
+        call(self.steem, "get_block", 120)
+        call(self.steem, "get_block", 120)
+        self.assertEqual(rpc.calls.count("get_block"), 3)
+
+        stats = {row["method"]: row for row in self.cache.stats()}
+        self.assertEqual(stats["get_block"]["hits"], 1)
+        self.assertEqual(stats["get_block"]["misses"], 3)
+        self.assertEqual(stats["get_block"]["entries"], 1)
+
+    def test_history_and_content(self):
+        rpc = self.steem.rpc
+        for _ in range(2):
+            call(self.steem, "get_account_history", "xeroc", 80, 10)
+            call(self.steem, "get_account_history", "xeroc", -1, 10)
+            call(self.steem, "get_content", "xeroc", "piston")
+            call(self.steem, "get_content_replies", "xeroc", "piston")
+        self.assertEqual(rpc.calls.count("get_account_history"), 3)
+        # Posts keep changing after their payout
+        self.assertEqual(rpc.calls.count("get_content"), 2)
+        self.assertEqual(rpc.calls.count("get_content_replies"), 2)
+
+    def test_chains(self):
+        steem = self.cache.attach(Steem("0" * 64))
+        golos = self.cache.attach(Steem("782a3039b478c839e4cb0c941ff4eaeb7df40bdd68bd441afd444b9da763de12"))
+        for _ in range(2):
+            call(steem, "get_block", 50)
+            call(golos, "get_block", 50)
+        self.assertEqual(steem.rpc.calls.count("get_block"), 1)
+        self.assertEqual(golos.rpc.calls.count("get_block"), 1)
+
+    def test_eviction(self):
+        self.cache.max_size = 200
+        for block in range(1, 20):
+            call(self.steem, "get_block", block)
+        self.cache.evict()
+        size = sum(row["size"] for row in self.cache.stats())
+        self.assertLessEqual(size, 200)
+        # The most recently used entry is kept
+        found, value = self.cache.get("get_block", [19])
+        self.assertTrue(found)
+
+        self.cache.max_age = -1
+        self.cache.evict()
+        self.assertEqual(sum(row["entries"] for row in self.cache.stats()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
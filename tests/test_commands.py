@@ -0,0 +1,30 @@
+import unittest
+from pistoncli import commands
+from pistoncli.__main__ import selected_command, build_parser
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_registry(self):
+        for name in commands.registry:
+            module = commands.load(name)
+            self.assertTrue(callable(getattr(module, "parser_" + name)))
+            self.assertTrue(callable(getattr(module, "command_" + name)))
+
+    def test_selected_command(self):
+        parser = build_parser([])
+        self.assertEqual(selected_command(parser, ["config"]), "config")
+        self.assertEqual(selected_command(parser, ["--node", "info", "list"]), "list")
+        self.assertEqual(selected_command(parser, ["-d", "upvote", "@a/b"]), "upvote")
+        self.assertEqual(selected_command(parser, ["--node=wss://x", "read"]), "read")
+        self.assertIsNone(selected_command(parser, ["--help"]))
+
+    def test_lazy_arguments(self):
+        args = build_parser(["set", "limit", "5"]).parse_args(["set", "limit", "5"])
+        self.assertEqual(args.command, "set")
+        self.assertEqual(args.key, "limit")
+        self.assertEqual(args.value, "5")
+
+
+if __name__ == '__main__':
+    unittest.main()
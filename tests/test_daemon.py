@@ -0,0 +1,114 @@
+import io
+import os
+import sys
+import stat
+import shutil
+import argparse
+import tempfile
+import threading
+import unittest
+import contextlib
+from unittest import mock
+from pistoncli import daemon, commands
+
+OPTIONS = {"node": "wss://node", "nobroadcast": True, "wif": []}
+
+
+class Config(object):
+
+    def refresh(self):
+        return False
+
+
+def request(command, options=OPTIONS, **args):
+    args["command"] = command
+    return {"options": options, "args": args, "tty": {}}
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "piston.sock")
+        self.daemon = daemon.Daemon(None, OPTIONS, path=self.path,
+                                    unlock_timeout=0)
+        patches = [
+            mock.patch.object(daemon, "config", Config()),
+            mock.patch.object(commands, "run", self.run_command),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.ran = []
+
+    def tearDown(self):
+        self.daemon.server_close()
+        shutil.rmtree(self.directory)
+
+    def run_command(self, name, steem, args):
+        self.ran.append(name)
+        print("balance of %s" % args.account)
+        if args.account == "missing":
+            print("Account missing does not exist", file=sys.stderr)
+            sys.exit(1)
+
+    def test_socket_mode(self):
+        mode = stat.S_IMODE(os.stat(self.path).st_mode)
+        self.assertEqual(mode, 0o600)
+
+    def test_fallback(self):
+        # Other connection options
+        response = self.daemon.execute(
+            request("balance", options={"node": "wss://other"}, account="a"))
+        self.assertEqual(response, {"status": "fallback"})
+        # Interactive commands prompt on the client's terminal
+        response = self.daemon.execute(request("addkey"))
+        self.assertEqual(response, {"status": "fallback"})
+        # Commands without RPC are cheap in-process
+        response = self.daemon.execute(request("set", key="limit", value="5"))
+        self.assertEqual(response, {"status": "fallback"})
+        self.assertEqual(self.ran, [])
+
+    def test_locked_wallet(self):
+        response = self.daemon.execute(request("upvote", post="@a/b"))
+        self.assertEqual(response, {"status": "fallback"})
+        self.daemon.unlock()
+        response = self.daemon.execute(request("balance", account="a"))
+        self.assertEqual(response, {"status": "ok"})
+        self.assertEqual(self.ran, ["balance"])
+
+    def test_output_and_exit_code(self):
+        sent = []
+        response = self.daemon.execute(
+            request("balance", account="missing"), sent.append)
+        self.assertEqual(response, {"status": "error", "error": "", "code": 1})
+        self.assertEqual(sent, [
+            {"stderr": "Account missing does not exist"},
+            {"stderr": "\n"},
+            {"stdout": "balance of missing\n"},
+        ])
+
+    def test_forward_and_stop(self):
+        thread = threading.Thread(target=self.daemon.serve_forever)
+        thread.start()
+        try:
+            args = argparse.Namespace(command="balance", account="a")
+            stdout = io.StringIO()
+            with mock.patch.object(commands, "steem_options",
+                                   lambda args: OPTIONS), \
+                    contextlib.redirect_stdout(stdout):
+                self.assertTrue(daemon.forward(args, path=self.path))
+                args.account = "missing"
+                with self.assertRaises(SystemExit) as e:
+                    daemon.forward(args, path=self.path)
+            self.assertEqual(e.exception.code, 1)
+            self.assertEqual(stdout.getvalue(),
+                             "balance of a\nbalance of missing\n")
+        finally:
+            self.assertTrue(daemon.stop(self.path))
+            thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
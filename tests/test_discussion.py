@@ -0,0 +1,114 @@
+import unittest
+from pistoncli.discussion import Discussion, identifier
+
+
+def post(author, permlink, children=0):
+    return {"author": author, "permlink": permlink, "children": children,
+            "body": ""}
+
+
+class RPC(object):
+    """ Thread: root -> a -> (a1, a2), root -> b
+    """
+    tree = {
+        "x/root": [post("u", "a", 2), post("u", "b")],
+        "u/a": [post("v", "a1"), post("w", "a2")],
+    }
+
+    def __init__(self, state=False):
+        self.calls = []
+        self.state = state
+
+    def get_content_replies(self, author, permlink):
+        self.calls.append("%s/%s" % (author, permlink))
+        return self.tree.get("%s/%s" % (author, permlink), [])
+
+    def get_content(self, author, permlink):
+        self.calls.append("content %s/%s" % (author, permlink))
+        parents = {"w/a2": ("u", "a"), "u/a": ("x", "root"), "x/root": ("", "")}
+        parent = parents["%s/%s" % (author, permlink)]
+        return dict(post(author, permlink),
+                    parent_author=parent[0], parent_permlink=parent[1])
+
+    def get_state(self, path):
+        self.calls.append(path)
+        if not self.state:
+            raise ValueError("no get_state")
+        content = {"x/root": dict(post("x", "root", 4),
+                                  replies=["u/a", "u/b"])}
+        for parent, replies in self.tree.items():
+            for reply in replies:
+                content[identifier(reply)] = dict(
+                    reply, replies=[], parent_author=parent.split("/")[0],
+                    parent_permlink=parent.split("/")[1])
+        content["u/a"]["replies"] = ["v/a1", "w/a2"]
+        return {"content": content}
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_state(self):
+        rpc = RPC(state=True)
+        discussion = Discussion(rpc)
+        self.assertEqual(
+            [(depth, identifier(p)) for depth, p in discussion.stream("x", "root")],
+            [(0, "u/a"), (1, "v/a1"), (1, "w/a2"), (0, "u/b")])
+        self.assertEqual(rpc.calls, ["/piston/@x/root"])
+
+    def test_state_unavailable(self):
+        rpc = RPC()
+        discussion = Discussion(rpc)
+        self.assertEqual(
+            [identifier(p) for _, p in discussion.stream("x", "root")],
+            ["u/a", "v/a1", "w/a2", "u/b"])
+        # get_state, then one call per post with children
+        self.assertEqual(rpc.calls, ["/piston/@x/root", "x/root", "u/a"])
+
+    def test_ancestors(self):
+        rpc = RPC()
+        discussion = Discussion(rpc)
+        self.assertEqual(
+            [identifier(p) for p in discussion.ancestors("w", "a2", limit=5)],
+            ["x/root", "u/a", "w/a2"])
+        self.assertEqual(
+            [identifier(p) for p in discussion.ancestors("w", "a2", limit=1)],
+            ["u/a", "w/a2"])
+        self.assertEqual(rpc.calls, ["content w/a2", "content u/a", "content x/root"])
+
+    def test_parents_and_replies(self):
+        rpc = RPC(state=True)
+        discussion = Discussion(rpc)
+        discussion.fetch_state("u/a")
+        self.assertEqual(
+            [identifier(p) for p in discussion.ancestors("u", "a", limit=1)],
+            ["x/root", "u/a"])
+        self.assertEqual(
+            [identifier(p) for _, p in discussion.stream("u", "a")],
+            ["v/a1", "w/a2"])
+        # The post itself and its replies come with the discussion state
+        self.assertEqual(rpc.calls[0], "/piston/@u/a")
+        self.assertNotIn("content u/a", rpc.calls)
+        self.assertNotIn("u/a", rpc.calls)
+
+    def test_stream(self):
+        rpc = RPC()
+        discussion = Discussion(rpc, state=False)
+        self.assertEqual(
+            [(d, identifier(p)) for d, p in discussion.stream("x", "root")],
+            [(0, "u/a"), (1, "v/a1"), (1, "w/a2"), (0, "u/b")])
+        self.assertEqual(rpc.calls, ["x/root", "u/a"])
+        self.assertEqual(discussion.replies, {})
+
+        rpc = RPC()
+        discussion = Discussion(rpc, state=False)
+        self.assertEqual(
+            [identifier(p) for _, p in discussion.stream("x", "root", max_depth=1)],
+            ["u/a", "u/b"])
+        self.assertEqual(rpc.calls, ["x/root"])
+        self.assertEqual(
+            [identifier(p) for _, p in discussion.stream("x", "root", limit=2)],
+            ["u/a", "v/a1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+import unittest
+from pistoncli import history
+
+
+class FakeRPC(object):
+    """ ``get_account_history`` of an account with ``size`` operations
+    """
+    def __init__(self, size):
+        self.size = size
+        self.calls = 0
+
+    def get_account_history(self, account, first, limit):
+        self.calls += 1
+        first = self.size - 1 if first < 0 else min(first, self.size - 1)
+        return [
+            [i, {"block": i, "timestamp": "2016-08-24T18:00:00",
+                 "op": ["vote" if i % 3 else "transfer", {}]}]
+            for i in range(max(first - limit, 0), first + 1)
+        ]
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_pages(self):
+        rpc = FakeRPC(2500)
+        pages = list(history.pages(rpc, "x", page_size=1000))
+        self.assertEqual([len(page) for page in pages], [1001, 1001, 498])
+        indices = [entry[0] for page in pages for entry in page]
+        self.assertEqual(indices, list(reversed(range(2500))))
+        self.assertEqual(rpc.calls, 3)
+
+    def test_limit_and_filter(self):
+        rpc = FakeRPC(2500)
+        entries = [entry for page in history.pages(
+            rpc, "x", first=2000, limit=5, only_ops=["transfer"], page_size=10)
+            for entry in page]
+        self.assertEqual([entry[0] for entry in entries],
+                         [1998, 1995, 1992, 1989, 1986])
+        entries = [entry for page in history.pages(
+            rpc, "x", exclude_ops=["transfer"], page_size=100)
+            for entry in page]
+        self.assertEqual(len(entries), 2500 - 834)
+
+    def test_store(self):
+        import os
+        import shutil
+        import tempfile
+        directory = tempfile.mkdtemp()
+        try:
+            rpc = FakeRPC(2500)
+            rpc.get_dynamic_global_properties = lambda: {
+                "last_irreversible_block_num": 2399}
+            with history.HistoryStore(os.path.join(directory, "h.sqlite")) as store:
+                self.assertEqual(store.sync(rpc, "x", page_size=1000), 2400)
+                self.assertEqual(store.synced("x"), 2399)
+                rpc.calls = 0
+                self.assertEqual(store.sync(rpc, "x", page_size=1000), 0)
+                self.assertEqual(rpc.calls, 2)
+
+                rpc.calls = 0
+                entries = [entry for page in history.query(rpc, "x", store=store)
+                           for entry in page]
+                self.assertEqual([entry[0] for entry in entries],
+                                 list(reversed(range(2500))))
+                self.assertEqual(rpc.calls, 1)
+
+                entries = [entry for page in history.query(
+                    rpc, "x", store=store, first=2000, limit=5,
+                    only_ops=["transfer"]) for entry in page]
+                self.assertEqual([entry[0] for entry in entries],
+                                 [1998, 1995, 1992, 1989, 1986])
+
+                rpc.size = 3000
+                rpc.get_dynamic_global_properties = lambda: {
+                    "last_irreversible_block_num": 3000}
+                self.assertEqual(store.sync(rpc, "x", page_size=1000), 600)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_filters(self):
+        import os
+        import shutil
+        import tempfile
+
+        class RPC(FakeRPC):
+            def get_account_history(self, account, first, limit):
+                entries = FakeRPC.get_account_history(self, account, first, limit)
+                for i, op in entries:
+                    op["timestamp"] = "2017-%02d-01T00:00:00" % (i // 100 + 1)
+                    op["op"][1] = {"from": "x", "to": "user%d" % (i % 5)}
+                return entries
+
+        self.assertEqual(history.parse_bound("123"), 123)
+        self.assertEqual(history.parse_bound("2017-03"), "2017-03-01T00:00:00")
+        self.assertEqual(history.counterparty_of("x", ["transfer", {"from": "x", "to": "y"}]), "y")
+        self.assertEqual(history.counterparty_of("y", ["transfer", {"from": "x", "to": "y"}]), "x")
+
+        filters = dict(only_ops=["transfer"], counterparty="user3",
+                       since=history.parse_bound("2017-03"),
+                       until=history.parse_bound("2017-04"))
+        directory = tempfile.mkdtemp()
+        try:
+            rpc = RPC(1200)
+            rpc.get_dynamic_global_properties = lambda: {
+                "last_irreversible_block_num": 1000}
+            live = [entry[0] for page in history.query(rpc, "x", **filters)
+                    for entry in page]
+            self.assertEqual(live, [i for i in reversed(range(200, 300))
+                                    if i % 3 == 0 and i % 5 == 3])
+            with history.HistoryStore(os.path.join(directory, "h.sqlite")) as store:
+                store.sync(rpc, "x")
+                rpc.calls = 0
+                stored = [entry[0] for page in history.query(
+                    rpc, "x", store=store, **filters) for entry in page]
+                self.assertEqual(stored, live)
+                self.assertEqual(rpc.calls, 1)
+                blocks = [entry[0] for page in history.query(
+                    rpc, "x", store=store, since=995, until=1005)
+                    for entry in page]
+                self.assertEqual(blocks, list(reversed(range(995, 1005))))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_same_block(self):
+        import os
+        import shutil
+        import tempfile
+
+        class RPC(FakeRPC):
+            # Ten operations per block, twenty per minute
+            def get_account_history(self, account, first, limit):
+                entries = FakeRPC.get_account_history(self, account, first, limit)
+                for i, op in entries:
+                    op["block"] = i // 10
+                    op["timestamp"] = "2017-01-01T00:%02d:00" % (i // 20)
+                return entries
+
+        directory = tempfile.mkdtemp()
+        try:
+            rpc = RPC(1000)
+            rpc.get_dynamic_global_properties = lambda: {
+                "last_irreversible_block_num": 100}
+            with history.HistoryStore(os.path.join(directory, "h.sqlite")) as store:
+                store.sync(rpc, "x", page_size=100)
+                # Rows stored newest first (e.g. pages synced out of order)
+                rows = store.connection.execute(
+                    "SELECT * FROM history ORDER BY idx DESC").fetchall()
+                store.connection.execute("DELETE FROM history")
+                store.connection.executemany(
+                    "INSERT INTO history VALUES (%s)" % ",".join(
+                        "?" * len(rows[0])), rows)
+                for since, until, expected in [
+                        (50, 60, range(500, 600)),
+                        ("2017-01-01T00:10:00", "2017-01-01T00:12:00",
+                         range(200, 240))]:
+                    stored = [entry[0] for page in history.query(
+                        rpc, "x", store=store, since=since, until=until)
+                        for entry in page]
+                    self.assertEqual(stored, list(reversed(expected)))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_query_many(self):
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        class RPC(FakeRPC):
+            # Every account has operations every ``step`` minutes
+            def get_account_history(self, account, first, limit):
+                step = int(account[1:])
+                entries = FakeRPC.get_account_history(self, account, first, limit)
+                for index, op in entries:
+                    minutes = index * step
+                    op["timestamp"] = "2017-01-01T%02d:%02d:00" % (
+                        minutes // 60, minutes % 60)
+                return entries
+
+        class Pool(object):
+            def __init__(self, rpc):
+                self.steem = type("Steem", (), {"rpc": rpc})
+                self.workers = 2
+                self.executor = ThreadPoolExecutor(max_workers=2)
+
+            def submit(self, func, *args):
+                return self.executor.submit(func, self.steem, *args)
+
+        rpc = RPC(300)
+        accounts = ["a1", "a2", "a3"]
+        pool = Pool(rpc)
+        pages = list(history.query_many(rpc, accounts, pool=pool, limit=250))
+        self.assertEqual([page[0][0] for page in pages], ["a1", "a2", "a3"])
+        self.assertEqual(sum(len(page) for page in pages), 750)
+
+        merged = [item for page in history.query_many(
+            rpc, accounts, pool=pool, merge=True) for item in page]
+        self.assertEqual(len(merged), 900)
+        times = [entry[1]["timestamp"] for _, entry in merged]
+        self.assertEqual(times, sorted(times, reverse=True))
+        self.assertEqual([account for account, _ in merged].count("a1"), 300)
+        self.assertEqual(merged[-1], ("a3", [0, {
+            "block": 0, "timestamp": "2017-01-01T00:00:00",
+            "op": ["transfer", {}]}]))
+
+        # Only as many histories as the pool has workers are fetched ahead
+        requested = set()
+
+        class Recording(RPC):
+            def get_account_history(self, account, first, limit):
+                requested.add(account)
+                return RPC.get_account_history(self, account, first, limit)
+
+        rpc = Recording(3000)
+        pool = Pool(rpc)
+        accounts = ["a%d" % i for i in range(1, 7)]
+        pages = history.query_many(rpc, accounts, pool=pool, prefetch=4)
+        first = next(pages)
+        self.assertEqual(first[0][0], "a1")
+        time.sleep(0.2)
+        self.assertEqual(requested, {"a1", "a2"})
+        self.assertEqual(len(first) + sum(len(page) for page in pages),
+                         6 * 3000)
+        self.assertEqual(requested, set(accounts))
+        pool.executor.shutdown()
@@ -0,0 +1,29 @@
+import unittest
+from pistoncli.commands.info import classify, block_range
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_classify(self):
+        self.assertEqual(classify("1000000"), "block")
+        self.assertEqual(classify("100-200"), "range")
+        self.assertEqual(classify("piston"), "account")
+        self.assertEqual(classify("piston.cli-1"), "account")
+        self.assertEqual(
+            classify("STM6quoHiVnmiDEXyz4fAsrNd28G6q7qBCitWbZGo4pTfQn8SwkzD"),
+            "key")
+        self.assertEqual(classify("@xeroc/piston-readme"), "post")
+        self.assertEqual(classify("https://steemit.com/piston/@xeroc/piston"),
+                         "post")
+        self.assertIsNone(classify("a"))
+        self.assertIsNone(classify("no such thing"))
+
+    def test_block_range(self):
+        self.assertEqual(list(block_range("100-103")), [100, 101, 102, 103])
+        self.assertEqual(list(block_range("103-100")), [103, 102, 101, 100])
+        self.assertEqual(list(block_range("5-5")), [5])
+        self.assertEqual(len(block_range("1000000-1028800")), 28801)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from pistoncli.markdown import Renderer, _escape
+
+
+def plain(text):
+    return _escape.sub("", text)
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        self.renderer = Renderer(width=40)
+
+    def test_inline(self):
+        out = Renderer(width=80).render(
+            "some **bold** and *light* `code` [link](http://x.y) **more**")
+        self.assertEqual(
+            plain(out), "some bold and light  code  [link](http://x.y) more")
+        self.assertIn(self.renderer.bold[0] + "bold" + self.renderer.bold[1], out)
+        self.assertEqual(plain(self.renderer.render("*a* b *c*")), "a b c")
+
+    def test_paragraphs(self):
+        out = self.renderer.render("first\nline\n\nsecond")
+        self.assertEqual(plain(out), "first line\n\nsecond")
+
+    def test_wrap_ignores_colors(self):
+        out = self.renderer.render(" ".join(["**word**"] * 30))
+        lines = plain(out).splitlines()
+        self.assertTrue(all(len(line) <= 40 for line in lines))
+        self.assertEqual(len(lines[0]), 39)
+        self.assertEqual(sum(len(line.split()) for line in lines), 30)
+
+    def test_blocks(self):
+        out = plain(self.renderer.render(
+            "# Title\n* one\n- two\n\n    indented\n```python\na\nb\n```"))
+        lines = out.splitlines()
+        self.assertEqual(lines[0].strip(), "Title")
+        self.assertEqual(len(lines[0]), 40)
+        self.assertEqual(lines[1:3], [" * one", " - two"])
+        self.assertEqual(lines[4:], ["       indented   ", "       a   ", "       b   "])
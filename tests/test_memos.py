@@ -0,0 +1,110 @@
+import sys
+import types
+import struct
+import hashlib
+import unittest
+from unittest import mock
+from pistoncli import memos
+
+FROM_KEY = "02" + "aa" * 32
+TO_KEY = "03" + "bb" * 32
+
+
+class AES(object):
+    # Stands in for AES: XOR with the key
+
+    def __init__(self, key):
+        self.key = key
+
+    def decrypt(self, data):
+        return bytes(b ^ self.key[i % len(self.key)] for i, b in enumerate(data))
+
+    encrypt = decrypt
+
+
+def init_aes(shared_secret, nonce):
+    key = hashlib.sha512((nonce + shared_secret).encode("ascii")).digest()
+    check = struct.unpack_from("<I", hashlib.sha256(key).digest()[:4])[0]
+    return AES(key[:32]), check
+
+
+def fake_memo_module():
+    """ What :mod:`pistoncli.memos` uses of ``piston.memo``: the memo is
+        hex-encoded instead of base58 and the keys are plain strings
+    """
+    module = types.ModuleType("piston.memo")
+    module.base58decode = lambda text: text
+    module.PublicKey = str
+    module.PrivateKey = str
+    module.get_shared_secret = lambda private, public: "secret"
+    module.init_aes = init_aes
+    return module
+
+
+def varint(number):
+    data = b""
+    while number >= 0x80:
+        data += bytes([number & 0x7f | 0x80])
+        number >>= 7
+    return data + bytes([number])
+
+
+def encode(message, nonce=1234):
+    message = message.encode("utf8")
+    count = 16 - len(message) % 16
+    aes, check = init_aes("secret", str(nonce))
+    cipher = aes.encrypt(message + bytes([count]) * count)
+    raw = (struct.pack("<Q", nonce) + struct.pack("<I", check) +
+           varint(len(cipher)) + cipher)
+    return "#" + FROM_KEY + TO_KEY + raw.hex()
+
+
+class Wallet(object):
+
+    def getPrivateKeyForPublicKey(self, pub):
+        if pub != TO_KEY:
+            raise Exception("no key")
+        return "wif"
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        patch = mock.patch.dict(sys.modules, {
+            "piston": types.ModuleType("piston"),
+            "piston.memo": fake_memo_module(),
+        })
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_parse_memo(self):
+        for message in ["hello", "x" * 200]:
+            from_key, to_key, nonce, check, cipher = memos.parse_memo(
+                encode(message))
+            self.assertEqual((from_key, to_key, nonce), (FROM_KEY, TO_KEY, "1234"))
+            self.assertEqual(check, init_aes("secret", "1234")[1])
+            # The varint takes two bytes from 128 bytes on
+            self.assertEqual(len(cipher), (len(message) // 16 + 1) * 16)
+
+    def test_decode(self):
+        steem = types.SimpleNamespace(wallet=Wallet())
+        with memos.MemoDecoder(steem) as decoder:
+            messages = ["hello", "", "x" * 128, "ü" * 100]
+            self.assertEqual(
+                decoder.decode_many([encode(m) for m in messages]), messages)
+            self.assertEqual(decoder.decode("plain text"), "plain text")
+            self.assertEqual(len(decoder.secrets), 1)
+
+    def test_unpad(self):
+        self.assertEqual(memos._unpad(b"abc\x01"), b"abc")
+        self.assertEqual(memos._unpad(b"\x10" * 16), b"")
+        self.assertEqual(memos._unpad(b""), b"")
+        # Invalid padding is kept
+        self.assertEqual(memos._unpad(b"abc\x01\x02"), b"abc\x01\x02")
+        self.assertEqual(memos._unpad(b"abc\x05"), b"abc\x05")
+        self.assertEqual(memos._unpad(b"abc\x00"), b"abc\x00")
+        self.assertEqual(memos._unpad(b"abc\x11"), b"abc\x11")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import json
+import base64
+import struct
+import hashlib
+import unittest
+import threading
+import socketserver
+from pistoncli import nodebench
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+
+class StandInHandler(socketserver.StreamRequestHandler):
+    """ Minimal websocket server that answers steemd's ``call`` API
+    """
+    responses = {
+        "get_dynamic_global_properties": {"head_block_number": 5000},
+        "get_accounts": [{"name": "steemit"}],
+        "get_block": {"witness": "xeroc"},
+        "get_content_replies": [],
+    }
+
+    def handle(self):
+        headers = {}
+        self.rfile.readline()
+        for line in iter(self.rfile.readline, b"\r\n"):
+            key, value = line.decode().split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1(
+            (headers["sec-websocket-key"] +
+             "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode()).digest())
+        self.wfile.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+        while True:
+            header = self.rfile.read(2)
+            if len(header) < 2:
+                return
+            opcode, length = header[0] & 0x0f, header[1] & 0x7f
+            if length == 126:
+                length, = struct.unpack("!H", self.rfile.read(2))
+            elif length == 127:
+                length, = struct.unpack("!Q", self.rfile.read(8))
+            mask = self.rfile.read(4)
+            payload = bytes(
+                b ^ mask[i % 4] for i, b in enumerate(self.rfile.read(length)))
+            if opcode == 8:
+                self.wfile.write(b"\x88\x00")
+                return
+            request = json.loads(payload.decode())
+            response = json.dumps({
+                "id": request["id"],
+                "result": self.responses[request["params"][1]]
+            }).encode()
+            self.wfile.write(b"\x81" + bytes([126]) +
+                             struct.pack("!H", len(response)) + response)
+
+
+class StandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(nodebench.percentile(values, 50), 50)
+        self.assertEqual(nodebench.percentile(values, 99), 99)
+        self.assertEqual(nodebench.percentile([3], 95), 3)
+        self.assertIsNone(nodebench.percentile([], 50))
+
+    @unittest.skipIf(websocket is None, "websocket-client is not installed")
+    def test_bench_stand_in(self):
+        server = StandInServer(("127.0.0.1", 0), StandInHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = "ws://127.0.0.1:%d" % server.server_address[1]
+            result = nodebench.bench(url, runs=5, concurrency=2, duration=0.2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(result["errors"], 0)
+        self.assertEqual(sorted(result["calls"]), sorted(StandInHandler.responses))
+        for stats in [result["connect"]] + list(result["calls"].values()):
+            self.assertLessEqual(stats["p50"], stats["p95"])
+            self.assertLessEqual(stats["p95"], stats["p99"])
+        self.assertEqual(result["throughput"]["concurrency"], 2)
+        self.assertGreater(result["throughput"]["calls"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
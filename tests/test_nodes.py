@@ -0,0 +1,84 @@
+import json
+import unittest
+from pistoncli import nodes
+from pistoncli.storage import ConfigurationSnapshot
+
+
+class RPC(object):
+
+    def __init__(self, url, dead):
+        self.url = url
+        self.dead = dead
+        self.calls = []
+
+    def wsconnect(self):
+        pass
+
+    def rpcexec(self, payload):
+        self.calls.append((self.url, nodes.rpc_method(payload)))
+        if self.url in self.dead:
+            raise OSError("connection closed")
+        return self.url
+
+
+class Steem(object):
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+
+
+def payload(method):
+    return {"method": "call", "params": ["database_api", method, []]}
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        self.config = nodes.config
+        nodes.config = ConfigurationSnapshot({})
+        self.latencies = {"wss://a": 0.3, "wss://b": 0.1, "wss://c": 0.2}
+
+    def tearDown(self):
+        nodes.config = self.config
+
+    def prober(self, url):
+        if url not in self.latencies:
+            raise OSError("unreachable")
+        return self.latencies[url]
+
+    def test_parse_nodes(self):
+        self.assertEqual(nodes.parse_nodes("wss://a, wss://b"), ["wss://a", "wss://b"])
+        self.assertEqual(nodes.parse_nodes(None), [])
+
+    def test_ranking_and_persistence(self):
+        pool = nodes.NodePool(["wss://a", "wss://b", "wss://c", "wss://d"], self.prober)
+        pool.probe()
+        self.assertEqual(pool.ranked(), ["wss://b", "wss://c", "wss://a", "wss://d"])
+        pool.save()
+
+        probed = []
+        pool = nodes.NodePool(["wss://a", "wss://b", "wss://c", "wss://d"],
+                              lambda url: probed.append(url) or 0.1)
+        pool.probe()
+        self.assertEqual(probed, [])
+        self.assertEqual(pool.ranked()[0], "wss://b")
+        self.assertIn("wss://b", json.loads(nodes.config[nodes.SCORES_KEY]))
+
+    def test_failover(self):
+        pool = nodes.NodePool(["wss://a", "wss://b", "wss://c"], self.prober)
+        pool.probe()
+        rpc = RPC("wss://b", dead=["wss://b"])
+        pool.attach(Steem(rpc))
+
+        self.assertEqual(rpc.rpcexec(payload("get_block")), "wss://c")
+        self.assertEqual(pool.ranked()[-1], "wss://b")
+
+        # Broadcasts are not repeated on another node
+        rpc.dead.append("wss://c")
+        with self.assertRaises(OSError):
+            rpc.rpcexec(payload("broadcast_transaction"))
+        self.assertEqual(rpc.calls[-1], ("wss://c", "broadcast_transaction"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+import unittest
+from pistoncli.pipeline import threaded
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_order(self):
+        stage = threaded(range(1000), maxsize=4)
+        stage = threaded((x * 2 for x in stage), maxsize=4)
+        self.assertEqual(list(stage), [x * 2 for x in range(1000)])
+
+    def test_exception(self):
+        def failing():
+            yield 1
+            raise ValueError("broken")
+
+        stage = threaded(failing())
+        self.assertEqual(next(stage), 1)
+        with self.assertRaises(ValueError):
+            next(stage)
+
+    def test_bounded_and_stops_early(self):
+        produced = []
+
+        def source():
+            for x in range(1000):
+                produced.append(x)
+                yield x
+
+        stage = threaded(source(), maxsize=5)
+        self.assertEqual(next(stage), 0)
+        time.sleep(0.05)
+        # The queue holds at most 5 items, plus one waiting to be put
+        self.assertLessEqual(len(produced), 7)
+        stage.close()
+        time.sleep(0.3)
+        count = len(produced)
+        time.sleep(0.2)
+        self.assertEqual(len(produced), count)
+
+
+if __name__ == '__main__':
+    unittest.main()
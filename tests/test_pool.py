@@ -0,0 +1,56 @@
+import time
+import random
+import threading
+import unittest
+from pistoncli.pool import ReaderPool
+
+
+class Connection(object):
+
+    def __init__(self, **options):
+        self.options = options
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_map_ordered_and_bounded(self):
+        lock = threading.Lock()
+        state = {"running": 0, "max": 0}
+
+        def fetch(steem, n):
+            with lock:
+                state["running"] += 1
+                state["max"] = max(state["max"], state["running"])
+            time.sleep(random.random() / 1000)
+            with lock:
+                state["running"] -= 1
+            return n * n
+
+        with ReaderPool({}, workers=4, factory=Connection) as pool:
+            results = list(pool.map(fetch, range(200), prefetch=6))
+        self.assertEqual(results, [n * n for n in range(200)])
+        self.assertLessEqual(state["max"], 4)
+
+        consumed = []
+
+        def items():
+            for n in range(1000):
+                consumed.append(n)
+                yield n
+
+        with ReaderPool({}, workers=4, factory=Connection) as pool:
+            results = pool.map(fetch, items(), prefetch=6)
+            self.assertEqual(next(results), 0)
+            self.assertEqual(len(consumed), 6)
+            self.assertEqual(list(results), [n * n for n in range(1, 1000)])
+
+    def test_connection_per_thread(self):
+        with ReaderPool({"node": "wss://a"}, workers=2, factory=Connection) as pool:
+            connections = set(pool.map(lambda steem, n: id(steem), range(50)))
+            steem = pool.submit(lambda steem: steem).result()
+        self.assertLessEqual(len(connections), 2)
+        self.assertEqual(steem.options, {"node": "wss://a", "wif": []})
+
+
+if __name__ == '__main__':
+    unittest.main()
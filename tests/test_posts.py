@@ -0,0 +1,54 @@
+import unittest
+from pistoncli.commands import posts
+
+
+class FakeSteem(object):
+    """ ``get_posts`` of a feed of ``size`` posts, newest first
+    """
+    def __init__(self, size):
+        self.feed = [{"author": "a%d" % i, "permlink": "p"}
+                     for i in range(size)]
+        self.calls = []
+
+    def get_posts(self, limit, sort, category=None, start=None):
+        self.calls.append((limit, start))
+        offset = 0
+        if start:
+            offset = [("@%s/%s" % (post["author"], post["permlink"]))
+                      for post in self.feed].index(start)
+        return self.feed[offset:offset + limit]
+
+
+class Testcases(unittest.TestCase) :
+
+    def authors(self, pages):
+        return [post["author"] for page in pages for post in page]
+
+    def test_limit(self):
+        steem = FakeSteem(1000)
+        pages = list(posts.get_posts_pages(steem, "trending", limit=250))
+        # Every page after the first repeats the last post of the previous
+        self.assertEqual([len(page) for page in pages], [100, 99, 51])
+        self.assertEqual(self.authors(pages), ["a%d" % i for i in range(250)])
+        self.assertEqual(steem.calls,
+                         [(100, None), (100, "@a99/p"), (52, "@a198/p")])
+
+    def test_exhausted(self):
+        steem = FakeSteem(150)
+        pages = list(posts.get_posts_pages(steem, "trending", limit=1000))
+        self.assertEqual(self.authors(pages), ["a%d" % i for i in range(150)])
+        self.assertEqual(len(steem.calls), 2)
+
+        steem = FakeSteem(199)
+        pages = list(posts.get_posts_pages(steem, "trending"))
+        self.assertEqual(self.authors(pages), ["a%d" % i for i in range(199)])
+        # The last page only repeats the last post
+        self.assertEqual(steem.calls,
+                         [(100, None), (100, "@a99/p"), (100, "@a198/p")])
+
+        self.assertEqual(
+            list(posts.get_posts_pages(FakeSteem(0), "trending")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
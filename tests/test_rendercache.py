@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pistoncli.rendercache import RenderCache, render_body
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "render_cache.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_lru(self):
+        cache = RenderCache(entries=2)
+        body = "some **bold** text"
+        self.assertEqual(cache.render(body), render_body(body))
+        self.assertEqual(cache.render(body), render_body(body))
+        self.assertEqual(cache.render(body, format="raw"), body)
+        cache.render(body, width=40)
+        self.assertEqual(len(cache.memory), 2)
+        cache.render(body)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 4))
+        self.assertEqual(stats["hit_rate"], 0.2)
+
+    def test_disk(self):
+        cache = RenderCache(path=self.path)
+        cache.render("# one")
+        cache.close()
+        cache = RenderCache(path=self.path)
+        self.assertEqual(cache.render("# one"), render_body("# one"))
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+        cache.render("# one")
+        self.assertEqual(cache.stats()["hits"], 1)
+        cache.close()
+
+    def test_disk_eviction(self):
+        cache = RenderCache(path=self.path, disk_entries=3)
+        for i in range(10):
+            cache.render("post %d" % i)
+        cache.evict()
+        self.assertEqual(
+            cache.connection.execute("SELECT COUNT(*) FROM render").fetchone()[0], 3)
+        cache.close()
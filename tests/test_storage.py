@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from pistoncli.storage import ConfigurationSnapshot
+
+
+class Configuration(dict):
+    """ Minimal stand-in for piston.storage.Configuration
+    """
+    __tablename__ = "config"
+    defaults = {"limit": 10, "node": "wss://this.piston.rocks"}
+
+    def __init__(self, path):
+        self.sqlDataBaseFile = path
+        connection = sqlite3.connect(path)
+        connection.execute("CREATE TABLE config (key STRING(256), value STRING(256))")
+        connection.execute("INSERT INTO config VALUES ('default_author', 'xeroc')")
+        connection.commit()
+        connection.close()
+
+
+class Testcases(unittest.TestCase) :
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        os.remove(self.path)
+        self.storage = Configuration(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_lazy_single_read(self):
+        config = ConfigurationSnapshot(self.storage)
+        self.assertEqual(config.reads, 0)
+        self.assertEqual(config["default_author"], "xeroc")
+        self.assertEqual(config["limit"], 10)
+        self.assertIsNone(config["unknown"])
+        self.assertEqual(config.get("unknown", 5), 5)
+        self.assertEqual(config.reads, 1)
+
+    def test_write_through(self):
+        config = ConfigurationSnapshot(self.storage)
+        self.assertEqual(config["limit"], 10)
+        config["limit"] = "20"
+        self.assertEqual(self.storage["limit"], "20")
+        self.assertEqual(config["limit"], "20")
+        self.assertEqual(config.reads, 1)
+
+    def test_refresh(self):
+        config = ConfigurationSnapshot(self.storage)
+        self.assertEqual(config["default_author"], "xeroc")
+        self.assertFalse(config.refresh())
+
+        # Another process changes the configuration
+        connection = sqlite3.connect(self.path)
+        connection.execute("UPDATE config SET value = 'piston' "
+                           "WHERE key = 'default_author'")
+        connection.commit()
+        connection.close()
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertTrue(config.refresh())
+        self.assertEqual(config["default_author"], "piston")
+        self.assertEqual(config.reads, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from pistoncli import summary
+
+
+def op(kind, timestamp="2017-03-01T12:00:00", **data):
+    return [0, {"timestamp": timestamp, "block": 1, "op": [kind, data]}]
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_summary(self):
+        s = summary.Summary("x")
+        s.add([
+            op("transfer", **{"from": "x", "to": "y", "amount": "1.500 SBD"}),
+            op("transfer", **{"from": "y", "to": "x", "amount": "2.000 SBD"}),
+            op("transfer", **{"from": "x", "to": "y", "amount": "0.250 SBD"}),
+            op("transfer", **{"from": "x", "to": "z", "amount": "3.000 STEEM"}),
+            op("vote", voter="x", author="y", permlink="p"),
+            op("curation_reward", reward="10.000000 VESTS"),
+            op("curation_reward", timestamp="2017-03-02T00:00:00",
+               reward="5.000000 VESTS"),
+            op("author_reward", sbd_payout="1.000 SBD", steem_payout="0.000 STEEM",
+               vesting_payout="2.000000 VESTS"),
+        ])
+        s.add([op("curation_reward", reward="1.000000 VESTS")])
+        result = s.json()
+        self.assertEqual(result["operations"], 9)
+        self.assertEqual(result["counts"], {
+            "transfer": 4, "vote": 1, "curation_reward": 3, "author_reward": 1})
+        self.assertEqual(result["transfers"], [
+            {"counterparty": "y", "asset": "SBD", "sent": 1.75, "received": 2.0},
+            {"counterparty": "z", "asset": "STEEM", "sent": 3.0, "received": 0.0},
+        ])
+        self.assertEqual(result["rewards"], [
+            {"day": "2017-03-01", "asset": "SBD", "amount": 1.0},
+            {"day": "2017-03-01", "asset": "STEEM", "amount": 0.0},
+            {"day": "2017-03-01", "asset": "VESTS", "amount": 13.0},
+            {"day": "2017-03-02", "asset": "VESTS", "amount": 5.0},
+        ])
@@ -0,0 +1,45 @@
+import io
+import unittest
+from prettytable import PrettyTable
+from pistoncli.table import StreamingTable
+
+rows = [
+    ["@a/post", "A title", 3, "1.000 SBD"],
+    ["@bob/another-post", "Another, longer title", 12, "10.000 SBD"],
+]
+
+
+class Testcases(unittest.TestCase) :
+
+    def test_same_as_prettytable(self):
+        header = ["identifier", "title", "replies", "payouts"]
+        expected = PrettyTable(header)
+        expected.align = "l"
+        expected.align["payouts"] = "r"
+        out = io.StringIO()
+        t = StreamingTable(header, file=out)
+        t.align["payouts"] = "r"
+        with t:
+            for row in rows:
+                expected.add_row(row)
+                t.add_row(row)
+        self.assertEqual(out.getvalue(), str(expected) + "\n")
+
+    def test_streams_after_sample(self):
+        out = io.StringIO()
+        t = StreamingTable(["a", "b"], sample=1, file=out)
+        t.add_row(["x", "y"])
+        self.assertEqual(out.getvalue(), "")
+        t.add_row(["too long", "z"])
+        self.assertEqual(out.getvalue().splitlines()[3:], [
+            "| x | y |", "| t | z |", "| o |   |", "| o |   |",
+            "| l |   |", "| o |   |", "| n |   |", "| g |   |"])
+        t.close()
+        self.assertEqual(out.getvalue().splitlines()[-1], "+---+---+")
+
+    def test_fixed_widths(self):
+        out = io.StringIO()
+        t = StreamingTable(["a"], widths={"a": 5}, file=out)
+        t.add_row(["one two three"])
+        self.assertEqual(out.getvalue().splitlines()[3:], [
+            "| one   |", "| two   |", "| three |"])